@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+CSV Tail Module
+
+Follows a CSV file that is only ever appended to, as the scraper does with its
+events CSV. After the first full read, the reader keeps a checkpoint (the byte
+offset of the end of the last complete record and the file's identity), so a
+refresh parses only the records appended since. A record is complete once the
+newline that ends it is written; newlines inside quoted fields, such as the
+multi-line event_detail markdown, do not end a record.
+
+When the file is truncated or replaced (a new inode, or different bytes before
+the checkpoint), the appended rows cannot be trusted and the caller must read
+the whole file again.
+"""
+
+import io
+import os
+import csv
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('csv_tail')
+
+# Bytes at the start of the file and just before the checkpoint that are
+# fingerprinted to detect a file rewritten in place
+FINGERPRINT_BYTES = 4096
+
+
+@dataclass(frozen=True)
+class TailCheckpoint:
+    """Position of the reader in the file, and the identity of the file"""
+    device: int
+    inode: int
+    offset: int
+    fingerprint: str
+
+
+class CsvTail:
+    """Incremental reader of an append-only CSV file with a header row"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the reader
+
+        Args:
+            path: Path to the CSV file
+        """
+        self.path = path
+        self.fieldnames: List[str] = []
+        self.checkpoint: Optional[TailCheckpoint] = None
+
+    def read_all(self) -> List[Dict[str, str]]:
+        """
+        Read every complete record in the file and checkpoint its end
+
+        Returns:
+            List of row dictionaries keyed by the header's field names
+        """
+        self.checkpoint = None
+        self.fieldnames = []
+
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+
+        end = _complete_length(data)
+        reader = csv.reader(io.StringIO(data[:end].decode('utf-8'), newline=''))
+        self.fieldnames = next(reader, [])
+        rows = [self._to_dict(values) for values in reader if values]
+
+        self.checkpoint = TailCheckpoint(stat.st_dev, stat.st_ino, end, _fingerprint(data, end))
+        return rows
+
+    def read_appended(self) -> Optional[List[Dict[str, str]]]:
+        """
+        Read the complete records appended since the checkpoint
+
+        A record still being written is left for the next call.
+
+        Returns:
+            List of new row dictionaries (empty if nothing complete was appended),
+            or None if the file was truncated or replaced and must be read in full
+        """
+        checkpoint = self.checkpoint
+        if checkpoint is None or not self.fieldnames:
+            return None
+
+        try:
+            f = open(self.path, 'rb')
+        except OSError as e:
+            logger.warning(f"Cannot open {self.path}: {str(e)}")
+            return None
+
+        with f:
+            stat = os.fstat(f.fileno())
+            if (stat.st_dev, stat.st_ino) != (checkpoint.device, checkpoint.inode):
+                logger.info(f"{self.path} was replaced")
+                return None
+            if stat.st_size < checkpoint.offset:
+                logger.info(f"{self.path} was truncated")
+                return None
+
+            if _fingerprint_file(f, checkpoint.offset) != checkpoint.fingerprint:
+                logger.info(f"{self.path} was rewritten")
+                return None
+
+            f.seek(checkpoint.offset)
+            data = f.read()
+            end = _complete_length(data)
+            if not end:
+                return []
+            offset = checkpoint.offset + end
+            fingerprint = _fingerprint_file(f, offset)
+
+        reader = csv.reader(io.StringIO(data[:end].decode('utf-8'), newline=''))
+        rows = [self._to_dict(values) for values in reader if values]
+        self.checkpoint = TailCheckpoint(checkpoint.device, checkpoint.inode, offset, fingerprint)
+
+        logger.info(f"Read {len(rows)} appended rows ({end} bytes) from {self.path}")
+        return rows
+
+    def _to_dict(self, values: List[str]) -> Dict[str, str]:
+        """Map a record's values to the header's field names, like csv.DictReader"""
+        row = dict(zip(self.fieldnames, values))
+        for name in self.fieldnames[len(values):]:
+            row[name] = None
+        return row
+
+
+def _complete_length(data: bytes) -> int:
+    """Get the length of the complete records at the start of the data, up to the last unquoted newline"""
+    end = 0
+    in_quotes = False
+    position = 0
+
+    while True:
+        newline = data.find(b'\n', position)
+        if newline == -1:
+            return end
+        # Escaped quotes inside a field come in pairs, so only the parity matters
+        if data.count(b'"', position, newline) % 2:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            end = newline + 1
+        position = newline + 1
+
+
+def _fingerprint(data: bytes, offset: int) -> str:
+    """Hash the head of the data and the bytes just before the offset"""
+    digest = hashlib.sha1(data[:min(offset, FINGERPRINT_BYTES)])
+    digest.update(data[max(0, offset - FINGERPRINT_BYTES):offset])
+    return digest.hexdigest()
+
+
+def _fingerprint_file(f, offset: int) -> str:
+    """Hash the head of an open file and the bytes just before the offset"""
+    f.seek(0)
+    head = f.read(min(offset, FINGERPRINT_BYTES))
+    start = max(0, offset - FINGERPRINT_BYTES)
+    f.seek(start)
+    tail = f.read(offset - start)
+    digest = hashlib.sha1(head)
+    digest.update(tail)
+    return digest.hexdigest()
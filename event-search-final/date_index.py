@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Date Index Module
+
+Sorted index of event start times, built once per event snapshot from the
+`starts_at` datetimes the loaders attach to each event. Upcoming-event filters
+and date windows like "this week" or "next 30 days" are answered with a
+binary search over the sorted start times instead of parsing every event's
+date string on every search.
+"""
+
+import re
+import copy
+import bisect
+import logging
+from datetime import datetime, timedelta, tzinfo
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from event_dates import default_timezone
+
+logger = logging.getLogger('date_index')
+
+# Named date windows accepted by EventDateIndex.window_bounds
+DATE_WINDOWS = ("today", "tomorrow", "this_week", "this_weekend", "next_week", "this_month")
+
+# "next 30 days", "next_7_days"
+NEXT_DAYS_PATTERN = re.compile(r'^next[\s_-]*(\d+)[\s_-]*days?$')
+
+
+def normalize_window_name(window: str) -> str:
+    """Normalize a date window name, e.g. "This Week" becomes this_week"""
+    return window.strip().lower().replace(' ', '_')
+
+
+def is_date_window(window: str) -> bool:
+    """Check if a date window name is recognized"""
+    name = normalize_window_name(window)
+    return name in DATE_WINDOWS or bool(NEXT_DAYS_PATTERN.match(name))
+
+
+class EventDateIndex:
+    """Event ids sorted by start time, for range queries over event dates"""
+
+    def __init__(self, events: Sequence[Dict[str, Any]], tz: Optional[tzinfo] = None):
+        """
+        Build the index
+
+        Args:
+            events: Events with a timezone-aware 'starts_at' datetime (or None if the date is unknown)
+            tz: Timezone that defines day boundaries, defaults to the events' default timezone
+        """
+        self.tz = tz or default_timezone()
+        dated = []
+        self.undated_ids = []
+
+        for event_id, event in enumerate(events):
+            starts_at = event.get('starts_at')
+            if starts_at is None:
+                self.undated_ids.append(event_id)
+            else:
+                dated.append((starts_at.timestamp(), event_id))
+
+        dated.sort()
+        self.timestamps = [timestamp for timestamp, _ in dated]
+        self.event_ids = [event_id for _, event_id in dated]
+
+        logger.info(f"Built date index: {len(self.event_ids)} dated events, {len(self.undated_ids)} undated")
+
+    def extended(self, events: Sequence[Dict[str, Any]], new_ids: Sequence[int],
+                 changed_ids: Sequence[int] = ()) -> 'EventDateIndex':
+        """
+        Get a copy of the index with appended events added
+
+        Appended rows only add speakers to events already loaded, so changed events keep their start time.
+
+        Args:
+            events: All events, including the appended ones
+            new_ids: Ids of the appended events
+            changed_ids: Ids of existing events the appended rows changed
+
+        Returns:
+            New EventDateIndex; this one is left unchanged for the snapshot that uses it
+        """
+        index = copy.copy(self)
+        index.timestamps = list(self.timestamps)
+        index.event_ids = list(self.event_ids)
+        index.undated_ids = list(self.undated_ids)
+
+        for event_id in new_ids:
+            starts_at = events[event_id].get('starts_at')
+            if starts_at is None:
+                index.undated_ids.append(event_id)
+                continue
+            # New ids are larger than every indexed id, so they go after events with the same start time
+            position = bisect.bisect_right(index.timestamps, starts_at.timestamp())
+            index.timestamps.insert(position, starts_at.timestamp())
+            index.event_ids.insert(position, event_id)
+
+        return index
+
+    def ids_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[int]:
+        """
+        Get the ids of events starting in [start, end)
+
+        Args:
+            start: Earliest start time (None for no lower bound)
+            end: Latest start time, exclusive (None for no upper bound)
+
+        Returns:
+            Event ids ordered by start time
+        """
+        low = bisect.bisect_left(self.timestamps, start.timestamp()) if start else 0
+        high = bisect.bisect_left(self.timestamps, end.timestamp()) if end else len(self.timestamps)
+        return self.event_ids[low:high]
+
+    def upcoming_ids(self, now: Optional[datetime] = None) -> List[int]:
+        """
+        Get the ids of events that start today or later, plus events with unknown dates
+
+        Args:
+            now: Current time (defaults to now)
+
+        Returns:
+            Event ids: dated events by start time, then undated events
+        """
+        return self.ids_between(self.start_of_day(now)) + self.undated_ids
+
+    def window_ids(self, window: str, now: Optional[datetime] = None) -> List[int]:
+        """
+        Get the ids of events starting within a named date window
+
+        Events with unknown dates are not included.
+
+        Args:
+            window: Window name from DATE_WINDOWS or "next N days"
+            now: Current time (defaults to now)
+
+        Returns:
+            Event ids ordered by start time
+        """
+        start, end = self.window_bounds(window, now)
+        return self.ids_between(start, end)
+
+    def next_change(self, now: Optional[datetime] = None) -> datetime:
+        """
+        Get the next time a date filter or recency score can change
+
+        This is the earlier of the next event start and the next midnight.
+
+        Args:
+            now: Current time (defaults to now)
+
+        Returns:
+            Timezone-aware datetime of the next change
+        """
+        now = now.astimezone(self.tz) if now else datetime.now(self.tz)
+        next_change = self._add_days(self.start_of_day(now), 1)
+
+        position = bisect.bisect_right(self.timestamps, now.timestamp())
+        if position < len(self.timestamps):
+            next_change = min(next_change, datetime.fromtimestamp(self.timestamps[position], self.tz))
+        return next_change
+
+    def start_of_day(self, now: Optional[datetime] = None) -> datetime:
+        """Get midnight of the current day in the index timezone"""
+        now = now.astimezone(self.tz) if now else datetime.now(self.tz)
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def window_bounds(self, window: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """
+        Get the [start, end) bounds of a named date window
+
+        Windows start no earlier than today, so "this week" on a Thursday covers Thursday to Sunday.
+
+        Args:
+            window: Window name from DATE_WINDOWS or "next N days"
+            now: Current time (defaults to now)
+
+        Returns:
+            Tuple of (start, end) datetimes
+
+        Raises:
+            ValueError: If the window name is not recognized
+        """
+        today = self.start_of_day(now)
+        name = normalize_window_name(window)
+
+        match = NEXT_DAYS_PATTERN.match(name)
+        if match:
+            return today, self._add_days(today, int(match.group(1)))
+
+        if name == 'today':
+            return today, self._add_days(today, 1)
+        if name == 'tomorrow':
+            return self._add_days(today, 1), self._add_days(today, 2)
+        if name == 'this_week':
+            return today, self._add_days(today, 7 - today.weekday())
+        if name == 'this_weekend':
+            saturday = self._add_days(today, max(0, 5 - today.weekday()))
+            return saturday, self._add_days(today, 7 - today.weekday())
+        if name == 'next_week':
+            monday = self._add_days(today, 7 - today.weekday())
+            return monday, self._add_days(monday, 7)
+        if name == 'this_month':
+            if today.month == 12:
+                return today, today.replace(year=today.year + 1, month=1, day=1)
+            return today, today.replace(month=today.month + 1, day=1)
+
+        raise ValueError(f"Unknown date window: {window}")
+
+    def _add_days(self, day: datetime, days: int) -> datetime:
+        """Add calendar days to a midnight, staying at midnight across DST changes"""
+        shifted = day.replace(tzinfo=None) + timedelta(days=days)
+        return shifted.replace(tzinfo=self.tz)
@@ -12,12 +12,38 @@ import asyncio
 import csv
 import re
 import random
-import math
+import hashlib
+import base64
+import sys
+import heapq
+import functools
+import threading
+from collections import ChainMap
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Mapping, Sequence, Set
+import numpy as np
 from dotenv import load_dotenv
 import google.generativeai as genai
 from flask import Flask, request, jsonify, render_template
+from event_store import EventStore
+from csv_tail import CsvTail
+from lexical_ranker import BM25Ranker
+from scoring_executor import AsyncScoringExecutor
+from relevance_cache import RelevanceCache, relevance_cache_key, normalize_keywords
+from query_cache import QueryResultCache
+from ranking import RECENCY_CURVES, DEFAULT_RECENCY_STEPS, parse_recency_steps, recency_scores, combined_scores, top_k_indices
+
+# Shared event data modules live alongside the scraper
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'luma_event_scraper')
+if SCRAPER_DIR not in sys.path:
+    sys.path.append(SCRAPER_DIR)
+from event_catalog import EventCatalog, is_catalog_path
+from event_parquet import read_events, is_parquet_path
+from event_geo import geocode_location, zip_centroid
+from event_dates import parse_event_start, default_timezone
+from event_dedup import DuplicateIndex, collapse_duplicates, merge_duplicate_event, event_date_key
+from date_index import EventDateIndex, DATE_WINDOWS, is_date_window, normalize_window_name
+from geo_index import GeoIndex
 
 # Configure logging
 logging.basicConfig(
@@ -36,11 +62,69 @@ CSV_FILE_PATH = os.environ.get(
     "/Users/carol.zhu/Documents/carol_ai_final/luma_event_scraper/luma_bay_area_events.csv"
 )
 
+# Path to the SQLite event catalog (used instead of the CSV file when set)
+EVENTS_DB_PATH = os.environ.get("EVENTS_DB_PATH", "")
+
 # Initialize Gemini
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 genai.configure(api_key=GEMINI_API_KEY)
 gemini = genai.GenerativeModel('gemini-2.0-flash')
 
+# Maximum number of concurrent Gemini relevance calls, and the timeout for each call
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "5"))
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get("GEMINI_TIMEOUT_SECONDS", "20"))
+
+# Events packed into one Gemini relevance prompt (1 disables batching), and the
+# estimated prompt size, in tokens, that a batch may not exceed
+RELEVANCE_BATCH_SIZE = int(os.environ.get("RELEVANCE_BATCH_SIZE", "1"))
+RELEVANCE_BATCH_TOKEN_BUDGET = int(os.environ.get("RELEVANCE_BATCH_TOKEN_BUDGET", "24000"))
+
+# Shared executor that runs Gemini relevance calls concurrently
+scoring_executor = AsyncScoringExecutor(max_concurrency=GEMINI_MAX_CONCURRENCY)
+
+# Persistent cache of Gemini relevance results (set RELEVANCE_CACHE_PATH to "" to keep it in memory only)
+RELEVANCE_CACHE_PATH = os.environ.get(
+    "RELEVANCE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "relevance_cache.db")
+)
+RELEVANCE_CACHE_TTL_SECONDS = float(os.environ.get("RELEVANCE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RELEVANCE_CACHE_MAX_ENTRIES = int(os.environ.get("RELEVANCE_CACHE_MAX_ENTRIES", "5000"))
+RELEVANCE_CACHE_MAX_DISK_ENTRIES = int(os.environ.get("RELEVANCE_CACHE_MAX_DISK_ENTRIES", "100000"))
+
+relevance_cache = RelevanceCache(
+    RELEVANCE_CACHE_PATH,
+    ttl_seconds=RELEVANCE_CACHE_TTL_SECONDS,
+    max_memory_entries=RELEVANCE_CACHE_MAX_ENTRIES,
+    max_disk_entries=RELEVANCE_CACHE_MAX_DISK_ENTRIES
+)
+
+# Cache of ranked search results, invalidated when the events change or time passes an event start
+QUERY_CACHE_TTL_SECONDS = float(os.environ.get("QUERY_CACHE_TTL_SECONDS", "300"))
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", "256"))
+
+query_cache = QueryResultCache(max_entries=QUERY_CACHE_MAX_ENTRIES)
+
+# Depth of the ranked list that search pages are cut from, and the default and maximum page size
+SEARCH_RESULT_DEPTH = int(os.environ.get("SEARCH_RESULT_DEPTH", "50"))
+SEARCH_PAGE_SIZE = int(os.environ.get("SEARCH_PAGE_SIZE", "10"))
+
+# Fields returned for each search result when the request does not ask for specific fields;
+# the full event (speaker bios, event_detail markdown) is served by /api/event_detail
+COMPACT_FIELDS = (
+    'event_name', 'event_description', 'event_url', 'event_date_time', 'formatted_date', 'starts_at',
+    'event_location', 'host_name', 'relevance_score', 'relevance_highlight', 'combined_score', 'registration_link',
+    'distance_miles'
+)
+
+# Every field a search result can be projected to
+RESULT_FIELDS = COMPACT_FIELDS + (
+    'event_date', 'event_time', 'speakers', 'event_detail', 'parsed_date', 'recency_score', 'latitude', 'longitude',
+    'aliases'
+)
+
+# Radius of a ZIP code search, in miles, when the request does not give one
+DEFAULT_RADIUS_MILES = float(os.environ.get("DEFAULT_RADIUS_MILES", "25"))
+
 # Current date for validation
 CURRENT_DATE = datetime.now()
 
@@ -53,12 +137,152 @@ VERSION = str(int(time.time()))
 # Recency weight for sorting (how much to prioritize recent events)
 RECENCY_WEIGHT = float(os.environ.get("RECENCY_WEIGHT", "0.2"))
 
-def load_events_from_csv(csv_file_path: str = CSV_FILE_PATH) -> List[Dict[str, Any]]:
+# Recency curve ("log", "exp" or "step"), the exp curve's half-life and the step curve's days:score bands
+RECENCY_CURVE = os.environ.get("RECENCY_CURVE", "log").lower()
+if RECENCY_CURVE not in RECENCY_CURVES:
+    logger.warning(f"Unknown RECENCY_CURVE '{RECENCY_CURVE}'; expected one of {', '.join(RECENCY_CURVES)}. Using log")
+    RECENCY_CURVE = "log"
+RECENCY_HALF_LIFE_DAYS = float(os.environ.get("RECENCY_HALF_LIFE_DAYS", "14"))
+RECENCY_STEPS = parse_recency_steps(os.environ["RECENCY_STEPS"]) if os.environ.get("RECENCY_STEPS") else DEFAULT_RECENCY_STEPS
+
+# Relevance scorer: "gemini" (LLM analysis of each event), "bm25" (local lexical ranking)
+# or "pipeline" (BM25 retrieves candidates, Gemini reranks only those)
+SCORERS = ("gemini", "bm25", "pipeline")
+DEFAULT_SCORER = os.environ.get("EVENT_SCORER", "gemini").lower()
+
+# Number of BM25 candidates passed to the Gemini reranker in pipeline mode
+RERANK_TOP_K = int(os.environ.get("RERANK_TOP_K", "20"))
+
+# Seconds the Gemini rerank stage may spend before remaining candidates keep their BM25 scores
+RERANK_BUDGET_SECONDS = float(os.environ.get("RERANK_BUDGET_SECONDS", "30"))
+
+# Seconds between checks of the CSV file for changes
+EVENT_STORE_POLL_INTERVAL = float(os.environ.get("EVENT_STORE_POLL_INTERVAL", "5"))
+
+# Process-wide event store, created on first use
+event_store = None
+event_store_lock = threading.Lock()
+
+# Map standard field names to possible CSV column names
+CSV_FIELD_MAPPING = {
+    'event_name': ['event_name', 'event_title'],
+    'event_description': ['event_summary', 'event_detail'],
+    'event_date': ['event_date'],
+    'event_time': ['event_time'],
+    'event_location': ['event_location'],
+    'event_url': ['event_url'],
+    'host_name': ['host_name', 'host_company'],
+    'speaker_name': ['speaker_name'],
+    'speaker_title': ['speaker_title'],
+    'speaker_company': ['speaker_company'],
+    'speaker_details': ['speaker_details', 'speaker_detail']
+}
+
+def csv_column_mapping(field_names: List[str]) -> Dict[str, str]:
+    """Map the CSV columns that hold standard fields to the standard field names"""
+    column_mapping = {}
+    for std_field, possible_names in CSV_FIELD_MAPPING.items():
+        for name in possible_names:
+            if name in field_names:
+                column_mapping[name] = std_field
+                break
+    return column_mapping
+
+def merge_csv_rows(events: List[Dict[str, Any]], event_ids: Dict[str, int], rows: Iterable[Dict[str, str]],
+                   column_mapping: Dict[str, str], loaded_at: datetime) -> Set[int]:
+    """
+    Merge CSV rows (one row per speaker) into a list of events
+
+    The first row of an event sets its fields; later rows only add speakers.
+    Existing events are copied before they are changed, since they may be
+    shared with a published snapshot.
+
+    Args:
+        events: Events to merge into, updated in place
+        event_ids: Index of each event in events by URL, updated in place
+        rows: CSV rows
+        column_mapping: Standard field name of each CSV column
+        loaded_at: Reference for dates without a year
+
+    Returns:
+        Ids of the events that existed before and gained speakers
+    """
+    first_new_id = len(events)
+    changed_ids = set()
+    speaker_names = {}  # Speaker names already added to each event touched here, by id
+
+    for row in rows:
+        # Map the CSV columns to standard field names
+        mapped_row = {}
+        for csv_field, value in row.items():
+            if csv_field in column_mapping:
+                mapped_row[column_mapping[csv_field]] = value
+            else:
+                mapped_row[csv_field] = value
+
+        event_url = mapped_row.get('event_url', '')
+
+        # Skip rows with missing essential data
+        if not event_url or not mapped_row.get('event_name', ''):
+            continue
+
+        # If this is a new event, create a new entry
+        if event_url not in event_ids:
+            # Combine date and time for the event_date_time field
+            event_date = mapped_row.get('event_date', '')
+            event_time = mapped_row.get('event_time', '')
+            event_date_time = f"{event_date} {event_time}".strip()
+            coordinates = geocode_location(mapped_row.get('event_location', ''))
+
+            event_ids[event_url] = len(events)
+            events.append({
+                'event_name': mapped_row.get('event_name', ''),
+                'event_description': mapped_row.get('event_description', ''),
+                'event_url': event_url,
+                'event_date_time': event_date_time,
+                'event_date': event_date,
+                'event_time': event_time,
+                'starts_at': parse_event_start(event_date or event_date_time, event_time, loaded_at),
+                'event_location': mapped_row.get('event_location', ''),
+                'latitude': coordinates[0] if coordinates else None,
+                'longitude': coordinates[1] if coordinates else None,
+                'host_name': mapped_row.get('host_name', ''),
+                'speakers': [],
+                'event_detail': mapped_row.get('event_detail', '')
+            })
+        event_id = event_ids[event_url]
+
+        # Add speaker information if available
+        speaker_name = mapped_row.get('speaker_name', '')
+        if not speaker_name or speaker_name == 'Not specified':
+            continue
+
+        if event_id not in speaker_names:
+            speaker_names[event_id] = {speaker['name'] for speaker in events[event_id]['speakers']}
+        # Only add if not already in the list
+        if speaker_name in speaker_names[event_id]:
+            continue
+
+        if event_id < first_new_id and event_id not in changed_ids:
+            events[event_id] = dict(events[event_id], speakers=list(events[event_id]['speakers']))
+            changed_ids.add(event_id)
+        speaker_names[event_id].add(speaker_name)
+        events[event_id]['speakers'].append({
+            'name': speaker_name,
+            'title': mapped_row.get('speaker_title', ''),
+            'company': mapped_row.get('speaker_company', ''),
+            'details': mapped_row.get('speaker_details', '')
+        })
+
+    return changed_ids
+
+def load_events_from_csv(csv_file_path: str = CSV_FILE_PATH, tail: Optional[CsvTail] = None) -> List[Dict[str, Any]]:
     """
     Load events from the CSV file
 
     Args:
         csv_file_path: Path to the CSV file with events
+        tail: Reader to load the file with, checkpointing its end for load_appended_events_from_csv
 
     Returns:
         List of event dictionaries
@@ -71,87 +295,17 @@ def load_events_from_csv(csv_file_path: str = CSV_FILE_PATH) -> List[Dict[str, A
             return []
 
         events = []
-        event_dict = {}  # Dictionary to store events by URL to handle multiple speakers
-
-        with open(csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-
-            # Get the field names from the CSV to handle different column naming
-            field_names = reader.fieldnames
-
-            # Map standard field names to possible CSV column names
-            field_mapping = {
-                'event_name': ['event_name', 'event_title'],
-                'event_description': ['event_summary', 'event_detail'],
-                'event_date': ['event_date'],
-                'event_time': ['event_time'],
-                'event_location': ['event_location'],
-                'event_url': ['event_url'],
-                'host_name': ['host_name', 'host_company'],
-                'speaker_name': ['speaker_name'],
-                'speaker_title': ['speaker_title'],
-                'speaker_company': ['speaker_company'],
-                'speaker_details': ['speaker_details', 'speaker_detail']
-            }
+        loaded_at = datetime.now().astimezone()  # Reference for dates without a year
+
+        if tail is not None:
+            rows = tail.read_all()
+            merge_csv_rows(events, {}, rows, csv_column_mapping(tail.fieldnames), loaded_at)
+        else:
+            with open(csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
+                reader = csv.DictReader(csvfile)
+                # Get the field names from the CSV to handle different column naming
+                merge_csv_rows(events, {}, reader, csv_column_mapping(reader.fieldnames or []), loaded_at)
 
-            # Create a mapping from CSV columns to standard field names
-            column_mapping = {}
-            for std_field, possible_names in field_mapping.items():
-                for name in possible_names:
-                    if name in field_names:
-                        column_mapping[name] = std_field
-                        break
-
-            for row in reader:
-                # Map the CSV columns to standard field names
-                mapped_row = {}
-                for csv_field, value in row.items():
-                    if csv_field in column_mapping:
-                        mapped_row[column_mapping[csv_field]] = value
-                    else:
-                        mapped_row[csv_field] = value
-
-                event_url = mapped_row.get('event_url', '')
-
-                # Skip rows with missing essential data
-                if not event_url or not mapped_row.get('event_name', ''):
-                    continue
-
-                # If this is a new event, create a new entry
-                if event_url not in event_dict:
-                    # Combine date and time for the event_date_time field
-                    event_date = mapped_row.get('event_date', '')
-                    event_time = mapped_row.get('event_time', '')
-                    event_date_time = f"{event_date} {event_time}".strip()
-
-                    event_dict[event_url] = {
-                        'event_name': mapped_row.get('event_name', ''),
-                        'event_description': mapped_row.get('event_description', ''),
-                        'event_url': event_url,
-                        'event_date_time': event_date_time,
-                        'event_date': event_date,
-                        'event_time': event_time,
-                        'event_location': mapped_row.get('event_location', ''),
-                        'host_name': mapped_row.get('host_name', ''),
-                        'speakers': [],
-                        'event_detail': mapped_row.get('event_detail', '')
-                    }
-
-                # Add speaker information if available
-                speaker_name = mapped_row.get('speaker_name', '')
-                if speaker_name and speaker_name != 'Not specified':
-                    speaker_info = {
-                        'name': speaker_name,
-                        'title': mapped_row.get('speaker_title', ''),
-                        'company': mapped_row.get('speaker_company', ''),
-                        'details': mapped_row.get('speaker_details', '')
-                    }
-                    # Only add if not already in the list
-                    if not any(s.get('name') == speaker_name for s in event_dict[event_url]['speakers']):
-                        event_dict[event_url]['speakers'].append(speaker_info)
-
-        # Convert dictionary to list
-        events = list(event_dict.values())
         logger.info(f"Loaded {len(events)} events from CSV file")
         return events
 
@@ -159,6 +313,186 @@ def load_events_from_csv(csv_file_path: str = CSV_FILE_PATH) -> List[Dict[str, A
         logger.error(f"Error loading events from CSV: {str(e)}")
         return []
 
+def load_appended_events_from_csv(csv_file_path: str, events: Sequence[Dict[str, Any]], indexes: Mapping[str, Any],
+                                  tail: CsvTail) -> Optional[Tuple[List[Dict[str, Any]], List[int]]]:
+    """
+    Merge the rows appended to the CSV file since it was last read into the loaded events
+
+    Only the appended rows are parsed and deduplicated: rows are matched to events
+    through the snapshot's URL index, and new events are checked against the
+    snapshot's duplicate index. Neither index is changed; the store's updaters
+    add the new events to copies of them.
+
+    Args:
+        csv_file_path: Path to the CSV file with events
+        events: Events loaded from the file so far (not modified)
+        indexes: Indexes of the current snapshot, with the 'urls' and 'duplicates' indexes
+        tail: Reader that loaded the file
+
+    Returns:
+        Tuple of (all events, ids of existing events that gained speakers or aliases), or None
+        if the file was truncated or replaced and must be loaded in full
+    """
+    if 'urls' not in indexes or 'duplicates' not in indexes:
+        return None
+    rows = tail.read_appended()
+    if rows is None:
+        return None
+
+    merged = list(events)
+    # Rows of an alias URL add speakers to its canonical event; new URLs go in the overlay,
+    # leaving the snapshot's index untouched
+    event_ids = ChainMap({}, indexes['urls'])
+    changed_ids = merge_csv_rows(merged, event_ids, rows, csv_column_mapping(tail.fieldnames),
+                                 datetime.now().astimezone())
+    merged, alias_ids = deduplicate_events(merged, first_new_id=len(events), index=indexes['duplicates'])
+    if len(merged) > len(events) or changed_ids:
+        logger.info(f"Merged {len(merged) - len(events)} new events from {len(rows)} rows appended to {csv_file_path}")
+    return merged, sorted(changed_ids | alias_ids)
+
+def duplicate_fields(event: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Get the name, day and description that near-duplicate events are matched on"""
+    return (event.get('event_name', ''), event_date_key(event.get('event_date', ''), event.get('starts_at')),
+            event.get('event_description', ''))
+
+def deduplicate_events(events: List[Dict[str, Any]], first_new_id: int = 0,
+                       index: Optional[DuplicateIndex] = None) -> Tuple[List[Dict[str, Any]], Set[int]]:
+    """Collapse near-duplicate events from first_new_id on into their canonical events, with their URLs and speakers"""
+    return collapse_duplicates(events, duplicate_fields, merge_duplicate_event, index, first_new_id)
+
+def build_duplicate_index(events: Sequence[Dict[str, Any]]) -> DuplicateIndex:
+    """Index the MinHash signatures of deduplicated events by their position in the snapshot"""
+    return extend_duplicate_index(DuplicateIndex(), events, range(len(events)), ())
+
+def extend_duplicate_index(index: DuplicateIndex, events: Sequence[Dict[str, Any]], new_ids: Iterable[int],
+                           changed_ids: Iterable[int]) -> DuplicateIndex:
+    """Get a copy of the duplicate index with appended events added"""
+    index = index.copy()
+    for event_id in new_ids:
+        index.add(event_id, *duplicate_fields(events[event_id]))
+    return index
+
+def load_events_from_catalog(db_path: str = EVENTS_DB_PATH) -> List[Dict[str, Any]]:
+    """
+    Load events from the SQLite event catalog
+
+    Args:
+        db_path: Path to the catalog database
+
+    Returns:
+        List of event dictionaries
+    """
+    logger.info(f"Loading events from catalog: {db_path}")
+
+    try:
+        if not os.path.exists(db_path):
+            logger.error(f"Catalog file not found: {db_path}")
+            return []
+
+        with EventCatalog(db_path, readonly=True) as catalog:
+            events = catalog.get_events()
+
+        logger.info(f"Loaded {len(events)} events from catalog")
+        return events
+
+    except Exception as e:
+        logger.error(f"Error loading events from catalog: {str(e)}")
+        return []
+
+def load_events_from_parquet(parquet_path: str) -> List[Dict[str, Any]]:
+    """
+    Load the SF Bay Area events from the Parquet event store
+
+    Args:
+        parquet_path: Path to the Parquet file
+
+    Returns:
+        List of event dictionaries
+    """
+    logger.info(f"Loading events from Parquet file: {parquet_path}")
+
+    try:
+        if not os.path.exists(parquet_path):
+            logger.error(f"Parquet file not found: {parquet_path}")
+            return []
+
+        events = read_events(parquet_path, bay_area_only=True)
+        logger.info(f"Loaded {len(events)} events from Parquet file")
+        return events
+
+    except Exception as e:
+        logger.error(f"Error loading events from Parquet: {str(e)}")
+        return []
+
+def load_events(source_path: str, tail: Optional[CsvTail] = None) -> List[Dict[str, Any]]:
+    """
+    Load events from a catalog database, a Parquet file or a CSV file, based on the file extension
+
+    Near-duplicate events are collapsed, so each costs one relevance score.
+
+    Args:
+        source_path: Path to the events file
+        tail: Reader to load a CSV file with, for following rows appended to it later
+
+    Returns:
+        List of event dictionaries
+    """
+    if is_catalog_path(source_path):
+        events = load_events_from_catalog(source_path)
+    elif is_parquet_path(source_path):
+        events = load_events_from_parquet(source_path)
+    else:
+        events = load_events_from_csv(source_path, tail=tail)
+    return deduplicate_events(events)[0]
+
+def get_event_source() -> str:
+    """Get the path of the events file to serve, preferring the catalog when configured"""
+    return EVENTS_DB_PATH or CSV_FILE_PATH
+
+def build_url_index(events: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Map each event URL, and the URLs of its duplicates, to the event's index in the snapshot"""
+    return extend_url_index({}, events, range(len(events)), ())
+
+def extend_url_index(index: Dict[str, int], events: Sequence[Dict[str, Any]], new_ids: Iterable[int],
+                     changed_ids: Iterable[int]) -> Dict[str, int]:
+    """Get a copy of the URL index with appended events and new aliases added"""
+    index = dict(index)
+    for event_id in sorted(set(new_ids) | set(changed_ids)):
+        index[events[event_id]['event_url']] = event_id
+        for alias in events[event_id].get('aliases') or ():
+            index[alias] = event_id
+    return index
+
+def get_event_store() -> EventStore:
+    """
+    Get the process-wide event store, loading the events file on first use
+
+    Returns:
+        The shared EventStore instance
+    """
+    global event_store
+    if event_store is None:
+        with event_store_lock:
+            if event_store is None:
+                source = get_event_source()
+                if is_catalog_path(source) or is_parquet_path(source):
+                    store = EventStore(source, load_events, poll_interval=EVENT_STORE_POLL_INTERVAL)
+                else:
+                    # The scraper appends to the CSV file, so reloads only parse the new rows
+                    tail = CsvTail(source)
+                    store = EventStore(source, functools.partial(load_events, tail=tail),
+                                       poll_interval=EVENT_STORE_POLL_INTERVAL,
+                                       appender=functools.partial(load_appended_events_from_csv, tail=tail))
+                # BM25 weights depend on statistics of the whole corpus, so that index is rebuilt on appends
+                store.register_index('bm25', BM25Ranker)
+                store.register_index('dates', EventDateIndex, EventDateIndex.extended)
+                store.register_index('geo', GeoIndex, GeoIndex.extended)
+                store.register_index('urls', build_url_index, extend_url_index)
+                store.register_index('duplicates', build_duplicate_index, extend_duplicate_index)
+                store.start()
+                event_store = store
+    return event_store
+
 def parse_event_date(date_str: str) -> Optional[datetime]:
     """
     Parse event date string into a datetime object using multiple formats
@@ -272,6 +606,13 @@ def is_future_event(event: Dict[str, Any]) -> bool:
     Returns:
         True if the event is in the future, False otherwise
     """
+    # Use the start time normalized at load time when available; days start at midnight in the
+    # default event timezone, as in the date index
+    starts_at = event.get('starts_at')
+    if starts_at is not None:
+        event['parsed_date'] = starts_at
+        return starts_at.astimezone(default_timezone()).date() >= datetime.now(default_timezone()).date()
+
     event_date_str = event.get('event_date', '')
     event_date_time_str = event.get('event_date_time', '')
 
@@ -289,19 +630,15 @@ def is_future_event(event: Dict[str, Any]) -> bool:
     # Check if the event is in the future
     return event_date.date() >= CURRENT_DATE.date()
 
-def analyze_event_relevance(event: Dict[str, Any], keywords: List[str], user_summary: str = "", debug: bool = False) -> Dict[str, Any]:
+def format_event_data(event: Dict[str, Any]) -> str:
     """
-    Analyze the relevance of an event to the provided keywords and user summary
-    Returns a relevance score and highlight
+    Format the details of an event for a relevance prompt
 
     Args:
         event: Event dictionary
-        keywords: List of keywords to match
-        user_summary: User's self-description and interests
-        debug: Whether to print debug information
 
     Returns:
-        Dictionary with relevance score and highlight
+        Event details as prompt text
     """
     event_name = event.get('event_name', '')
     event_description = event.get('event_description', '')
@@ -339,6 +676,22 @@ def analyze_event_relevance(event: Dict[str, Any], keywords: List[str], user_sum
     Full Details: {event_detail if event_detail else 'No additional details available'}
     """
 
+    return event_data
+
+def build_relevance_prompt(event: Dict[str, Any], keywords: List[str], user_summary: str = "") -> str:
+    """
+    Build the Gemini prompt that scores one event against the keywords and user summary
+
+    Args:
+        event: Event dictionary
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+
+    Returns:
+        Prompt text
+    """
+    event_data = format_event_data(event)
+
     # Prepare prompt for Gemini with user summary if available
     user_context = f"User Summary: {user_summary}" if user_summary else "No user summary provided"
 
@@ -381,7 +734,83 @@ def analyze_event_relevance(event: Dict[str, Any], keywords: List[str], user_sum
     Format your response as a valid JSON object only, with no additional text.
     """
 
-    logger.info(f"Analyzing relevance of event: {event_name} to keywords: {keywords}")
+    return prompt
+
+def parse_relevance_response(result_text: str) -> Dict[str, Any]:
+    """
+    Parse Gemini's relevance analysis into a relevance score and highlight
+
+    Args:
+        result_text: Text of the Gemini response
+
+    Returns:
+        Dictionary with relevance score and highlight
+
+    Raises:
+        ValueError: If no JSON object can be extracted from the response
+    """
+    # Handle potential formatting issues in the response
+    try:
+        result = json.loads(result_text)
+    except json.JSONDecodeError:
+        # Try to extract JSON if it's wrapped in markdown code blocks or has extra text
+        json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
+        if json_match:
+            result = json.loads(json_match.group(1))
+        else:
+            # Last resort - try to find anything that looks like JSON
+            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
+            if json_match:
+                result = json.loads(json_match.group(0))
+            else:
+                raise ValueError("Could not extract JSON from response")
+
+    # Ensure the result has the expected fields
+    if 'relevance_score' not in result or 'highlight' not in result:
+        logger.warning(f"Incomplete response from Gemini: {result}")
+        return {
+            'relevance_score': 0.0,
+            'highlight': "Could not determine relevance (incomplete analysis)",
+            'fallback': True
+        }
+
+    # Ensure relevance_score is a float between 0 and 1
+    relevance_score = float(result['relevance_score'])
+    relevance_score = max(0.0, min(1.0, relevance_score))
+
+    return {
+        'relevance_score': relevance_score,
+        'highlight': result['highlight']
+    }
+
+def basic_relevance_result(event: Dict[str, Any], keywords: List[str]) -> Dict[str, Any]:
+    """Build a relevance result from keyword matching when Gemini is unavailable"""
+    return {
+        'relevance_score': calculate_basic_relevance(event, keywords),
+        'highlight': f"Based on keyword matching: This event may be relevant to {', '.join(keywords)}.",
+        'fallback': True
+    }
+
+async def analyze_event_relevance_async(event: Dict[str, Any], keywords: List[str], user_summary: str = "",
+                                        timeout: float = GEMINI_TIMEOUT_SECONDS) -> Dict[str, Any]:
+    """
+    Analyze the relevance of an event without blocking, for concurrent scoring
+
+    Rate-limited calls are retried with exponential backoff (waiting with asyncio.sleep),
+    and a call that takes longer than the timeout falls back to keyword matching.
+
+    Args:
+        event: Event dictionary
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+        timeout: Seconds to wait for each Gemini call
+
+    Returns:
+        Dictionary with relevance score and highlight
+    """
+    prompt = build_relevance_prompt(event, keywords, user_summary)
+
+    logger.info(f"Analyzing relevance of event: {event.get('event_name', '')} to keywords: {keywords}")
 
     # Retry logic with exponential backoff
     max_retries = 3
@@ -389,70 +818,304 @@ def analyze_event_relevance(event: Dict[str, Any], keywords: List[str], user_sum
 
     for attempt in range(max_retries):
         try:
-            logger.info(f"Sending request to Gemini for relevance analysis (attempt {attempt+1}/{max_retries})")
-            response = gemini.generate_content(prompt)
+            response = await asyncio.wait_for(gemini.generate_content_async(prompt), timeout)
+            return parse_relevance_response(response.text)
 
-            # Extract JSON from response
-            result_text = response.text
+        except asyncio.TimeoutError:
+            logger.error(f"Gemini relevance analysis timed out after {timeout:.1f}s for event: {event.get('event_name', '')}")
+            return basic_relevance_result(event, keywords)
 
-            # Handle potential formatting issues in the response
-            try:
-                result = json.loads(result_text)
-            except json.JSONDecodeError:
-                # Try to extract JSON if it's wrapped in markdown code blocks or has extra text
-                json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group(1))
-                else:
-                    # Last resort - try to find anything that looks like JSON
-                    json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                    if json_match:
-                        result = json.loads(json_match.group(0))
-                    else:
-                        raise ValueError("Could not extract JSON from response")
-
-            # Ensure the result has the expected fields
-            if 'relevance_score' not in result or 'highlight' not in result:
-                logger.warning(f"Incomplete response from Gemini: {result}")
-                return {
-                    'relevance_score': 0.0,
-                    'highlight': "Could not determine relevance (incomplete analysis)"
-                }
-
-            # Ensure relevance_score is a float between 0 and 1
-            relevance_score = float(result['relevance_score'])
-            relevance_score = max(0.0, min(1.0, relevance_score))
-
-            return {
-                'relevance_score': relevance_score,
-                'highlight': result['highlight']
+        except Exception as e:
+            logger.error(f"Error analyzing event relevance (attempt {attempt+1}/{max_retries}): {str(e)}")
+
+            # If we hit a rate limit error, wait and retry without blocking other calls
+            if "429" in str(e) and attempt < max_retries - 1:
+                delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+                logger.info(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
+                await asyncio.sleep(delay)
+                continue
+
+            return basic_relevance_result(event, keywords)
+
+    return basic_relevance_result(event, keywords)
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in a prompt (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+def build_batch_relevance_prompt(events: List[Dict[str, Any]], keywords: List[str], user_summary: str = "") -> str:
+    """
+    Build one Gemini prompt that scores several events against the keywords and user summary
+
+    The keywords, user summary and scoring rubric appear once for the whole batch.
+
+    Args:
+        events: Events to score
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+
+    Returns:
+        Prompt text
+    """
+    events_data = "\n".join(
+        f"""
+    --- Event {position} ---
+    Event URL: {event.get('event_url', '')}
+    {format_event_data(event).strip()}
+    """
+        for position, event in enumerate(events, start=1)
+    )
+
+    user_context = f"User Summary: {user_summary}" if user_summary else "No user summary provided"
+
+    prompt = f"""
+    Analyze the relevance of each of the following {len(events)} events to these keywords: {', '.join(keywords)}
+
+    {events_data}
+
+    {user_context}
+
+    For each event, consider:
+    1. How closely does the event align with the provided keywords?
+    2. Are the topics, speakers or host organization relevant to the keywords?
+    3. If a user summary is provided, how relevant is the event to this user's background, interests, and goals?
+
+    The relevance score should be:
+    - 0.0: Not relevant at all
+    - 0.3: Slightly relevant (mentions keywords but not a focus)
+    - 0.5: Moderately relevant (related to keywords)
+    - 0.7: Very relevant (directly addresses keywords)
+    - 1.0: Extremely relevant (perfectly matches keywords and user interests)
+
+    Return a JSON array with one object per event, each with:
+    1. "event_url": The Event URL exactly as given above
+    2. "relevance_score": A float between 0.0 and 1.0
+    3. "highlight": A specific, actionable explanation of why the user should (or should not) attend
+
+    Format your response as a valid JSON array only, with no additional text.
+    """
+
+    return prompt
+
+def parse_batch_relevance_response(result_text: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse Gemini's batched relevance analysis
+
+    Args:
+        result_text: Text of the Gemini response
+
+    Returns:
+        Dictionary of event URL to relevance score and highlight, for the items that parsed correctly
+
+    Raises:
+        ValueError: If no JSON array can be extracted from the response
+    """
+    try:
+        items = json.loads(result_text)
+    except json.JSONDecodeError:
+        # Try to extract JSON if it's wrapped in markdown code blocks or has extra text
+        json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
+        if json_match:
+            items = json.loads(json_match.group(1))
+        else:
+            json_match = re.search(r'\[.*\]', result_text, re.DOTALL)
+            if json_match:
+                items = json.loads(json_match.group(0))
+            else:
+                raise ValueError("Could not extract JSON array from response")
+
+    if not isinstance(items, list):
+        raise ValueError("Batched relevance response is not a JSON array")
+
+    results = {}
+    for item in items:
+        try:
+            results[item['event_url']] = {
+                'relevance_score': max(0.0, min(1.0, float(item['relevance_score']))),
+                'highlight': item['highlight']
             }
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Skipping malformed item in batched relevance response: {item}")
+
+    return results
+
+def plan_relevance_batches(events: List[Dict[str, Any]], keywords: List[str], user_summary: str = "",
+                           batch_size: int = RELEVANCE_BATCH_SIZE,
+                           token_budget: int = RELEVANCE_BATCH_TOKEN_BUDGET) -> List[List[int]]:
+    """
+    Split events into batches of at most batch_size events whose prompts fit the token budget
+
+    Args:
+        events: Events to score
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+        batch_size: Maximum number of events per batch
+        token_budget: Maximum estimated prompt tokens per batch
+
+    Returns:
+        List of batches, each a list of indexes into events
+    """
+    overhead = estimate_tokens(build_batch_relevance_prompt([], keywords, user_summary))
+
+    batches = []
+    current = []
+    current_tokens = overhead
+    for index, event in enumerate(events):
+        event_tokens = estimate_tokens(format_event_data(event)) + 20
+        if current and (len(current) >= batch_size or current_tokens + event_tokens > token_budget):
+            batches.append(current)
+            current = []
+            current_tokens = overhead
+        current.append(index)
+        current_tokens += event_tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+async def analyze_event_batch_async(events: List[Dict[str, Any]], keywords: List[str], user_summary: str = "",
+                                    timeout: float = GEMINI_TIMEOUT_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Analyze the relevance of several events with one Gemini call
+
+    If the whole response cannot be parsed, the batch is split in half and retried;
+    events missing from an otherwise valid response fall back to single-event analysis.
+
+    Args:
+        events: Events to score
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+        timeout: Seconds to wait for each Gemini call
+
+    Returns:
+        List of relevance results, in the same order as events
+    """
+    if len(events) == 1:
+        return [await analyze_event_relevance_async(events[0], keywords, user_summary, timeout=timeout)]
+
+    prompt = build_batch_relevance_prompt(events, keywords, user_summary)
+
+    logger.info(f"Analyzing relevance of {len(events)} events in one batch to keywords: {keywords}")
+
+    # Retry logic with exponential backoff
+    max_retries = 3
+    base_delay = 2  # seconds
+
+    parsed = None
+    for attempt in range(max_retries):
+        try:
+            response = await asyncio.wait_for(gemini.generate_content_async(prompt), timeout)
+            parsed = parse_batch_relevance_response(response.text)
+            break
+
+        except asyncio.TimeoutError:
+            logger.error(f"Batched relevance analysis timed out after {timeout:.1f}s")
+            return [basic_relevance_result(event, keywords) for event in events]
 
         except Exception as e:
-            logger.error(f"Error analyzing event relevance (attempt {attempt+1}/{max_retries}): {str(e)}")
+            logger.error(f"Error in batched relevance analysis (attempt {attempt+1}/{max_retries}): {str(e)}")
 
-            # If we hit a rate limit error, wait and retry
             if "429" in str(e) and attempt < max_retries - 1:
-                # Calculate delay with exponential backoff and jitter
                 delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
                 logger.info(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
+                await asyncio.sleep(delay)
                 continue
+            break
+
+    if parsed is None:
+        # Smaller batches are less likely to be truncated or malformed
+        middle = len(events) // 2
+        logger.info(f"Splitting batch of {len(events)} events after a failed response")
+        first_half, second_half = await asyncio.gather(
+            analyze_event_batch_async(events[:middle], keywords, user_summary, timeout=timeout),
+            analyze_event_batch_async(events[middle:], keywords, user_summary, timeout=timeout)
+        )
+        return first_half + second_half
+
+    results = []
+    for event in events:
+        result = parsed.get(event.get('event_url', ''))
+        if result is None:
+            logger.warning(f"No batched result for event: {event.get('event_name', '')}; analyzing it individually")
+            result = await analyze_event_relevance_async(event, keywords, user_summary, timeout=timeout)
+        results.append(result)
+
+    return results
+
+def analyze_events_concurrently(events: List[Dict[str, Any]], keywords: List[str], user_summary: str = "",
+                                budget_seconds: Optional[float] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Analyze the relevance of events with concurrent Gemini calls
 
-            # If it's the last attempt or not a rate limit error, return a default response
-            if attempt == max_retries - 1:
-                # For the last attempt, provide a basic relevance score based on keyword matching
-                basic_score = calculate_basic_relevance(event, keywords)
-                return {
-                    'relevance_score': basic_score,
-                    'highlight': f"Based on keyword matching: This event may be relevant to {', '.join(keywords)}."
-                }
+    Each event is annotated with relevance_score and relevance_highlight as its call finishes.
+    Events whose calls do not finish within the budget are left unchanged.
 
-    # This should not be reached, but just in case
-    return {
-        'relevance_score': 0.0,
-        'highlight': "Could not determine relevance (API error)"
-    }
+    Args:
+        events: Event dictionaries to annotate
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+        budget_seconds: Seconds to wait for all calls (None waits for all)
+        batch_size: Events per Gemini prompt, defaults to RELEVANCE_BATCH_SIZE
+
+    Returns:
+        Number of events analyzed
+    """
+    new_results = []
+
+    def apply_result(event: Dict[str, Any], result: Dict[str, Any]) -> None:
+        event['relevance_score'] = result.get('relevance_score', 0.0)
+        event['relevance_highlight'] = result.get('highlight', 'No highlight available')
+        if not result.get('fallback'):
+            new_results.append((cache_keys[id(event)], result))
+
+    # Serve repeat analyses from the relevance cache
+    cache_keys = {}
+    uncached_events = []
+    for event in events:
+        key = relevance_cache_key(event, keywords, user_summary)
+        cached = relevance_cache.get(key)
+        if cached is not None:
+            event['relevance_score'] = cached['relevance_score']
+            event['relevance_highlight'] = cached['highlight']
+        else:
+            cache_keys[id(event)] = key
+            uncached_events.append(event)
+
+    cache_hits = len(events) - len(uncached_events)
+    if cache_hits:
+        logger.info(f"Relevance cache hits: {cache_hits}/{len(events)} events")
+    if not uncached_events:
+        return cache_hits
+
+    batch_size = batch_size or RELEVANCE_BATCH_SIZE
+    if batch_size <= 1:
+        results = scoring_executor.score(
+            uncached_events,
+            lambda event: analyze_event_relevance_async(event, keywords, user_summary, timeout=GEMINI_TIMEOUT_SECONDS),
+            budget=budget_seconds,
+            on_result=lambda index, result: apply_result(uncached_events[index], result)
+        )
+        analyzed = len(results)
+    else:
+        batches = [[uncached_events[index] for index in batch]
+                   for batch in plan_relevance_batches(uncached_events, keywords, user_summary, batch_size=batch_size,
+                                                       token_budget=RELEVANCE_BATCH_TOKEN_BUDGET)]
+        logger.info(f"Analyzing {len(uncached_events)} events in {len(batches)} batched Gemini calls")
+
+        def apply_batch(index: int, batch_results: List[Dict[str, Any]]) -> None:
+            for event, result in zip(batches[index], batch_results):
+                apply_result(event, result)
+
+        results = scoring_executor.score(
+            batches,
+            lambda batch: analyze_event_batch_async(batch, keywords, user_summary, timeout=GEMINI_TIMEOUT_SECONDS),
+            budget=budget_seconds,
+            on_result=apply_batch
+        )
+        analyzed = sum(len(batches[index]) for index in results)
+
+    relevance_cache.put_many(new_results)
+    return cache_hits + analyzed
 
 def calculate_basic_relevance(event: Dict[str, Any], keywords: List[str]) -> float:
     """
@@ -506,41 +1169,105 @@ def calculate_basic_relevance(event: Dict[str, Any], keywords: List[str]) -> flo
     raw_score = (match_count / keyword_count)
     return min(0.7, raw_score * 0.7)
 
-def calculate_combined_score(event: Dict[str, Any]) -> float:
+def days_until_events(events: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Calculate a combined score based on relevance and recency
+    Get the whole days until each event as an array
 
     Args:
-        event: Event dictionary with relevance_score and parsed_date
+        events: Event dictionaries with parsed_date (timezone-aware, naive, or missing)
 
     Returns:
-        Combined score between 0.0 and 1.0
+        Tuple of (days until each event, boolean mask of events with a parsed date)
     """
-    relevance_score = event.get('relevance_score', 0.0)
+    now = time.time()
+    seconds_until = np.full(len(events), np.nan)
+    for position, event in enumerate(events):
+        parsed_date = event.get('parsed_date')
+        if parsed_date:
+            # Naive dates come from the fallback parser and are compared with CURRENT_DATE as before
+            reference = now if parsed_date.tzinfo else CURRENT_DATE.timestamp()
+            seconds_until[position] = parsed_date.timestamp() - reference
 
-    # Calculate recency score (1.0 for today, decreasing as event gets further away)
-    parsed_date = event.get('parsed_date')
+    has_date = ~np.isnan(seconds_until)
+    days_until = np.floor(np.where(has_date, seconds_until, 0.0) / 86400.0)
+    return days_until, has_date
 
-    # If we don't have a parsed date, rely only on relevance
-    if not parsed_date:
-        return relevance_score
+def rank_events(events: List[Dict[str, Any]], max_results: int) -> List[Dict[str, Any]]:
+    """
+    Rank events by combined relevance and recency score and keep the top results
 
-    days_until_event = (parsed_date - CURRENT_DATE).days
+    Scores are computed for all events in one vectorized pass, and only the top
+    results are sorted.
 
-    # Normalize to a 0-1 scale (closer to 1 means more recent)
-    # Use a logarithmic scale to prevent far-future events from getting too low a score
-    recency_score = 1.0 / (1.0 + math.log(1 + max(0, days_until_event)))
+    Args:
+        events: Event dictionaries with relevance_score and parsed_date
+        max_results: Maximum number of results to return
+
+    Returns:
+        Top events, highest combined score first, annotated with combined_score and recency_score
+    """
+    if not events:
+        return []
 
-    # Store the recency score for reference
-    event['recency_score'] = recency_score
+    relevance = np.fromiter((event.get('relevance_score', 0.0) for event in events), dtype=np.float64, count=len(events))
+    days_until, has_date = days_until_events(events)
+    recency = recency_scores(days_until, RECENCY_CURVE, RECENCY_HALF_LIFE_DAYS, RECENCY_STEPS)
+    scores = combined_scores(relevance, recency, has_date, RECENCY_WEIGHT)
+
+    top_events = []
+    for position in top_k_indices(scores, max_results):
+        event = events[position]
+        event['combined_score'] = float(scores[position])
+        if has_date[position]:
+            event['recency_score'] = float(recency[position])
+        top_events.append(event)
+    return top_events
+
+def score_events_bm25(events: List[Dict[str, Any]], event_ids: List[int], ranker: BM25Ranker, keywords: List[str]) -> None:
+    """
+    Score events with the local BM25 ranker instead of Gemini
+
+    Args:
+        events: Event dictionaries to annotate with relevance_score and relevance_highlight
+        event_ids: Position of each event in the ranker's corpus
+        ranker: BM25 ranker built over the current snapshot
+        keywords: List of keywords to match
+    """
+    scores = ranker.score(keywords)
+
+    for event, event_id in zip(events, event_ids):
+        event['relevance_score'] = float(scores[event_id])
+        matches = ranker.matched_keywords(event_id, keywords)
+        if matches:
+            event['relevance_highlight'] = f"Based on keyword matching: This event covers {', '.join(matches)}."
+        else:
+            event['relevance_highlight'] = f"Based on keyword matching: This event may be relevant to {', '.join(keywords)}."
+
+def rerank_events(candidates: List[Dict[str, Any]], keywords: List[str], user_summary: str = "",
+                  budget_seconds: float = RERANK_BUDGET_SECONDS, batch_size: Optional[int] = None) -> int:
+    """
+    Rerank retrieved candidates with concurrent Gemini calls within a latency budget
 
-    # Calculate combined score with configurable weight
-    # Formula: (1-w) * relevance + w * recency
-    combined_score = (1 - RECENCY_WEIGHT) * relevance_score + RECENCY_WEIGHT * recency_score
+    Candidates whose calls do not finish before the budget runs out keep their retriever scores.
 
-    return combined_score
+    Args:
+        candidates: Candidate events ordered by retriever score
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+        budget_seconds: Maximum time to wait for Gemini calls
+        batch_size: Candidates per Gemini prompt, defaults to RELEVANCE_BATCH_SIZE
 
-def find_top_events(keywords: List[str], max_results: int = 5, user_summary: str = "") -> List[Dict[str, Any]]:
+    Returns:
+        Number of candidates reranked by Gemini
+    """
+    return analyze_events_concurrently(candidates, keywords, user_summary, budget_seconds=budget_seconds,
+                                       batch_size=batch_size)
+
+def find_top_events(keywords: List[str], max_results: int = 5, user_summary: str = "", scorer: Optional[str] = None,
+                    timings: Optional[Dict[str, float]] = None, top_k: Optional[int] = None,
+                    rerank_budget: Optional[float] = None, batch_size: Optional[int] = None,
+                    date_window: Optional[str] = None, zip_code: Optional[str] = None,
+                    radius_miles: Optional[float] = None) -> List[Dict[str, Any]]:
     """
     Find the top events for the given keywords and user summary
 
@@ -548,23 +1275,91 @@ def find_top_events(keywords: List[str], max_results: int = 5, user_summary: str
         keywords: List of keywords to match
         max_results: Maximum number of results to return
         user_summary: User's self-description and interests
+        scorer: Relevance scorer to use ("gemini", "bm25" or "pipeline"), defaults to DEFAULT_SCORER
+        timings: Optional dictionary that receives the time spent in each stage, in milliseconds
+        top_k: Number of candidates reranked in pipeline mode, defaults to RERANK_TOP_K
+        rerank_budget: Seconds the rerank stage may take in pipeline mode, defaults to RERANK_BUDGET_SECONDS
+        batch_size: Events per Gemini prompt, defaults to RELEVANCE_BATCH_SIZE
+        date_window: Only include events starting in this window, e.g. "this_week" or "next 30 days"
+        zip_code: Only include events within radius_miles of this US ZIP code
+        radius_miles: Radius of the ZIP code search, defaults to DEFAULT_RADIUS_MILES
 
     Returns:
-        List of event dictionaries with relevance scores
+        List of event dictionaries with relevance scores (and distance_miles for ZIP code searches)
+
+    Raises:
+        ValueError: If the scorer, date window or ZIP code is not recognized
     """
-    logger.info(f"Finding top {max_results} events for keywords: {keywords}")
+    scorer = (scorer or DEFAULT_SCORER).lower()
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown scorer: {scorer}")
+    if timings is None:
+        timings = {}
+
+    logger.info(f"Finding top {max_results} events for keywords: {keywords} (scorer: {scorer})")
     if user_summary:
         logger.info(f"Using user summary: {user_summary[:50]}...")
 
-    # Step 1: Load events from CSV
-    all_events = load_events_from_csv()
+    stage_start = time.perf_counter()
+
+    def end_stage(name: str) -> None:
+        nonlocal stage_start
+        now = time.perf_counter()
+        timings[name] = round((now - stage_start) * 1000, 1)
+        stage_start = now
+
+    # Step 1: Get the current snapshot from the resident event store
+    snapshot = get_event_store().get_snapshot()
+    all_events = snapshot.events
+    end_stage('load')
 
     if not all_events:
         logger.warning("No events found to analyze")
         return []
 
-    # Step 2: Filter to future events only
-    future_events = [event for event in all_events if is_future_event(event)]
+    # Step 2: Filter to future events (or the requested date window) with the date index,
+    # and to events near the ZIP code with the geo index
+    distances = None
+    if zip_code:
+        geo_index = snapshot.indexes.get('geo') or GeoIndex(all_events)
+        nearby = geo_index.ids_near_zip(zip_code, radius_miles or DEFAULT_RADIUS_MILES)
+        if nearby is None:
+            raise ValueError(f"Unknown ZIP code: {zip_code}")
+        distances = dict(nearby)
+
+    # Snapshot events are shared between requests, so annotate copies
+    date_index = snapshot.indexes.get('dates')
+    future_events = []
+    future_event_ids = []
+    if date_index is not None:
+        if date_window:
+            candidate_ids = date_index.window_ids(date_window)
+        else:
+            candidate_ids = date_index.upcoming_ids()
+
+        # Keep the snapshot order so ties rank the same as a full scan
+        for event_id in sorted(candidate_ids):
+            if distances is not None and event_id not in distances:
+                continue
+            event = dict(all_events[event_id])
+            event['parsed_date'] = event.get('starts_at')
+            future_events.append(event)
+            future_event_ids.append(event_id)
+    else:
+        if date_window:
+            raise ValueError("Date windows require the date index")
+        for event_id, event in enumerate(all_events):
+            if distances is not None and event_id not in distances:
+                continue
+            event = dict(event)
+            if is_future_event(event):
+                future_events.append(event)
+                future_event_ids.append(event_id)
+
+    if distances is not None:
+        for event, event_id in zip(future_events, future_event_ids):
+            event['distance_miles'] = round(distances[event_id], 1)
+    end_stage('filter')
 
     if not future_events:
         logger.warning("No future events found")
@@ -572,30 +1367,180 @@ def find_top_events(keywords: List[str], max_results: int = 5, user_summary: str
 
     logger.info(f"Found {len(future_events)} future events out of {len(all_events)} total events")
 
-    # Step 3: Analyze relevance of each future event with user_summary
-    analyzed_events = []
-    for event in future_events:
-        logger.info(f"Processing event: {event.get('event_name')}")
+    # Step 3: Score the relevance of each future event
+    ranker = snapshot.indexes.get('bm25')
+    if scorer in ('bm25', 'pipeline') and ranker is None:
+        logger.warning("BM25 index not available, falling back to Gemini scoring")
+        scorer = 'gemini'
+
+    if scorer == 'bm25':
+        score_events_bm25(future_events, future_event_ids, ranker, keywords)
+        analyzed_events = future_events
+        end_stage('score')
+    elif scorer == 'pipeline':
+        # Stage 1: retrieve the top K candidates with BM25
+        score_events_bm25(future_events, future_event_ids, ranker, keywords)
+        top_k = max(top_k or RERANK_TOP_K, max_results)
+        analyzed_events = heapq.nlargest(top_k, future_events, key=lambda x: x.get('relevance_score', 0.0))
+        end_stage('retrieve')
+
+        # Stage 2: rerank only the candidates with Gemini
+        budget = RERANK_BUDGET_SECONDS if rerank_budget is None else rerank_budget
+        reranked = rerank_events(analyzed_events, keywords, user_summary, budget_seconds=budget, batch_size=batch_size)
+        logger.info(f"Reranked {reranked} of {len(analyzed_events)} candidates from {len(future_events)} future events")
+        end_stage('rerank')
+    else:
+        # Events whose Gemini calls fail outright fall back to keyword matching
+        for event in future_events:
+            event['relevance_score'] = calculate_basic_relevance(event, keywords)
+            event['relevance_highlight'] = f"Based on keyword matching: This event may be relevant to {', '.join(keywords)}."
+
+        logger.info(f"Analyzing {len(future_events)} events with up to {scoring_executor.max_concurrency} concurrent Gemini calls")
+        analyze_events_concurrently(future_events, keywords, user_summary, batch_size=batch_size)
+        analyzed_events = future_events
+        end_stage('score')
+
+    # Steps 4-5: Calculate combined scores (relevance + recency) and select the top results
+    top_events = rank_events(analyzed_events, max_results)
+    end_stage('rank')
+
+    # Step 6: Return top results
+    logger.info(f"Returning top {len(top_events)} events")
+    return top_events
+
+def search_top_events(keywords: List[str], max_results: int = 5, user_summary: str = "", scorer: Optional[str] = None,
+                      top_k: Optional[int] = None, rerank_budget: Optional[float] = None,
+                      batch_size: Optional[int] = None, date_window: Optional[str] = None,
+                      zip_code: Optional[str] = None, radius_miles: Optional[float] = None):
+    """
+    Find the top events, reusing the cached result of an identical earlier search
+
+    Results are cached per snapshot version until QUERY_CACHE_TTL_SECONDS pass, the
+    next event starts or the day rolls over, whichever comes first. Identical searches
+    running at the same time share one computation.
 
-        # Analyze relevance with user summary
-        relevance_result = analyze_event_relevance(event, keywords, user_summary)
+    Args:
+        keywords: List of keywords to match
+        max_results: Maximum number of results to return
+        user_summary: User's self-description and interests
+        scorer: Relevance scorer to use, defaults to DEFAULT_SCORER
+        top_k: Number of candidates reranked in pipeline mode
+        rerank_budget: Seconds the rerank stage may take in pipeline mode
+        batch_size: Events per Gemini prompt
+        date_window: Only include events starting in this window
+        zip_code: Only include events within radius_miles of this US ZIP code
+        radius_miles: Radius of the ZIP code search
 
-        # Add relevance data to event
-        event['relevance_score'] = relevance_result.get('relevance_score', 0.0)
-        event['relevance_highlight'] = relevance_result.get('highlight', 'No highlight available')
+    Returns:
+        Tuple of (list of event dictionaries, stage timings in milliseconds, whether the result was cached)
+    """
+    scorer = (scorer or DEFAULT_SCORER).lower()
+    timings = {}
+
+    def compute():
+        events = find_top_events(keywords, max_results=max_results, user_summary=user_summary, scorer=scorer,
+                                 timings=timings, top_k=top_k, rerank_budget=rerank_budget, batch_size=batch_size,
+                                 date_window=date_window, zip_code=zip_code, radius_miles=radius_miles)
+        expires_at = time.time() + QUERY_CACHE_TTL_SECONDS
+        date_index = snapshot.indexes.get('dates')
+        if date_index is not None:
+            expires_at = min(expires_at, date_index.next_change().timestamp())
+        return events, expires_at
+
+    snapshot = get_event_store().get_snapshot()
+    if QUERY_CACHE_TTL_SECONDS <= 0:
+        events, _ = compute()
+        return events, timings, False
+
+    lookup_start = time.perf_counter()
+    key = (
+        tuple(normalize_keywords(keywords)),
+        hashlib.sha1(user_summary.strip().encode('utf-8')).hexdigest(),
+        max_results, scorer, top_k, rerank_budget, batch_size,
+        normalize_window_name(date_window) if date_window else None,
+        zip_code, radius_miles
+    )
+    events, cached = query_cache.get_or_compute(key, snapshot.version, compute)
+    if cached:
+        timings = {'cache': round((time.perf_counter() - lookup_start) * 1000, 1)}
+
+    # Cached events are shared between requests, so hand out copies
+    return [dict(event) for event in events], timings, cached
+
+def parse_fields(fields: Any) -> Optional[tuple]:
+    """
+    Parse the fields requested for search results
 
-        analyzed_events.append(event)
+    Args:
+        fields: List or comma-separated string of field names, "full" for every field, or None for the compact view
 
-    # Step 4: Calculate combined scores (relevance + recency)
-    for event in analyzed_events:
-        event['combined_score'] = calculate_combined_score(event)
+    Returns:
+        Tuple of field names, or None for every field
 
-    # Step 5: Sort by combined score (highest first)
-    sorted_events = sorted(analyzed_events, key=lambda x: x.get('combined_score', 0.0), reverse=True)
+    Raises:
+        ValueError: If a field name is not recognized
+    """
+    if not fields:
+        return COMPACT_FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    fields = tuple(field.strip() for field in fields if field and field.strip())
+    if fields in (('full',), ('*',)):
+        return None
 
-    # Step 6: Return top results
-    logger.info(f"Returning top {min(max_results, len(sorted_events))} events")
-    return sorted_events[:max_results]
+    unknown = [field for field in fields if field not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def project_event(event: Dict[str, Any], fields: Optional[tuple]) -> Dict[str, Any]:
+    """
+    Keep only the requested fields of an event, with datetimes as ISO 8601 strings
+
+    Args:
+        event: Event dictionary
+        fields: Field names to keep, or None for every field
+
+    Returns:
+        New event dictionary
+    """
+    names = event.keys() if fields is None else [field for field in fields if field in event]
+    projected = {}
+    for name in names:
+        value = event[name]
+        projected[name] = value.isoformat() if isinstance(value, datetime) else value
+    return projected
+
+def add_formatted_date(event: Dict[str, Any]) -> None:
+    """Add the display date of an event as formatted_date"""
+    event_date = event.get('event_date', '')
+    event_time = event.get('event_time', '')
+
+    if event_date and event_time:
+        event['formatted_date'] = f"{format_date(event_date)} at {event_time}"
+    elif event_date:
+        event['formatted_date'] = format_date(event_date)
+    else:
+        event['formatted_date'] = format_date(event.get('event_date_time', 'Date not specified'))
+
+def encode_cursor(offset: int, version: int, query_id: str) -> str:
+    """Encode the position of the next page of a search as an opaque cursor"""
+    payload = json.dumps({'o': offset, 'v': version, 'q': query_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor from encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return {'offset': int(payload['o']), 'version': int(payload['v']), 'query_id': str(payload['q'])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
 
 def format_date(date_str: str) -> str:
     """
@@ -689,32 +1634,88 @@ def search_events():
     keywords = data.get('keywords', '').split(',')
     keywords = [k.strip() for k in keywords if k.strip()]
     user_summary = data.get('user_summary', '')
+    scorer = (data.get('scorer') or DEFAULT_SCORER).lower()
 
     if not keywords:
         return jsonify({"success": False, "error": "No keywords provided"}), 400
 
-    try:
-        # Set max results to 10 (more than the 5 default)
-        max_results = 10
+    if scorer not in SCORERS:
+        return jsonify({"success": False, "error": f"Unknown scorer: {scorer}"}), 400
 
-        # Find top events for the keywords with user summary
-        events = find_top_events(keywords, max_results=max_results, user_summary=user_summary)
+    date_window = data.get('date_window') or None
+    if date_window and not is_date_window(date_window):
+        windows = ', '.join(DATE_WINDOWS + ('next_N_days',))
+        return jsonify({"success": False, "error": f"Unknown date window: {date_window} (expected one of {windows})"}), 400
 
-        # Format dates for display
-        for event in events:
-            event_date = event.get('event_date', '')
-            event_time = event.get('event_time', '')
+    try:
+        top_k = int(data['top_k']) if data.get('top_k') is not None else None
+        rerank_budget = float(data['rerank_budget']) if data.get('rerank_budget') is not None else None
+        batch_size = int(data['batch_size']) if data.get('batch_size') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "top_k, rerank_budget and batch_size must be numbers"}), 400
+
+    zip_code = str(data['zip_code']).strip() if data.get('zip_code') else None
+    if zip_code and zip_centroid(zip_code) is None:
+        return jsonify({"success": False, "error": f"Unknown ZIP code: {zip_code}"}), 400
+    try:
+        radius_miles = float(data['radius_miles']) if data.get('radius_miles') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "radius_miles must be a number"}), 400
+    if radius_miles is not None and radius_miles <= 0:
+        return jsonify({"success": False, "error": "radius_miles must be positive"}), 400
 
-            if event_date and event_time:
-                event['formatted_date'] = f"{format_date(event_date)} at {event_time}"
-            elif event_date:
-                event['formatted_date'] = format_date(event_date)
-            else:
-                event['formatted_date'] = format_date(event.get('event_date_time', 'Date not specified'))
+    try:
+        fields = parse_fields(data.get('fields'))
+        limit = int(data['limit']) if data.get('limit') is not None else SEARCH_PAGE_SIZE
+        limit = max(1, min(limit, SEARCH_RESULT_DEPTH))
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    # Cursors are only valid for the search and event data they were issued for
+    query_id = hashlib.sha1(json.dumps(
+        [normalize_keywords(keywords), user_summary.strip(), scorer, top_k, rerank_budget, batch_size, date_window,
+         zip_code, radius_miles]
+    ).encode('utf-8')).hexdigest()[:16]
+    version = get_event_store().get_snapshot().version
+    offset = 0
+    if data.get('cursor'):
+        try:
+            cursor = decode_cursor(data['cursor'])
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        if cursor['query_id'] != query_id:
+            return jsonify({"success": False, "error": "Cursor does not belong to this search"}), 400
+        if cursor['version'] != version:
+            return jsonify({"success": False, "error": "Events changed since this cursor was issued; search again"}), 409
+        offset = max(0, cursor['offset'])
 
+    try:
+        # Rank one list deep enough for several pages; in pipeline mode only the reranked candidates are ranked
+        if scorer == 'pipeline':
+            max_results = max(top_k or RERANK_TOP_K, limit)
+        else:
+            max_results = max(SEARCH_RESULT_DEPTH, limit)
+
+        # Find top events for the keywords with user summary, reusing identical recent searches
+        events, timings, cached = search_top_events(keywords, max_results=max_results, user_summary=user_summary,
+                                                    scorer=scorer, top_k=top_k, rerank_budget=rerank_budget,
+                                                    batch_size=batch_size, date_window=date_window,
+                                                    zip_code=zip_code, radius_miles=radius_miles)
+
+        # Format dates for display and project the requested fields, for this page only
+        page = events[offset:offset + limit]
+        for event in page:
+            add_formatted_date(event)
+        page = [project_event(event, fields) for event in page]
+
+        next_offset = offset + limit
         return jsonify({
             "success": True,
-            "events": events
+            "events": page,
+            "total": len(events),
+            "next_cursor": encode_cursor(next_offset, version, query_id) if next_offset < len(events) else None,
+            "timings": timings,
+            "cached": cached
         })
     except Exception as e:
         logger.error(f"Error in search_events: {str(e)}")
@@ -723,6 +1724,37 @@ def search_events():
             "error": f"An error occurred: {str(e)}"
         }), 500
 
+@app.route('/api/event_detail')
+def get_event_detail():
+    """API endpoint to get the full details of one event, by URL"""
+    event_url = request.args.get('url', '')
+    if not event_url:
+        return jsonify({"success": False, "error": "No event URL provided"}), 400
+
+    snapshot = get_event_store().get_snapshot()
+    url_index = snapshot.indexes.get('urls')
+    if url_index is not None:
+        event_id = url_index.get(event_url)
+        event = snapshot.events[event_id] if event_id is not None else None
+    else:
+        event = next((event for event in snapshot.events if event.get('event_url') == event_url), None)
+
+    if event is None:
+        return jsonify({"success": False, "error": f"Event not found: {event_url}"}), 404
+
+    event = dict(event)
+    add_formatted_date(event)
+    return jsonify({"success": True, "event": project_event(event, None)})
+
+@app.route('/api/cache_stats')
+def get_cache_stats():
+    """API endpoint to get relevance and query cache hit/miss counters"""
+    return jsonify({
+        "success": True,
+        "relevance_cache": relevance_cache.get_stats(),
+        "query_cache": query_cache.get_stats()
+    })
+
 @app.route('/api/logs')
 def get_logs():
     """API endpoint to get logs"""
@@ -757,8 +1789,18 @@ def main():
         parser.add_argument('--host', type=str, default='0.0.0.0', help='Host to run the server on')
         parser.add_argument('--port', type=int, default=5000, help='Port to run the server on')
         parser.add_argument('--debug', action='store_true', help='Run in debug mode')
-        parser.add_argument('--csv', type=str, help='Path to CSV file with events')
+        parser.add_argument('--csv', type=str, help='Path to CSV or Parquet file with events')
+        parser.add_argument('--db', type=str, help='Path to SQLite event catalog (used instead of the CSV file)')
         parser.add_argument('--recency-weight', type=float, help='Weight for recency in scoring (0.0-1.0, default: 0.2)')
+        parser.add_argument('--recency-curve', type=str, choices=RECENCY_CURVES, help='Recency curve (default: log)')
+        parser.add_argument('--recency-half-life', type=float, help='Days for the exp recency curve to halve (default: 14)')
+        parser.add_argument('--recency-steps', type=str, help='Step recency curve bands as max_days:score pairs (default: 7:1.0,30:0.5,90:0.25)')
+        parser.add_argument('--scorer', type=str, choices=SCORERS, help='Default relevance scorer (default: gemini)')
+        parser.add_argument('--max-concurrency', type=int, help='Maximum number of concurrent Gemini calls (default: 5)')
+        parser.add_argument('--gemini-timeout', type=float, help='Seconds to wait for each Gemini call (default: 20)')
+        parser.add_argument('--batch-size', type=int, help='Events per Gemini relevance prompt (default: 1, no batching)')
+        parser.add_argument('--rerank-top-k', type=int, help='Number of BM25 candidates reranked by Gemini in pipeline mode (default: 20)')
+        parser.add_argument('--rerank-budget', type=float, help='Seconds the Gemini rerank stage may take in pipeline mode (default: 30)')
 
         args = parser.parse_args()
 
@@ -768,23 +1810,83 @@ def main():
             CSV_FILE_PATH = args.csv
             logger.info(f"Using CSV file: {CSV_FILE_PATH}")
 
+        # Set catalog path if provided
+        global EVENTS_DB_PATH
+        if args.db:
+            EVENTS_DB_PATH = args.db
+            logger.info(f"Using event catalog: {EVENTS_DB_PATH}")
+
         # Set recency weight if provided
         global RECENCY_WEIGHT
         if args.recency_weight is not None:
             RECENCY_WEIGHT = max(0.0, min(1.0, args.recency_weight))
             logger.info(f"Setting recency weight to {RECENCY_WEIGHT}")
 
+        # Set recency curve parameters if provided
+        global RECENCY_CURVE, RECENCY_HALF_LIFE_DAYS, RECENCY_STEPS
+        if args.recency_curve:
+            RECENCY_CURVE = args.recency_curve
+            logger.info(f"Setting recency curve to {RECENCY_CURVE}")
+        if args.recency_half_life is not None:
+            RECENCY_HALF_LIFE_DAYS = max(0.1, args.recency_half_life)
+            logger.info(f"Setting recency half-life to {RECENCY_HALF_LIFE_DAYS} days")
+        if args.recency_steps:
+            RECENCY_STEPS = parse_recency_steps(args.recency_steps)
+            logger.info(f"Setting recency steps to {RECENCY_STEPS}")
+
+        # Set default scorer if provided
+        global DEFAULT_SCORER
+        if args.scorer:
+            DEFAULT_SCORER = args.scorer
+            logger.info(f"Setting default scorer to {DEFAULT_SCORER}")
+
+        # Set Gemini concurrency and timeout if provided
+        global GEMINI_TIMEOUT_SECONDS
+        if args.max_concurrency is not None:
+            scoring_executor.max_concurrency = max(1, args.max_concurrency)
+            logger.info(f"Setting max Gemini concurrency to {scoring_executor.max_concurrency}")
+        if args.gemini_timeout is not None:
+            GEMINI_TIMEOUT_SECONDS = max(1.0, args.gemini_timeout)
+            logger.info(f"Setting Gemini timeout to {GEMINI_TIMEOUT_SECONDS}s")
+
+        # Set relevance batch size if provided
+        global RELEVANCE_BATCH_SIZE
+        if args.batch_size is not None:
+            RELEVANCE_BATCH_SIZE = max(1, args.batch_size)
+            logger.info(f"Setting relevance batch size to {RELEVANCE_BATCH_SIZE}")
+
+        # Set pipeline parameters if provided
+        global RERANK_TOP_K, RERANK_BUDGET_SECONDS
+        if args.rerank_top_k is not None:
+            RERANK_TOP_K = max(1, args.rerank_top_k)
+            logger.info(f"Setting rerank top K to {RERANK_TOP_K}")
+        if args.rerank_budget is not None:
+            RERANK_BUDGET_SECONDS = max(0.0, args.rerank_budget)
+            logger.info(f"Setting rerank budget to {RERANK_BUDGET_SECONDS}s")
+
         # Log startup information
         logger.info(f"Starting Combined Event Search Agent")
         logger.info(f"Debug mode: {args.debug}")
-        logger.info(f"CSV file: {CSV_FILE_PATH}")
+        logger.info(f"Events file: {get_event_source()}")
         logger.info(f"Recency weight: {RECENCY_WEIGHT}")
+        logger.info(f"Recency curve: {RECENCY_CURVE}")
+        logger.info(f"Default scorer: {DEFAULT_SCORER}")
 
-        # Verify that the CSV file exists
-        if not os.path.exists(CSV_FILE_PATH):
-            logger.error(f"CSV file not found: {CSV_FILE_PATH}")
-            logger.error("Please make sure the CSV file exists and is accessible")
+        # Verify that the events file exists
+        if not os.path.exists(get_event_source()):
+            logger.error(f"Events file not found: {get_event_source()}")
+            logger.error("Please make sure the events file exists and is accessible")
             return
 
-        # Verify that we can load events from the CSV file
-        events = load_events_from_csv()
+        # Load events once at startup and keep watching the events file for changes
+        snapshot = get_event_store().get_snapshot()
+        if not snapshot.events:
+            logger.warning("No events could be loaded from the events file")
+
+        app.run(host=args.host, port=args.port, debug=args.debug)
+
+    except Exception as e:
+        logger.error(f"Error running Event Search Agent: {str(e)}")
+
+if __name__ == "__main__":
+    main()
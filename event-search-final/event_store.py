@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Event Store Module
+
+Keeps a process-wide, resident copy of the event data so that searches do not
+re-parse the events file on every request. The store:
+1. Loads the events once at startup
+2. Serves immutable snapshots to request handlers
+3. Watches the source file and reloads it in the background when its mtime or size changes
+4. Builds registered derived indexes with each snapshot, so they are swapped in together
+
+With an appender, a changed source file is first offered to it to merge just the
+records appended since the last load into a new snapshot, updating the indexes
+that support it instead of rebuilding them; the full loader only runs when the
+appender reports the file was truncated or replaced. The appender is given the
+current snapshot's indexes to match the appended records against.
+"""
+
+import os
+import time
+import logging
+import threading
+from types import MappingProxyType
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, Any, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger('event_store')
+
+# Seconds between checks of the source file for changes
+DEFAULT_POLL_INTERVAL = float(os.environ.get("EVENT_STORE_POLL_INTERVAL", "5"))
+
+# Merges appended records: (path, current events, current indexes) -> (new events, ids of existing
+# events it changed), or None if the file must be reloaded in full
+Appender = Callable[[str, Tuple[Dict[str, Any], ...], Mapping[str, Any]],
+                    Optional[Tuple[List[Dict[str, Any]], List[int]]]]
+
+# Updates an index for appended events: (index, events, new ids, changed ids) -> new index
+IndexUpdater = Callable[[Any, Tuple[Dict[str, Any], ...], Sequence[int], Sequence[int]], Any]
+
+
+@dataclass(frozen=True)
+class EventSnapshot:
+    """
+    An immutable view of the loaded events
+
+    The event dictionaries are shared between all requests using the snapshot,
+    so callers must copy an event before annotating it.
+    """
+    events: Tuple[Dict[str, Any], ...]
+    version: int
+    source_mtime: float
+    source_size: int
+    loaded_at: float
+    indexes: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+
+
+class EventStore:
+    """Resident event store with mtime/size based hot reload"""
+
+    def __init__(self, source_path: str, loader: Callable[[str], List[Dict[str, Any]]],
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, appender: Optional[Appender] = None):
+        """
+        Initialize the store
+
+        Args:
+            source_path: Path to the events file to watch
+            loader: Function that parses the events file into a list of event dictionaries
+            poll_interval: Seconds between checks of the events file for changes
+            appender: Function that merges the records appended to the events file since the last load
+        """
+        self.source_path = source_path
+        self.loader = loader
+        self.appender = appender
+        self.poll_interval = poll_interval
+        self._snapshot = EventSnapshot(events=(), version=0, source_mtime=0.0, source_size=0, loaded_at=0.0)
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+        self._index_builders = {}
+        self._index_updaters = {}
+
+    def register_index(self, name: str, builder: Callable[[Tuple[Dict[str, Any], ...]], Any],
+                       updater: Optional[IndexUpdater] = None) -> None:
+        """
+        Register an index to build from the events of every new snapshot
+
+        Args:
+            name: Name of the index in EventSnapshot.indexes
+            builder: Function that builds the index from the snapshot's events
+            updater: Function that returns a copy of the index updated for appended events;
+                without one, the index is rebuilt when events are appended
+        """
+        self._index_builders[name] = builder
+        if updater:
+            self._index_updaters[name] = updater
+
+    def start(self) -> None:
+        """Load the events and start watching the source file for changes"""
+        self.reload(force=True)
+
+        if self._watcher and self._watcher.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name='event-store-watcher', daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {self.source_path} for changes every {self.poll_interval:.1f}s")
+
+    def stop(self) -> None:
+        """Stop the background watcher"""
+        self._stop_event.set()
+        if self._watcher:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
+
+    def get_snapshot(self) -> EventSnapshot:
+        """
+        Get the current snapshot of the events
+
+        Returns:
+            The most recently loaded EventSnapshot
+        """
+        if self._snapshot.version == 0:
+            self.reload()
+        return self._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload the events if the source file changed since the last load
+
+        Args:
+            force: Reload even if the mtime and size are unchanged
+
+        Returns:
+            True if a new snapshot was published, False otherwise
+        """
+        with self._reload_lock:
+            stat = self._stat()
+            if stat is None:
+                logger.error(f"Events file not found: {self.source_path}")
+                return False
+
+            mtime, size = stat
+            current = self._snapshot
+            if not force and current.version and (mtime, size) == (current.source_mtime, current.source_size):
+                return False
+
+            start_time = time.time()
+            if not force and current.version and self.appender:
+                try:
+                    appended = self.appender(self.source_path, current.events, current.indexes)
+                except Exception as e:
+                    logger.error(f"Error reading appended events from {self.source_path}: {str(e)}")
+                    appended = None
+                if appended is not None:
+                    return self._publish_appended(current, appended[0], appended[1], mtime, size, start_time)
+                logger.info(f"{self.source_path} was truncated or replaced; reloading it in full")
+
+            try:
+                events = self.loader(self.source_path)
+            except Exception as e:
+                logger.error(f"Error reloading events from {self.source_path}: {str(e)}")
+                return False
+
+            # An empty result from a non-empty file usually means we caught it mid-write
+            if not events and size > 0 and current.events:
+                logger.warning(f"No events parsed from {self.source_path}; keeping version {current.version}")
+                return False
+
+            events = tuple(events)
+            indexes = {}
+            for name, builder in self._index_builders.items():
+                try:
+                    indexes[name] = builder(events)
+                except Exception as e:
+                    logger.error(f"Error building {name} index: {str(e)}")
+
+            # Publish the new snapshot with a single reference swap
+            self._snapshot = EventSnapshot(
+                events=events,
+                version=current.version + 1,
+                source_mtime=mtime,
+                source_size=size,
+                loaded_at=time.time(),
+                indexes=MappingProxyType(indexes)
+            )
+
+            logger.info(f"Loaded {len(events)} events (version {self._snapshot.version}) "
+                        f"in {time.time() - start_time:.2f}s")
+            return True
+
+    def _publish_appended(self, current: EventSnapshot, events: List[Dict[str, Any]], changed_ids: List[int],
+                          mtime: float, size: int, start_time: float) -> bool:
+        """Publish a snapshot with appended and changed events, updating the indexes that support it"""
+        new_ids = range(len(current.events), len(events))
+        if not new_ids and not changed_ids:
+            return False
+
+        events = tuple(events)
+        indexes = {}
+        for name, builder in self._index_builders.items():
+            try:
+                updater = self._index_updaters.get(name)
+                if updater and name in current.indexes:
+                    indexes[name] = updater(current.indexes[name], events, new_ids, changed_ids)
+                else:
+                    indexes[name] = builder(events)
+            except Exception as e:
+                logger.error(f"Error updating {name} index: {str(e)}")
+
+        self._snapshot = EventSnapshot(
+            events=events,
+            version=current.version + 1,
+            source_mtime=mtime,
+            source_size=size,
+            loaded_at=time.time(),
+            indexes=MappingProxyType(indexes)
+        )
+
+        logger.info(f"Merged {len(new_ids)} new and {len(changed_ids)} changed events "
+                    f"(version {self._snapshot.version}) in {time.time() - start_time:.2f}s")
+        return True
+
+    def _stat(self) -> Optional[Tuple[float, int]]:
+        """Get the mtime and size of the source file"""
+        try:
+            stat = os.stat(self.source_path)
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+    def _watch(self) -> None:
+        """Background loop that reloads the events when the source file changes"""
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Error in event store watcher: {str(e)}")
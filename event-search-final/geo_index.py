@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Geo Index Module
+
+Grid index of event coordinates, built once per event snapshot from the
+`latitude`/`longitude` the loaders attach to each event. "Events within R
+miles of ZIP X" looks up the ZIP centroid in the bundled table, visits only
+the grid cells overlapping the search circle and checks the exact distance
+of the events in them, instead of measuring the distance to every event.
+"""
+
+import copy
+import math
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from event_geo import haversine_miles, zip_centroid
+
+logger = logging.getLogger('geo_index')
+
+# Size of a grid cell in degrees (about 17 by 13 miles at Bay Area latitudes)
+GRID_CELL_DEGREES = 0.25
+
+# Miles per degree of latitude
+MILES_PER_DEGREE = 69.0
+
+
+class GeoIndex:
+    """Event ids bucketed by grid cell, for radius queries over event locations"""
+
+    def __init__(self, events: Sequence[Dict[str, Any]], cell_degrees: float = GRID_CELL_DEGREES):
+        """
+        Build the index
+
+        Args:
+            events: Events with 'latitude' and 'longitude' (None if the location could not be geocoded)
+            cell_degrees: Size of a grid cell in degrees
+        """
+        self.cell_degrees = cell_degrees
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = {}
+        self.located = 0
+
+        for event_id, event in enumerate(events):
+            self.add(event_id, event)
+
+        logger.info(f"Built geo index: {self.located} located events in {len(self.cells)} cells, "
+                    f"{len(events) - self.located} without coordinates")
+
+    def add(self, event_id: int, event: Dict[str, Any]) -> None:
+        """Add an event to the index (events without coordinates are skipped)"""
+        latitude, longitude = event.get('latitude'), event.get('longitude')
+        if latitude is None or longitude is None:
+            return
+        self.cells.setdefault(self._cell(latitude, longitude), []).append((event_id, latitude, longitude))
+        self.located += 1
+
+    def extended(self, events: Sequence[Dict[str, Any]], new_ids: Sequence[int],
+                 changed_ids: Sequence[int] = ()) -> 'GeoIndex':
+        """
+        Get a copy of the index with appended events added
+
+        Appended rows only add speakers to events already loaded, so changed events keep their location.
+
+        Args:
+            events: All events, including the appended ones
+            new_ids: Ids of the appended events
+            changed_ids: Ids of existing events the appended rows changed
+
+        Returns:
+            New GeoIndex; this one is left unchanged for the snapshot that uses it
+        """
+        index = copy.copy(self)
+        index.cells = dict(self.cells)
+        copied = set()
+
+        for event_id in new_ids:
+            event = events[event_id]
+            latitude, longitude = event.get('latitude'), event.get('longitude')
+            if latitude is None or longitude is None:
+                continue
+            cell = self._cell(latitude, longitude)
+            # Cells shared with this index are copied before the first change
+            if cell not in copied:
+                index.cells[cell] = list(index.cells.get(cell, ()))
+                copied.add(cell)
+            index.add(event_id, event)
+
+        return index
+
+    def ids_within(self, latitude: float, longitude: float, radius_miles: float) -> List[Tuple[int, float]]:
+        """
+        Get the events within a radius of a point
+
+        Args:
+            latitude: Latitude of the center
+            longitude: Longitude of the center
+            radius_miles: Search radius in miles
+
+        Returns:
+            List of (event id, distance in miles), nearest first
+        """
+        lat_span = radius_miles / MILES_PER_DEGREE
+        # Longitude degrees shrink towards the poles; clamp to avoid dividing by zero
+        lon_span = radius_miles / (MILES_PER_DEGREE * max(0.01, math.cos(math.radians(latitude))))
+
+        min_row, min_col = self._cell(latitude - lat_span, longitude - lon_span)
+        max_row, max_col = self._cell(latitude + lat_span, longitude + lon_span)
+
+        matches = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for event_id, event_lat, event_lon in self.cells.get((row, col), ()):
+                    distance = haversine_miles(latitude, longitude, event_lat, event_lon)
+                    if distance <= radius_miles:
+                        matches.append((event_id, distance))
+
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+    def ids_near_zip(self, zip_code: str, radius_miles: float) -> Optional[List[Tuple[int, float]]]:
+        """
+        Get the events within a radius of a ZIP code's centroid
+
+        Args:
+            zip_code: Five-digit US ZIP code
+            radius_miles: Search radius in miles
+
+        Returns:
+            List of (event id, distance in miles), nearest first, or None if the ZIP code is unknown
+        """
+        center = zip_centroid(zip_code)
+        if center is None:
+            return None
+        return self.ids_within(center[0], center[1], radius_miles)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Get the grid cell of a point"""
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Keyword Index Module
+
+Token inverted index that answers keyword queries with the same results as a
+case-insensitive substring check (`keyword in text`), without scanning every
+document on every query. Multi-word keywords like "venture capital" are
+answered by intersecting the posting lists of their tokens and then verifying
+the phrase only on the remaining candidates.
+
+A query token can match part of a longer token ("ai" in "openai"). The tokens
+containing it are found through an index of the short substrings of every
+indexed token, so a lookup costs time in the number of matching tokens rather
+than the size of the vocabulary; the results for recent query tokens are kept
+in a bounded LRU cache.
+"""
+
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Set
+
+logger = logging.getLogger('keyword_index')
+
+# Tokens are runs of letters and digits; everything else separates tokens
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Length of the longest substrings of indexed tokens that are looked up directly
+GRAM_SIZE = 3
+
+# Query tokens whose matching documents are cached
+SUBSTRING_CACHE_SIZE = 1024
+
+
+def token_grams(token: str, size: int) -> Set[str]:
+    """Get the substrings of a token with the given length"""
+    return {token[i:i + size] for i in range(len(token) - size + 1)}
+
+
+class KeywordIndex:
+    """Inverted index from tokens to the ids of the documents containing them"""
+
+    def __init__(self, cache_size: int = SUBSTRING_CACHE_SIZE):
+        """
+        Initialize an empty index
+
+        Args:
+            cache_size: Query tokens whose matching documents are cached
+        """
+        self.texts = {}  # Lowercased text of each document, by id
+        self.postings = {}  # Token -> set of document ids
+        self.grams = {}  # Substring of up to GRAM_SIZE characters -> indexed tokens containing it
+        self.cache_size = cache_size
+        self._substring_postings = OrderedDict()  # LRU of query token -> ids of documents with a token containing it
+        self._cache_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, doc_id: int, text: str) -> None:
+        """
+        Add a document to the index
+
+        Args:
+            doc_id: Id of the document
+            text: Text to index
+        """
+        text = text.lower()
+        self.texts[doc_id] = text
+        for token in set(TOKEN_PATTERN.findall(text)):
+            if token not in self.postings:
+                self.postings[token] = set()
+                for size in range(1, GRAM_SIZE + 1):
+                    for gram in token_grams(token, size):
+                        self.grams.setdefault(gram, set()).add(token)
+            self.postings[token].add(doc_id)
+        with self._cache_lock:
+            self._substring_postings.clear()
+
+    def lookup(self, keyword: str) -> Set[int]:
+        """
+        Find the documents whose text contains the keyword as a substring
+
+        Args:
+            keyword: Keyword or phrase to look up (case-insensitive)
+
+        Returns:
+            Set of matching document ids
+        """
+        keyword = keyword.lower()
+        tokens = TOKEN_PATTERN.findall(keyword)
+
+        if not tokens:
+            # Nothing to look up in the index, so check every document
+            candidates = self.texts.keys()
+        else:
+            # Inner tokens of a phrase are bounded by separators, so they must match a whole
+            # token; the first and last tokens may be part of a longer token in the text
+            token_postings = []
+            for position, token in enumerate(tokens):
+                if 0 < position < len(tokens) - 1:
+                    token_postings.append(self.postings.get(token, set()))
+                else:
+                    token_postings.append(self._get_substring_postings(token))
+
+            # Intersect the smallest posting lists first
+            token_postings.sort(key=len)
+            candidates = set(token_postings[0])
+            for postings in token_postings[1:]:
+                if not candidates:
+                    break
+                candidates &= postings
+
+        # Verify the exact substring on the remaining candidates
+        return {doc_id for doc_id in candidates if keyword in self.texts[doc_id]}
+
+    def lookup_all(self, keywords: Iterable[str]) -> Dict[str, Set[int]]:
+        """
+        Look up several keywords at once
+
+        Args:
+            keywords: Keywords to look up
+
+        Returns:
+            Dictionary of keyword to the set of matching document ids
+        """
+        return {keyword: self.lookup(keyword) for keyword in keywords}
+
+    def _get_substring_postings(self, token: str) -> Set[int]:
+        """Get the ids of documents with any token that contains the given token"""
+        with self._cache_lock:
+            matching_ids = self._substring_postings.get(token)
+            if matching_ids is not None:
+                self._substring_postings.move_to_end(token)
+                return matching_ids
+
+        matching_ids = set()
+        for indexed_token in self._get_containing_tokens(token):
+            matching_ids |= self.postings[indexed_token]
+
+        with self._cache_lock:
+            self._substring_postings[token] = matching_ids
+            while len(self._substring_postings) > self.cache_size:
+                self._substring_postings.popitem(last=False)
+        return matching_ids
+
+    def _get_containing_tokens(self, token: str) -> Set[str]:
+        """Get the indexed tokens that contain the given token"""
+        if len(token) <= GRAM_SIZE:
+            return self.grams.get(token, set())
+
+        # Tokens containing it contain each of its grams; check the candidates sharing them all
+        gram_tokens = sorted((self.grams.get(gram, set()) for gram in token_grams(token, GRAM_SIZE)), key=len)
+        candidates = set(gram_tokens[0])
+        for tokens in gram_tokens[1:]:
+            if not candidates:
+                break
+            candidates &= tokens
+        return {candidate for candidate in candidates if token in candidate}
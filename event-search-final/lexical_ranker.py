@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Lexical Ranker Module
+
+BM25 ranking over a precomputed term matrix of the event corpus. The per-term,
+per-event BM25 weights are computed once when the ranker is built, so scoring a
+query is a single vectorized NumPy accumulation over the posting lists of the
+query terms, with no LLM in the loop.
+"""
+
+import math
+import logging
+from collections import Counter
+from typing import List, Dict, Any, Sequence
+
+import numpy as np
+
+from keyword_index import TOKEN_PATTERN
+
+logger = logging.getLogger('lexical_ranker')
+
+# BM25 term frequency saturation and length normalization parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# How many times a token in the event name counts compared to the rest of the text
+NAME_WEIGHT = 3
+
+
+def event_search_text(event: Dict[str, Any]) -> str:
+    """
+    Get the searchable text of an event (everything except the event name)
+
+    Args:
+        event: Event dictionary
+
+    Returns:
+        Text of the event's description, location, host, speakers and details
+    """
+    speakers_text = ' '.join(
+        f"{speaker.get('name', '')} {speaker.get('title', '')} {speaker.get('company', '')} {speaker.get('details', '')}"
+        for speaker in event.get('speakers', [])
+    )
+    return ' '.join([
+        event.get('event_description', ''),
+        event.get('event_location', ''),
+        event.get('host_name', ''),
+        speakers_text,
+        event.get('event_detail', '')
+    ])
+
+
+class BM25Ranker:
+    """BM25 scorer over a fixed corpus of events"""
+
+    def __init__(self, events: Sequence[Dict[str, Any]], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Build the term matrix for a corpus of events
+
+        Args:
+            events: Events to index; scores are returned in the same order
+            k1: BM25 term frequency saturation parameter
+            b: BM25 length normalization parameter
+        """
+        self.num_events = len(events)
+        self.term_ids = {}
+        self.event_terms = []
+
+        # Count weighted term frequencies for each event
+        term_counts = []
+        doc_lengths = np.zeros(self.num_events, dtype=np.float32)
+        for event_id, event in enumerate(events):
+            counts = Counter(TOKEN_PATTERN.findall(event_search_text(event).lower()))
+            for token in TOKEN_PATTERN.findall(event.get('event_name', '').lower()):
+                counts[token] += NAME_WEIGHT
+            for token in counts:
+                self.term_ids.setdefault(token, len(self.term_ids))
+            term_counts.append(counts)
+            self.event_terms.append(frozenset(counts))
+            doc_lengths[event_id] = sum(counts.values())
+
+        avg_doc_length = float(doc_lengths.mean()) if self.num_events else 0.0
+
+        # Lay out the postings as a column-compressed matrix: for term t, the events and
+        # their BM25 weights are event_ids[offsets[t]:offsets[t + 1]] and weights[...]
+        postings = [[] for _ in range(len(self.term_ids))]
+        for event_id, counts in enumerate(term_counts):
+            for token, count in counts.items():
+                postings[self.term_ids[token]].append((event_id, count))
+
+        self.offsets = np.zeros(len(self.term_ids) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(p) for p in postings])
+        self.event_ids = np.zeros(self.offsets[-1], dtype=np.int32)
+        self.weights = np.zeros(self.offsets[-1], dtype=np.float32)
+
+        for term_id, term_postings in enumerate(postings):
+            if not term_postings:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            ids = np.fromiter((p[0] for p in term_postings), dtype=np.int32, count=len(term_postings))
+            tf = np.fromiter((p[1] for p in term_postings), dtype=np.float32, count=len(term_postings))
+            df = len(term_postings)
+            idf = math.log(1 + (self.num_events - df + 0.5) / (df + 0.5))
+            norm = k1 * (1 - b + b * doc_lengths[ids] / max(avg_doc_length, 1e-9))
+            self.event_ids[start:end] = ids
+            self.weights[start:end] = idf * tf * (k1 + 1) / (tf + norm)
+
+        logger.info(f"Built BM25 term matrix: {self.num_events} events, {len(self.term_ids)} terms")
+
+    def score(self, keywords: List[str]) -> np.ndarray:
+        """
+        Score every event against the keywords
+
+        Args:
+            keywords: Keywords to match (multi-word keywords are split into terms)
+
+        Returns:
+            Array of relevance scores between 0.0 and 1.0, normalized so the best event scores 1.0
+        """
+        term_ids = {
+            self.term_ids[token]
+            for keyword in keywords
+            for token in TOKEN_PATTERN.findall(keyword.lower())
+            if token in self.term_ids
+        }
+        if not term_ids or not self.num_events:
+            return np.zeros(self.num_events, dtype=np.float32)
+
+        slices = [np.arange(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        positions = np.concatenate(slices)
+        scores = np.bincount(self.event_ids[positions], weights=self.weights[positions],
+                             minlength=self.num_events).astype(np.float32)
+
+        max_score = scores.max()
+        if max_score > 0:
+            scores /= max_score
+        return scores
+
+    def matched_keywords(self, event_id: int, keywords: List[str]) -> List[str]:
+        """
+        Get the keywords whose terms all appear in an event
+
+        Args:
+            event_id: Position of the event in the corpus
+            keywords: Keywords to check
+
+        Returns:
+            List of matching keywords
+        """
+        terms = self.event_terms[event_id]
+        matches = []
+        for keyword in keywords:
+            tokens = TOKEN_PATTERN.findall(keyword.lower())
+            if tokens and all(token in terms for token in tokens):
+                matches.append(keyword)
+        return matches
@@ -5,11 +5,12 @@ Luma Event Integration Module
 This module integrates the Luma event scraper with the Event Search Agent application.
 It provides functions to:
 1. Scrape events from Luma
-2. Filter events based on keywords and location
+2. Filter events based on keywords, location and distance from a ZIP code
 3. Format events for display in the UI
 """
 
 import os
+import sys
 import csv
 import json
 import logging
@@ -17,6 +18,18 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import re
 
+# Shared event data modules live alongside the scraper
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'luma_event_scraper')
+if SCRAPER_DIR not in sys.path:
+    sys.path.append(SCRAPER_DIR)
+from event_catalog import EventCatalog, is_catalog_path
+from event_parquet import read_events, is_parquet_path
+from event_geo import geocode_location
+from event_dedup import collapse_duplicate_rows
+from location_classifier import location_matches
+from keyword_index import KeywordIndex
+from geo_index import GeoIndex
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +43,8 @@ logger = logging.getLogger('luma_event_integration')
 
 # Constants
 LUMA_EVENTS_FILE = "luma_bay_area_events.csv"
+# Search radius around a ZIP code when none is given
+DEFAULT_RADIUS_MILES = float(os.getenv("DEFAULT_RADIUS_MILES", "25"))
 CURRENT_DATE = datetime.now()
 
 class LumaEventIntegration:
@@ -39,6 +54,8 @@ class LumaEventIntegration:
         """Initialize the integration with the events file"""
         self.events_file = events_file
         self.events = []
+        self.keyword_index = KeywordIndex()
+        self.geo_index = GeoIndex([])
         self.load_events()
 
         # Add hardcoded Berkeley VC Summit event if not already in the events
@@ -59,97 +76,175 @@ class LumaEventIntegration:
         # Check if Berkeley event is already in the events
         berkeley_exists = any(event.get('event_url') == self.berkeley_event['event_url'] for event in self.events)
         if not berkeley_exists:
-            self.events.append(self.berkeley_event)
+            self.add_event(self.berkeley_event)
 
     def load_events(self) -> None:
-        """Load events from the CSV file"""
+        """Load events from the CSV file, the Parquet event store or the event catalog"""
         try:
             if not os.path.exists(self.events_file):
                 logger.warning(f"Events file not found: {self.events_file}")
                 return
 
-            with open(self.events_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                self.events = list(reader)
-
+            if is_catalog_path(self.events_file):
+                with EventCatalog(self.events_file, readonly=True) as catalog:
+                    self.events = [self._catalog_event_to_row(event) for event in catalog.get_events()]
+            elif is_parquet_path(self.events_file):
+                # The store holds every scraped city; only its Bay Area events are read
+                self.events = [self._catalog_event_to_row(event)
+                               for event in read_events(self.events_file, bay_area_only=True)]
+            else:
+                with open(self.events_file, 'r', encoding='utf-8') as f:
+                    reader = csv.DictReader(f)
+                    self.events = [self._with_coordinates(row) for row in reader]
+
+            self.events = self._deduplicate(self.events)
             logger.info(f"Loaded {len(self.events)} events from {self.events_file}")
         except Exception as e:
             logger.error(f"Error loading events: {str(e)}")
 
-    def search_events(self, keywords: List[str], location: str = None) -> List[Dict[str, Any]]:
+        self._build_index()
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        """Add an event and index it for keyword search"""
+        event = self._with_coordinates(event)
+        self.events.append(event)
+        self._index_event(len(self.events) - 1, event)
+
+    def _build_index(self) -> None:
+        """Build the keyword and geo indexes over all loaded events"""
+        self.keyword_index = KeywordIndex()
+        self.geo_index = GeoIndex([])
+        for event_id, event in enumerate(self.events):
+            self._index_event(event_id, event)
+        logger.info(f"Indexed {len(self.keyword_index)} events for keyword search, "
+                    f"{self.geo_index.located} with coordinates")
+
+    def _index_event(self, event_id: int, event: Dict[str, Any]) -> None:
+        """Add one event's searchable text to the keyword index"""
+        # Events with missing required fields are never returned by search
+        if not event.get('event_title') or not event.get('event_summary'):
+            return
+
+        self.geo_index.add(event_id, event)
+        self.keyword_index.add(event_id, ' '.join([
+            event.get('event_title', ''),
+            event.get('event_summary', ''),
+            event.get('event_location', ''),
+            event.get('host_company', ''),
+            event.get('speaker_name', ''),
+            event.get('speaker_title', ''),
+            event.get('speaker_company', ''),
+            event.get('speaker_detail', '')
+        ]))
+
+    @staticmethod
+    def _catalog_event_to_row(event: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a catalog event into the flat row format used by this integration"""
+        speakers = event.get('speakers', [])
+        return {
+            "event_title": event.get('event_name', ''),
+            "event_summary": event.get('event_description', ''),
+            "event_date": event.get('event_date', ''),
+            "event_time": event.get('event_time', ''),
+            "event_location": event.get('event_location', ''),
+            "latitude": event.get('latitude'),
+            "longitude": event.get('longitude'),
+            "event_url": event.get('event_url', ''),
+            "host_company": event.get('host_name', ''),
+            "speaker_name": ', '.join(s.get('name', '') for s in speakers),
+            "speaker_title": ', '.join(s.get('title', '') for s in speakers if s.get('title')),
+            "speaker_company": ', '.join(s.get('company', '') for s in speakers if s.get('company')),
+            "speaker_detail": speakers[0].get('details', '') if speakers else ''
+        }
+
+    @staticmethod
+    def _deduplicate(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop near-duplicate events, adding their URLs (as 'aliases') and speakers to their canonical event"""
+        # CSV files have one row per speaker; catalog rows list all of an event's speakers
+        return collapse_duplicate_rows(events, 'event_title', 'event_summary',
+                                       ('speaker_name', 'speaker_title', 'speaker_company', 'speaker_detail'))
+
+    @staticmethod
+    def _with_coordinates(event: Dict[str, Any]) -> Dict[str, Any]:
+        """Geocode an event's location if the event has no coordinates yet"""
+        if 'latitude' in event:
+            return event
+        coordinates = geocode_location(event.get('event_location', '')) or (None, None)
+        return {**event, 'latitude': coordinates[0], 'longitude': coordinates[1]}
+
+    def search_events(self, keywords: List[str], location: str = None, zip_code: str = None,
+                      radius_miles: float = None) -> List[Dict[str, Any]]:
         """
-        Search events based on keywords and location
+        Search events based on keywords, location and distance from a ZIP code
 
         Args:
             keywords: List of keywords to search for
             location: Optional location filter
+            zip_code: Optional ZIP code; only events within radius_miles of it are returned
+            radius_miles: Search radius around the ZIP code (defaults to DEFAULT_RADIUS_MILES)
 
         Returns:
-            List of matching events with relevance scores
+            List of matching events with relevance scores (and distance_miles when searching by ZIP code)
         """
         if not self.events:
             logger.warning("No events available for search")
             return []
 
+        # Distance of each event within the radius, if searching by ZIP code
+        distances = None
+        if zip_code:
+            nearby = self.geo_index.ids_near_zip(zip_code, radius_miles or DEFAULT_RADIUS_MILES)
+            if nearby is None:
+                logger.warning(f"Unknown ZIP code: {zip_code}")
+                return []
+            distances = dict(nearby)
+
         # Convert keywords to lowercase for case-insensitive matching
         keywords_lower = [k.lower() for k in keywords if k]
 
         if not keywords_lower:
-            logger.info("No valid keywords provided, returning all events")
-            return self.events
+            if distances is None:
+                logger.info("No valid keywords provided, returning all events")
+                return self.events
+            logger.info(f"No valid keywords provided, returning {len(distances)} events near {zip_code}")
+            return [{**self.events[event_id], 'distance_miles': round(distance, 1)}
+                    for event_id, distance in nearby]
+
+        # Look up the events containing each keyword in the inverted index
+        keyword_matches = self.keyword_index.lookup_all(keywords_lower)
+        matched_ids = set().union(*keyword_matches.values())
 
         matching_events = []
 
-        for event in self.events:
-            # Skip events with missing required fields
-            if not event.get('event_title') or not event.get('event_summary'):
+        for event_id in sorted(matched_ids):
+            event = self.events[event_id]
+
+            if distances is not None and event_id not in distances:
                 continue
 
             # Apply location filter if provided
             if location and not self._location_matches(event.get('event_location', ''), location):
                 continue
 
-            # Calculate relevance score based on keyword matches
-            event_text = ' '.join([
-                event.get('event_title', ''),
-                event.get('event_summary', ''),
-                event.get('event_location', ''),
-                event.get('host_company', ''),
-                event.get('speaker_name', ''),
-                event.get('speaker_title', ''),
-                event.get('speaker_company', ''),
-                event.get('speaker_detail', '')
-            ]).lower()
-
-            # Count keyword matches
-            matches = []
-            for keyword in keywords_lower:
-                if keyword in event_text:
-                    matches.append(keyword)
-
-            # Add event with match information if there are any matches
-            if matches:
-                event_copy = event.copy()
-                event_copy['relevance_score'] = len(matches) / len(keywords_lower)
-                event_copy['matching_keywords'] = matches
-                matching_events.append(event_copy)
-
-        # Sort by relevance score (highest first)
-        matching_events.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+            # Collect the keywords this event matched
+            matches = [keyword for keyword in keywords_lower if event_id in keyword_matches[keyword]]
+
+            event_copy = event.copy()
+            event_copy['relevance_score'] = len(matches) / len(keywords_lower)
+            event_copy['matching_keywords'] = matches
+            if distances is not None:
+                event_copy['distance_miles'] = round(distances[event_id], 1)
+            matching_events.append(event_copy)
+
+        # Sort by relevance score (highest first), nearest first among equally relevant events
+        matching_events.sort(key=lambda x: (-x.get('relevance_score', 0), x.get('distance_miles', 0)))
 
         logger.info(f"Found {len(matching_events)} matching events for keywords: {keywords}")
         return matching_events
 
     def _location_matches(self, event_location: str, filter_location: str) -> bool:
-        """Check if event location matches the filter location"""
-        if not event_location or not filter_location:
-            return True
-
-        event_location_lower = event_location.lower()
-        filter_location_lower = filter_location.lower()
-
-        # Check if filter location is contained in event location
-        return filter_location_lower in event_location_lower
+        """Check if event location matches the filter location (whole words, or a region like "bay area")"""
+        return location_matches(event_location, filter_location)
 
     def format_events_for_ui(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Format events for display in the UI"""
@@ -176,6 +271,9 @@ class LumaEventIntegration:
                 formatted_event['matching_keywords'] = event['matching_keywords']
                 formatted_event['relevance_score'] = event.get('relevance_score', 0)
 
+            if 'distance_miles' in event:
+                formatted_event['distance_miles'] = event['distance_miles']
+
             formatted_events.append(formatted_event)
 
         return formatted_events
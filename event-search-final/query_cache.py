@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Query Cache Module
+
+Caches ranked search results so that re-running the same search does not
+repeat the filter, score and rank stages. Entries are tagged with the version
+of the event snapshot they were computed from and an expiry time, so they are
+dropped when the events file is reloaded or when the result could change
+because time passed (an event started or the day rolled over).
+
+Concurrent identical searches are coalesced: the first request computes the
+result and the others wait for it (single-flight).
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger('query_cache')
+
+
+class QueryResultCache:
+    """LRU cache of search results with version and time based invalidation"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of cached results
+        """
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0}
+        self._entries = OrderedDict()  # key -> (result, version, expires_at)
+        self._in_flight = {}  # (key, version) -> Future of (result, expires_at)
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, version: int,
+                       compute: Callable[[], Tuple[Any, float]]) -> Tuple[Any, bool]:
+        """
+        Get a cached result, or compute it once for all concurrent callers
+
+        Args:
+            key: Cache key of the search
+            version: Version of the event snapshot the result must come from
+            compute: Function returning (result, expires_at as a time.time() timestamp)
+
+        Returns:
+            Tuple of (result, whether it came from the cache or another caller's computation)
+        """
+        flight_key = (key, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, entry_version, expires_at = entry
+                if entry_version == version and time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return result, True
+                del self._entries[key]
+                self.stats['invalidations'] += 1
+
+            future = self._in_flight.get(flight_key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                owner = False
+            else:
+                future = Future()
+                self._in_flight[flight_key] = future
+                self.stats['misses'] += 1
+                owner = True
+
+        if not owner:
+            result, _ = future.result()
+            return result, True
+
+        try:
+            result, expires_at = compute()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._in_flight.pop(flight_key, None)
+            if expires_at > time.time():
+                self._entries[key] = (result, version, expires_at)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result((result, expires_at))
+        return result, False
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the number of cached results"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = round((stats['hits'] + stats['coalesced']) / lookups, 3) if lookups else 0.0
+        return stats
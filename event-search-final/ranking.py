@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Ranking Module
+
+Vectorized combined scoring and top-k selection. Relevance scores and days
+until each event are held in NumPy arrays, so recency and combined scores
+are computed in one expression per search instead of per event, and the top
+results are selected with a partition instead of a full sort.
+
+Recency curves map days until an event to a score between 0.0 and 1.0:
+- log: 1 / (1 + ln(1 + days)), the original curve
+- exp: 0.5 ** (days / half_life)
+- step: a fixed score per band of days, e.g. 1.0 within a week, 0.5 within a month
+"""
+
+import logging
+from typing import Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('ranking')
+
+RECENCY_CURVES = ("log", "exp", "step")
+
+# Default bands for the step curve: (max days until the event, recency score)
+DEFAULT_RECENCY_STEPS = ((7, 1.0), (30, 0.5), (90, 0.25))
+
+
+def parse_recency_steps(spec: str) -> Tuple[Tuple[float, float], ...]:
+    """
+    Parse step curve bands from a string like "7:1.0,30:0.5,90:0.25"
+
+    Args:
+        spec: Comma-separated max_days:score pairs
+
+    Returns:
+        Tuple of (max days, score) pairs sorted by max days
+
+    Raises:
+        ValueError: If the string is not a list of number pairs
+    """
+    steps = []
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        days, score = part.split(':')
+        steps.append((float(days), float(score)))
+    if not steps:
+        raise ValueError(f"No recency steps in: {spec}")
+    return tuple(sorted(steps))
+
+
+def recency_scores(days_until: np.ndarray, curve: str = "log", half_life_days: float = 14.0,
+                   steps: Sequence[Tuple[float, float]] = DEFAULT_RECENCY_STEPS) -> np.ndarray:
+    """
+    Compute recency scores for an array of days until each event
+
+    Args:
+        days_until: Whole days until each event (negative values count as today)
+        curve: Recency curve, one of RECENCY_CURVES
+        half_life_days: Days for the score to halve with the exp curve
+        steps: (max days, score) bands for the step curve; later events score 0.0
+
+    Returns:
+        Array of recency scores between 0.0 and 1.0
+
+    Raises:
+        ValueError: If the curve is not recognized
+    """
+    days = np.maximum(np.asarray(days_until, dtype=np.float64), 0.0)
+
+    if curve == "log":
+        return 1.0 / (1.0 + np.log1p(days))
+    if curve == "exp":
+        return np.power(0.5, days / max(half_life_days, 1e-9))
+    if curve == "step":
+        bounds = np.array([max_days for max_days, _ in steps], dtype=np.float64)
+        values = np.array([score for _, score in steps] + [0.0], dtype=np.float64)
+        return values[np.searchsorted(bounds, days, side='left')]
+
+    raise ValueError(f"Unknown recency curve: {curve}")
+
+
+def combined_scores(relevance: np.ndarray, recency: np.ndarray, has_date: np.ndarray,
+                    recency_weight: float) -> np.ndarray:
+    """
+    Combine relevance and recency as (1 - w) * relevance + w * recency
+
+    Events without a known date are ranked on relevance alone.
+
+    Args:
+        relevance: Relevance scores
+        recency: Recency scores
+        has_date: Boolean mask of events with a known date
+        recency_weight: Weight w of the recency score
+
+    Returns:
+        Array of combined scores
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    blended = (1 - recency_weight) * relevance + recency_weight * recency
+    return np.where(has_date, blended, relevance)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Get the indices of the k highest scores, highest first
+
+    Ties are broken by index, so the result matches a stable descending sort.
+
+    Args:
+        scores: Scores to select from
+        k: Number of indices to return
+
+    Returns:
+        Array of up to k indices
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if k >= n:
+        candidates = np.arange(n)
+    else:
+        # The k-th largest score, then everything above it and the first ties at it
+        threshold = -np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, ties])
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Relevance Cache Module
+
+Caches Gemini relevance results so repeat searches do not repeat LLM calls.
+Entries are keyed by the event URL, a hash of the event's content, the
+normalized keyword set and a hash of the user summary, and are stored in:
+1. An in-memory LRU tier for hot entries
+2. A SQLite disk tier that survives restarts
+
+Both tiers expire entries after a TTL and evict the least recently used
+entries beyond their size limits. The SQLite file is opened on first use, and
+disk hits record their access time in batches rather than with a write per hit.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger('relevance_cache')
+
+# Bump when the relevance prompt or scoring rubric changes, so old results are not reused
+CACHE_SCHEMA_VERSION = 1
+
+# Disk hits refresh an entry's last access time at most this often; the LRU order
+# of the disk tier only needs to be roughly right
+ACCESS_UPDATE_INTERVAL_SECONDS = 3600
+
+# Buffered last access times written in one transaction once this many are pending
+ACCESS_UPDATE_BATCH_SIZE = 256
+
+# Fields of an event that affect its relevance analysis
+EVENT_CONTENT_FIELDS = ('event_name', 'event_description', 'event_location', 'host_name', 'speakers', 'event_detail')
+
+
+def event_content_hash(event: Dict[str, Any]) -> str:
+    """
+    Hash the parts of an event that are sent to Gemini
+
+    Args:
+        event: Event dictionary
+
+    Returns:
+        Hex digest that changes whenever the event's content changes
+    """
+    content = json.dumps([event.get(field, '') for field in EVENT_CONTENT_FIELDS], sort_keys=True, default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def normalize_keywords(keywords: List[str]) -> List[str]:
+    """Normalize a keyword list into a sorted, deduplicated, lowercased list"""
+    return sorted({keyword.strip().lower() for keyword in keywords if keyword and keyword.strip()})
+
+
+def relevance_cache_key(event: Dict[str, Any], keywords: List[str], user_summary: str = "") -> str:
+    """
+    Build the cache key for one relevance analysis
+
+    Args:
+        event: Event dictionary
+        keywords: List of keywords to match
+        user_summary: User's self-description and interests
+
+    Returns:
+        Hex digest identifying the event content, keyword set and user summary
+    """
+    summary_hash = hashlib.sha1(user_summary.strip().encode('utf-8')).hexdigest()
+    key_data = json.dumps([
+        CACHE_SCHEMA_VERSION,
+        event.get('event_url', ''),
+        event_content_hash(event),
+        normalize_keywords(keywords),
+        summary_hash
+    ])
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+
+class RelevanceCache:
+    """Two-tier (memory LRU + SQLite) cache of relevance results"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: float = 7 * 24 * 3600,
+                 max_memory_entries: int = 5000, max_disk_entries: int = 100000):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: Path to the SQLite file for the disk tier, opened on first use (None or empty disables it)
+            ttl_seconds: Seconds before an entry expires
+            max_memory_entries: Maximum number of entries in the memory tier
+            max_disk_entries: Maximum number of entries in the disk tier
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._memory = OrderedDict()  # key -> (result, created_at)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._opened = False
+        self._pending_access = {}  # key -> last access time not yet written to disk
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached relevance result
+
+        Args:
+            key: Cache key from relevance_cache_key
+
+        Returns:
+            Dictionary with relevance score and highlight, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                result, created_at = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return dict(result)
+                del self._memory[key]
+
+            if self._connect() is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT relevance_score, highlight, created_at, last_access FROM relevance_cache WHERE key = ?",
+                        (key,)
+                    ).fetchone()
+                    if row and now - row[2] < self.ttl_seconds:
+                        if now - row[3] >= ACCESS_UPDATE_INTERVAL_SECONDS:
+                            self._pending_access[key] = now
+                            if len(self._pending_access) >= ACCESS_UPDATE_BATCH_SIZE:
+                                self._flush_access()
+                                self._conn.commit()
+                        result = {'relevance_score': row[0], 'highlight': row[1]}
+                        self._remember(key, result, row[2])
+                        self.stats['disk_hits'] += 1
+                        return dict(result)
+                except sqlite3.Error as e:
+                    logger.error(f"Error reading relevance cache: {str(e)}")
+
+            self.stats['misses'] += 1
+            return None
+
+    def put_many(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Store relevance results
+
+        Args:
+            entries: List of (cache key, result with relevance_score and highlight)
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, result in entries:
+                self._remember(key, {'relevance_score': result['relevance_score'], 'highlight': result['highlight']}, now)
+            self.stats['writes'] += len(entries)
+
+            if self._connect() is None:
+                return
+
+            try:
+                self._flush_access()
+                self._conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO relevance_cache (key, relevance_score, highlight, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [(key, result['relevance_score'], result['highlight'], now, now) for key, result in entries]
+                )
+                self._prune_disk(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing relevance cache: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+            if self._connect() is not None:
+                try:
+                    stats['disk_entries'] = self._conn.execute("SELECT COUNT(*) FROM relevance_cache").fetchone()[0]
+                except sqlite3.Error:
+                    stats['disk_entries'] = None
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use, creating the table if needed"""
+        if not self._opened:
+            self._opened = True
+            if self.db_path:
+                self._conn = self._open(self.db_path)
+        return self._conn
+
+    def _open(self, db_path: str) -> Optional[sqlite3.Connection]:
+        """Open the SQLite file of the disk tier, or return None to use memory only"""
+        conn = None
+        try:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS relevance_cache (
+                    key TEXT PRIMARY KEY,
+                    relevance_score REAL NOT NULL,
+                    highlight TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_relevance_cache_access ON relevance_cache(last_access)")
+            conn.commit()
+            logger.info(f"Using relevance cache at {db_path}")
+            return conn
+        except sqlite3.Error as e:
+            logger.error(f"Error opening relevance cache {db_path}: {str(e)}; using memory only")
+            if conn is not None:
+                conn.close()
+            return None
+
+    def _remember(self, key: str, result: Dict[str, Any], created_at: float) -> None:
+        """Add an entry to the memory tier, evicting the least recently used entries"""
+        self._memory[key] = (result, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _flush_access(self) -> None:
+        """Write the buffered last access times of disk hits, in the caller's transaction"""
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE relevance_cache SET last_access = MAX(last_access, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+
+    def _prune_disk(self, now: float) -> None:
+        """Delete expired entries and the least recently used entries beyond the size limit"""
+        deleted = self._conn.execute(
+            "DELETE FROM relevance_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        deleted += self._conn.execute(
+            """
+            DELETE FROM relevance_cache WHERE key IN (
+                SELECT key FROM relevance_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_disk_entries,)
+        ).rowcount
+        self.stats['evictions'] += max(0, deleted)
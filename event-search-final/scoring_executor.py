@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Scoring Executor Module
+
+Runs async relevance scoring (Gemini requests) for the synchronous Flask app.
+All requests share one event loop running in a background thread, so:
+1. Calls are issued concurrently, up to a process-wide concurrency limit
+2. Backoff between retries sleeps without blocking other calls
+3. Results are applied as each call finishes, and a search can stop waiting after a time budget
+
+Wall-clock time for a batch is then set by the slowest call in each window of
+concurrent calls rather than by the sum of all calls.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger('scoring_executor')
+
+
+class AsyncScoringExecutor:
+    """Bounded-concurrency executor for async scoring calls"""
+
+    def __init__(self, max_concurrency: int = 5):
+        """
+        Initialize the executor
+
+        Args:
+            max_concurrency: Maximum number of scoring calls in flight across all requests
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first use"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name='scoring-executor', daemon=True)
+                self._thread.start()
+                self._loop = loop
+                logger.info(f"Started scoring executor with max concurrency {self.max_concurrency}")
+            return self._loop
+
+    def score(self, items: Sequence[Any], score_func: Callable[[Any], Awaitable[Any]],
+              budget: Optional[float] = None,
+              on_result: Optional[Callable[[int, Any], None]] = None) -> Dict[int, Any]:
+        """
+        Score items concurrently and wait for the results
+
+        Args:
+            items: Items to score
+            score_func: Coroutine function that scores one item
+            budget: Seconds to wait for results before cancelling the remaining calls (None waits for all)
+            on_result: Called with (index, result) as each call finishes
+
+        Returns:
+            Dictionary of item index to result, for the calls that finished successfully
+        """
+        if not items:
+            return {}
+
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._score_all(items, score_func, budget, on_result), loop)
+        return future.result()
+
+    def shutdown(self) -> None:
+        """Stop the background event loop"""
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+                self._loop = None
+                self._thread = None
+                self._semaphore = None
+
+    async def _score_all(self, items, score_func, budget, on_result) -> Dict[int, Any]:
+        """Run all scoring calls on the executor loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def score_one(index: int, item: Any):
+            async with self._semaphore:
+                try:
+                    return index, await score_func(item), True
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in scoring call: {str(e)}")
+                    return index, None, False
+
+        tasks = [asyncio.create_task(score_one(index, item)) for index, item in enumerate(items)]
+        results = {}
+
+        try:
+            for next_result in asyncio.as_completed(tasks, timeout=budget):
+                index, result, succeeded = await next_result
+                if not succeeded:
+                    continue
+
+                results[index] = result
+                if on_result:
+                    on_result(index, result)
+        except asyncio.TimeoutError:
+            logger.warning(f"Scoring budget of {budget:.1f}s exhausted after {len(results)}/{len(items)} calls")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        return results
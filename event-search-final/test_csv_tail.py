@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the CSV tail reader: records split across appends, including quoted
+multi-line fields, and detection of files truncated or replaced
+"""
+
+import os
+import csv
+import io
+import shutil
+import tempfile
+import unittest
+
+from csv_tail import CsvTail
+
+FIELDS = ['event_url', 'event_name', 'event_detail']
+
+
+def csv_record(*values: str) -> str:
+    """Format one CSV record the way the scraper's csv writer does"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+class CsvTailTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'events.csv')
+        self.write(csv_record(*FIELDS) + csv_record('https://lu.ma/a', 'Event A', 'Short detail'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, text: str, mode: str = 'w') -> None:
+        with open(self.path, mode, newline='', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_half_written_multiline_record_is_read_once_complete(self):
+        tail = CsvTail(self.path)
+        self.assertEqual([row['event_url'] for row in tail.read_all()], ['https://lu.ma/a'])
+
+        record = csv_record('https://lu.ma/b', 'Event B', '# Agenda\n\n- Talks, "demos"\n- Drinks\n')
+        split = record.index('- Talks')
+        self.write(record[:split], 'a')
+        self.assertEqual(tail.read_appended(), [])
+
+        self.write(record[split:-1], 'a')  # Everything but the record's final newline
+        self.assertEqual(tail.read_appended(), [])
+
+        self.write(record[-1:] + csv_record('https://lu.ma/c', 'Event C', 'Detail'), 'a')
+        rows = tail.read_appended()
+        self.assertEqual([row['event_url'] for row in rows], ['https://lu.ma/b', 'https://lu.ma/c'])
+        self.assertEqual(rows[0]['event_detail'], '# Agenda\n\n- Talks, "demos"\n- Drinks\n')
+
+        self.assertEqual(tail.read_appended(), [])
+
+    def test_replaced_file_needs_full_reload(self):
+        tail = CsvTail(self.path)
+        tail.read_all()
+
+        replacement = os.path.join(self.tmp_dir, 'events.csv.tmp')
+        with open(replacement, 'w', newline='', encoding='utf-8') as f:
+            f.write(csv_record(*FIELDS) + csv_record('https://lu.ma/z', 'Event Z', 'Detail'))
+        os.replace(replacement, self.path)
+
+        self.assertIsNone(tail.read_appended())
+        self.assertEqual([row['event_url'] for row in tail.read_all()], ['https://lu.ma/z'])
+        self.assertEqual(tail.read_appended(), [])
+
+    def test_truncated_file_needs_full_reload(self):
+        tail = CsvTail(self.path)
+        tail.read_all()
+
+        self.write(csv_record(*FIELDS))
+        self.assertIsNone(tail.read_appended())
+
+    def test_file_rewritten_in_place_needs_full_reload(self):
+        tail = CsvTail(self.path)
+        tail.read_all()
+
+        with open(self.path, 'r+', newline='', encoding='utf-8') as f:
+            f.write(csv_record(*FIELDS) + csv_record('https://lu.ma/x', 'Event X', 'Short detail'))
+        self.assertIsNone(tail.read_appended())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the date index: upcoming events match the is_future_event filter it
+replaces, date windows match a scan over start times, and extending the index
+matches rebuilding it
+"""
+
+import random
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import event_search_agent
+from date_index import EventDateIndex, DATE_WINDOWS
+from event_dates import parse_event_start, default_timezone, get_timezone
+
+# Wednesday morning in the default timezone
+NOW = datetime(2025, 4, 16, 10, 0, tzinfo=default_timezone())
+
+
+class FixedDatetime(datetime):
+    """datetime whose now() is NOW"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return NOW.astimezone(tz) if tz else NOW.replace(tzinfo=None)
+
+
+def random_events(count: int, seed: int):
+    """Events with start times around NOW, parsed from Luma-style strings like the loaders do"""
+    rng = random.Random(seed)
+    times = ['', 'Not specified', '12:00 AM', '9 - 10 AM', '5:30 PM - 8:00 PM', '11:59 PM PDT', '12:30 AM EDT',
+             '1:00 AM EDT', '11:30 PM EDT', '6:00 AM UTC', '10:00 AM']
+    events = []
+    for _ in range(count):
+        day = NOW + timedelta(days=rng.randint(-5, 40))
+        date_str = rng.choice([day.strftime('%Y-%m-%d'), day.strftime('%A, %B %-d'), 'TBD', 'Not specified'])
+        time_str = rng.choice(times)
+        events.append({
+            'event_name': f"Event {len(events)}",
+            'event_date': date_str,
+            'event_time': time_str,
+            'starts_at': parse_event_start(date_str, time_str, NOW)
+        })
+    return events
+
+
+class EventDateIndexTest(unittest.TestCase):
+    def setUp(self):
+        # Plus events on either side of midnight today, in the default timezone and in New York
+        self.events = random_events(300, seed=9) + [
+            {'event_date': date_str, 'event_time': time_str, 'starts_at': parse_event_start(date_str, time_str, NOW)}
+            for date_str in ('2025-04-15', '2025-04-16')
+            for time_str in ('12:00 AM', '11:59 PM', '12:30 AM EDT', '2:59 AM EDT', '3:00 AM EDT', '11:30 PM EDT')
+        ]
+        self.index = EventDateIndex(self.events)
+
+    def test_upcoming_matches_is_future_event(self):
+        with mock.patch.object(event_search_agent, 'datetime', FixedDatetime), \
+                mock.patch.object(event_search_agent, 'CURRENT_DATE', NOW.replace(tzinfo=None)):
+            expected = [event_id for event_id, event in enumerate(self.events)
+                        if event_search_agent.is_future_event(dict(event))]
+        self.assertEqual(sorted(self.index.upcoming_ids(NOW)), expected)
+
+    def test_day_boundary_is_midnight_in_the_index_timezone(self):
+        eastern = get_timezone('America/New_York')
+        events = [
+            {'starts_at': NOW.replace(hour=0, minute=0)},
+            {'starts_at': NOW.replace(hour=0, minute=0) - timedelta(minutes=1)},
+            # Already April 16 in New York, but still April 15 in the index timezone
+            {'starts_at': datetime(2025, 4, 16, 1, 0, tzinfo=eastern)},
+            {'starts_at': None}
+        ]
+        self.assertEqual(EventDateIndex(events).upcoming_ids(NOW), [0, 3])
+
+    def test_windows_match_a_scan(self):
+        for window in DATE_WINDOWS + ('next 7 days', 'next_30_days'):
+            with self.subTest(window=window):
+                start, end = self.index.window_bounds(window, NOW)
+                expected = sorted(
+                    (event['starts_at'], event_id) for event_id, event in enumerate(self.events)
+                    if event['starts_at'] is not None and start <= event['starts_at'] < end
+                )
+                self.assertEqual(self.index.window_ids(window, NOW), [event_id for _, event_id in expected])
+
+    def test_window_bounds(self):
+        day = NOW.replace(hour=0)
+        self.assertEqual(self.index.window_bounds('today', NOW), (day, day + timedelta(days=1)))
+        self.assertEqual(self.index.window_bounds('This Week', NOW), (day, day + timedelta(days=5)))
+        self.assertEqual(self.index.window_bounds('this_weekend', NOW),
+                         (day + timedelta(days=3), day + timedelta(days=5)))
+        self.assertEqual(self.index.window_bounds('next_week', NOW),
+                         (day + timedelta(days=5), day + timedelta(days=12)))
+        self.assertEqual(self.index.window_bounds('this_month', NOW), (day, day.replace(month=5, day=1)))
+        with self.assertRaises(ValueError):
+            self.index.window_bounds('someday', NOW)
+
+    def test_extended_matches_rebuild(self):
+        more_events = self.events + random_events(50, seed=10)
+        extended = self.index.extended(more_events, range(len(self.events), len(more_events)))
+        rebuilt = EventDateIndex(more_events)
+        self.assertEqual(extended.event_ids, rebuilt.event_ids)
+        self.assertEqual(extended.timestamps, rebuilt.timestamps)
+        self.assertEqual(extended.undated_ids, rebuilt.undated_ids)
+        # The index the current snapshot uses is unchanged
+        self.assertEqual(len(self.index.event_ids) + len(self.index.undated_ids), len(self.events))
+
+
+if __name__ == '__main__':
+    unittest.main()
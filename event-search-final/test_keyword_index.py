@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the keyword index: lookups return the same documents as the
+case-insensitive substring scan they replace, and the cache of substring
+matches stays bounded and follows new documents
+"""
+
+import random
+import unittest
+
+from keyword_index import KeywordIndex
+
+
+def scan(texts, keyword):
+    """The substring scan the index replaces"""
+    return {doc_id for doc_id, text in texts.items() if keyword.lower() in text.lower()}
+
+
+class KeywordIndexTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        words = ['OpenAI', 'AI', 'agents', 'Venture', 'capital', 'venture-capital', 'SF', 'San Francisco',
+                 'Berkeley, CA', 'Chicago', 'C++', 'Rust/WASM', 'data', 'database', 'metadata', 'founder',
+                 'co-founders', 'demo', 'night', '2025', 'Q&A']
+        self.texts = {doc_id: ' '.join(rng.choices(words, k=rng.randint(0, 12))) for doc_id in range(200)}
+        self.index = KeywordIndex()
+        for doc_id, text in self.texts.items():
+            self.index.add(doc_id, text)
+
+    def test_lookup_matches_substring_scan(self):
+        keywords = ['ai', 'AI', 'open', 'penai', 'a', 'data', 'ata', 'atab', 'venture capital', 'venture-capital',
+                    'ture cap', 'e c', 'san francisco', 'cisco', 'ca', 'chi', 'c++', '++', 'rust/wasm', 'q&a',
+                    '&', ' ', 'founders', 'co-found', '202', 'demo night', 'night demo', 'zzz', '']
+        for keyword in keywords:
+            with self.subTest(keyword=keyword):
+                self.assertEqual(self.index.lookup(keyword), scan(self.texts, keyword))
+
+        self.assertEqual(self.index.lookup_all(['ai', 'zzz']),
+                         {'ai': scan(self.texts, 'ai'), 'zzz': set()})
+
+    def test_substring_cache_is_bounded(self):
+        index = KeywordIndex(cache_size=4)
+        for doc_id, text in self.texts.items():
+            index.add(doc_id, text)
+        for keyword in ['ai', 'data', 'open', 'venture', 'found', 'night', 'chi']:
+            self.assertEqual(index.lookup(keyword), scan(self.texts, keyword))
+        self.assertEqual(list(index._substring_postings), ['venture', 'found', 'night', 'chi'])
+
+        # A hit moves the token to the end, so it outlives older entries
+        index.lookup('venture')
+        index.lookup('demo')
+        self.assertEqual(list(index._substring_postings), ['night', 'chi', 'venture', 'demo'])
+
+    def test_added_documents_are_found(self):
+        self.index.lookup('quant')
+        self.index.add(500, 'Quantum computing night')
+        self.texts[500] = 'Quantum computing night'
+        for keyword in ['quant', 'uantum', 'computing night', 'night']:
+            with self.subTest(keyword=keyword):
+                self.assertEqual(self.index.lookup(keyword), scan(self.texts, keyword))
+
+
+if __name__ == '__main__':
+    unittest.main()
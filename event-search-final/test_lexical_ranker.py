@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the BM25 ranker: idf and length normalization on a small corpus, and
+scores matching a per-event BM25 scan over a larger one
+"""
+
+import math
+import random
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from keyword_index import TOKEN_PATTERN
+from lexical_ranker import BM25Ranker, BM25_K1, BM25_B, NAME_WEIGHT, event_search_text
+
+
+def event(name: str = '', description: str = '', **fields) -> dict:
+    return dict(fields, event_name=name, event_description=description)
+
+
+def scan_scores(events, keywords, k1: float = BM25_K1, b: float = BM25_B):
+    """BM25 computed event by event, without the precomputed term matrix"""
+    counts = []
+    for item in events:
+        tokens = Counter(TOKEN_PATTERN.findall(event_search_text(item).lower()))
+        for token in TOKEN_PATTERN.findall(item['event_name'].lower()):
+            tokens[token] += NAME_WEIGHT
+        counts.append(tokens)
+    avg_length = sum(sum(tokens.values()) for tokens in counts) / len(counts)
+    terms = {token for keyword in keywords for token in TOKEN_PATTERN.findall(keyword.lower())}
+
+    scores = []
+    for tokens in counts:
+        length = sum(tokens.values())
+        score = 0.0
+        for term in terms:
+            tf = tokens.get(term, 0)
+            if not tf:
+                continue
+            df = sum(1 for other in counts if term in other)
+            idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        scores.append(score)
+    best = max(scores)
+    return [score / best if best else 0.0 for score in scores]
+
+
+class BM25RankerTest(unittest.TestCase):
+    def test_idf_and_length_normalization(self):
+        events = [
+            event(description='python python'),
+            event(description='python rust rust rust'),
+            event(description='go'),
+        ]
+        ranker = BM25Ranker(events)
+
+        # Average length 7/3; "python" is in 2 of 3 events and "rust" in 1
+        def weight(tf, length, df):
+            idf = math.log(1 + (3 - df + 0.5) / (df + 0.5))
+            return idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / (7 / 3)))
+
+        np.testing.assert_allclose(ranker.score(['python']),
+                                   [1.0, weight(1, 4, 2) / weight(2, 2, 2), 0.0], rtol=1e-6)
+        np.testing.assert_allclose(ranker.score(['rust']), [0.0, 1.0, 0.0])
+
+        # The same term frequency counts for more in a shorter event
+        shorter = BM25Ranker([event(description='ai'), event(description='ai ml ml ml'), event(description='x')])
+        scores = shorter.score(['ai'])
+        self.assertGreater(scores[0], scores[1])
+
+    def test_name_tokens_count_more(self):
+        ranker = BM25Ranker([
+            event(name='Robotics', description='demo night'),
+            event(name='Demo night', description='robotics'),
+        ])
+        scores = ranker.score(['robotics'])
+        self.assertEqual(scores[0], 1.0)
+        self.assertLess(scores[1], 1.0)
+
+    def test_matches_per_event_scan(self):
+        rng = random.Random(11)
+        vocabulary = ['ai', 'agents', 'python', 'rust', 'startup', 'venture', 'capital', 'climate', 'health',
+                      'design', 'data', 'robotics', 'founders', 'demo', 'night', 'hackathon']
+        events = []
+        for _ in range(80):
+            events.append(event(
+                name=' '.join(rng.choices(vocabulary, k=rng.randint(1, 4))),
+                description=' '.join(rng.choices(vocabulary, k=rng.randint(0, 30))),
+                event_location=rng.choice(['San Francisco, CA', 'Oakland', 'Online']),
+                host_name=rng.choice(['AI Collective', 'Founders Inc', '']),
+                speakers=[{'name': 'Ada', 'title': rng.choice(['CTO', 'Data Lead']), 'company': 'Acme'}]
+            ))
+        ranker = BM25Ranker(events)
+
+        for keywords in (['ai'], ['venture capital'], ['Rust', 'python'], ['data', 'acme', 'oakland'],
+                         ['founders', 'demo night', 'climate']):
+            with self.subTest(keywords=keywords):
+                np.testing.assert_allclose(ranker.score(keywords), scan_scores(events, keywords),
+                                           rtol=1e-5, atol=1e-6)
+
+    def test_unknown_terms_and_empty_corpus(self):
+        ranker = BM25Ranker([event(description='python')])
+        self.assertEqual(ranker.score(['cobol']).tolist(), [0.0])
+        self.assertEqual(ranker.score([]).tolist(), [0.0])
+        self.assertEqual(len(BM25Ranker([]).score(['python'])), 0)
+
+    def test_matched_keywords_need_every_term(self):
+        ranker = BM25Ranker([event(name='Venture night', description='meet capital allocators')])
+        self.assertEqual(ranker.matched_keywords(0, ['venture capital', 'private equity', 'Night']),
+                         ['venture capital', 'Night'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for vectorized ranking: combined scores match the per-event formula for
+every recency curve, and top-k selection matches a stable descending sort
+"""
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+from ranking import RECENCY_CURVES, DEFAULT_RECENCY_STEPS, recency_scores, combined_scores, top_k_indices
+
+RECENCY_WEIGHT = 0.2
+HALF_LIFE_DAYS = 14.0
+
+
+def scalar_recency(days: float, curve: str) -> float:
+    """Recency score of one event, computed the way the per-event scoring loop did"""
+    days = max(0, days)
+    if curve == "log":
+        return 1.0 / (1.0 + math.log(1 + days))
+    if curve == "exp":
+        return 0.5 ** (days / HALF_LIFE_DAYS)
+    for max_days, score in DEFAULT_RECENCY_STEPS:
+        if days <= max_days:
+            return score
+    return 0.0
+
+
+def scalar_combined_score(relevance: float, days: float, has_date: bool, curve: str) -> float:
+    """Combined score of one event; undated events are ranked on relevance alone"""
+    if not has_date:
+        return relevance
+    return (1 - RECENCY_WEIGHT) * relevance + RECENCY_WEIGHT * scalar_recency(days, curve)
+
+
+def sorted_top_k(scores, k: int):
+    """The top k positions as sorted(..., reverse=True) picks them, ties in input order"""
+    return sorted(range(len(scores)), key=lambda position: scores[position], reverse=True)[:k]
+
+
+class RankingTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        n = 60
+        # Few distinct relevance values and day counts, so many events tie exactly
+        self.relevance = np.array([rng.choice([0.0, 0.3, 0.5, 0.7, 1.0]) for _ in range(n)])
+        self.days = np.array([float(rng.choice([-3, 0, 1, 7, 8, 30, 31, 90, 91, 400])) for _ in range(n)])
+        self.has_date = np.array([rng.random() > 0.3 for _ in range(n)])
+
+    def test_every_curve_matches_per_event_scores(self):
+        for curve in RECENCY_CURVES:
+            with self.subTest(curve=curve):
+                recency = recency_scores(self.days, curve, HALF_LIFE_DAYS, DEFAULT_RECENCY_STEPS)
+                scores = combined_scores(self.relevance, recency, self.has_date, RECENCY_WEIGHT)
+                expected = [scalar_combined_score(relevance, days, has_date, curve)
+                            for relevance, days, has_date in zip(self.relevance, self.days, self.has_date)]
+                np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+
+                # Same selection and order as sorting the per-event scores, for every k
+                for k in range(len(scores) + 3):
+                    self.assertEqual(top_k_indices(scores, k).tolist(), sorted_top_k(expected, k))
+
+    def test_ties_keep_input_order(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1, 0.5, 0.9])
+        self.assertEqual(top_k_indices(scores, 2).tolist(), [1, 3])
+        self.assertEqual(top_k_indices(scores, 4).tolist(), [1, 3, 6, 0])
+        self.assertEqual(top_k_indices(scores, 5).tolist(), [1, 3, 6, 0, 2])
+        self.assertEqual(top_k_indices(np.zeros(5), 3).tolist(), [0, 1, 2])
+
+    def test_undated_events_rank_on_relevance_alone(self):
+        relevance = np.array([0.6, 0.6, 0.6])
+        recency = recency_scores(np.array([0.0, 0.0, 400.0]))
+        scores = combined_scores(relevance, recency, np.array([False, True, True]), RECENCY_WEIGHT)
+        self.assertEqual(scores[0], 0.6)
+        self.assertEqual(top_k_indices(scores, 3).tolist(), [1, 0, 2])
+
+    def test_k_at_or_above_n_returns_everything_sorted(self):
+        scores = np.array([0.2, 0.8, 0.8, 0.4])
+        for k in (4, 5, 100):
+            self.assertEqual(top_k_indices(scores, k).tolist(), [1, 2, 3, 0])
+        self.assertEqual(top_k_indices(scores, 0).tolist(), [])
+        self.assertEqual(top_k_indices(np.zeros(0), 3).tolist(), [])
+
+    def test_past_events_count_as_today(self):
+        for curve in RECENCY_CURVES:
+            with self.subTest(curve=curve):
+                self.assertEqual(recency_scores(np.array([-5.0]), curve)[0], recency_scores(np.array([0.0]), curve)[0])
+
+    def test_unknown_curve_is_rejected(self):
+        with self.assertRaises(ValueError):
+            recency_scores(np.array([1.0]), "linear")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Luma Multi-City Crawl Coordinator
+
+Crawls several Luma city pages at once. Discovery of each city page and the
+detail fetch of every event URL it lists are tasks in a shared SQLite work
+queue; N worker processes claim tasks from the queue, each running its own
+pooled scraper with a share of the Firecrawl rate limit, so adding cities
+spreads the work across cores instead of adding serial runtime.
+
+Every finished detail task keeps its processed rows in the queue. When all
+workers are done, the coordinator writes one Parquet shard per city and
+merges the rows finished in this run into the usual outputs (the Parquet
+event store and the catalog), plus an index of the shards:
+
+    python crawl_coordinator.py sf nyc la --workers 4
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from luma_advanced_scraper import (
+    LumaAdvancedScraper, FIRECRAWL_API_KEY, FIRECRAWL_MAX_CONCURRENCY, save_outputs
+)
+from crawl_state import CRAWL_STATE_FILE
+from request_scheduler import FIRECRAWL_RATE_LIMIT
+from response_archive import ARCHIVE_DIR
+
+logger = logging.getLogger('crawl_coordinator')
+
+# Default location of the work queue database
+CRAWL_QUEUE_FILE = "crawl_queue.db"
+
+# Directory for the per-city Parquet shards and the shard index
+SHARD_DIR = "crawl_shards"
+
+# Worker processes to run (defaults to the number of CPU cores)
+CRAWL_WORKERS = int(os.getenv('CRAWL_WORKERS', str(os.cpu_count() or 1)))
+
+# Seconds an idle worker waits for discovery tasks to add more work
+POLL_INTERVAL_SECONDS = 1.0
+
+# Running tasks claimed longer ago than this are assumed to belong to a dead worker
+STALE_CLAIM_SECONDS = 15 * 60
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    city TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    claimed_at REAL,
+    finished_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    UNIQUE (kind, url)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, kind);
+CREATE INDEX IF NOT EXISTS idx_tasks_city ON tasks(city, kind, status);
+"""
+
+
+def city_page_url(city: str) -> str:
+    """Get the Luma events page of a city slug like "sf", or pass a full URL through"""
+    return city if city.startswith('http') else f"https://lu.ma/{city.strip('/')}"
+
+
+def city_slug(page_url: str) -> str:
+    """Get the city slug of a Luma events page, e.g. https://lu.ma/sf becomes sf"""
+    return page_url.rstrip('/').rsplit('/', 1)[-1].lower()
+
+
+class WorkQueue:
+    """SQLite work queue of discovery and detail tasks shared by worker processes"""
+
+    def __init__(self, db_path: str = CRAWL_QUEUE_FILE):
+        """
+        Open the queue, creating the schema if needed
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        # Transactions are managed explicitly so a claim can take the write lock up front
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(QUEUE_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_tasks(self, kind: str, city: str, urls: List[str]) -> int:
+        """
+        Add tasks for URLs that are not queued yet, and re-queue tasks that failed
+
+        Callers leave out URLs that should not be fetched again, such as dead-lettered ones.
+
+        Args:
+            kind: 'discover' for a city page, 'detail' for an event page
+            city: City slug the URLs belong to
+            urls: URLs to fetch
+
+        Returns:
+            Number of tasks added or re-queued
+        """
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                """
+                INSERT INTO tasks (kind, city, url) VALUES (?, ?, ?)
+                ON CONFLICT(kind, url) DO UPDATE SET status = 'pending', worker = NULL, error = NULL
+                WHERE tasks.status = 'failed'
+                """,
+                [(kind, city, url) for url in dict.fromkeys(urls)]
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.conn.total_changes - before
+
+    def start_discovery(self, page_urls: List[str]) -> None:
+        """Queue discovery of city pages, re-running discovery of pages crawled before"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for page_url in page_urls:
+                self.conn.execute(
+                    """
+                    INSERT INTO tasks (kind, city, url) VALUES ('discover', ?, ?)
+                    ON CONFLICT(kind, url) DO UPDATE SET status = 'pending', worker = NULL, error = NULL
+                    """,
+                    (city_slug(page_url), page_url)
+                )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim the next pending task, discovery tasks first
+
+        Tasks left running by a worker that died are reclaimed after STALE_CLAIM_SECONDS.
+
+        Args:
+            worker: Name of the claiming worker
+
+        Returns:
+            Dictionary with the task id, kind, city and url, or None if nothing is pending
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL WHERE status = 'running' AND claimed_at < ?",
+                (now - STALE_CLAIM_SECONDS,)
+            )
+            row = self.conn.execute(
+                "SELECT id, kind, city, url FROM tasks WHERE status = 'pending' ORDER BY kind = 'detail', id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'running', worker = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (worker, now, row[0])
+                )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        return dict(zip(('id', 'kind', 'city', 'url'), row))
+
+    def complete(self, task_id: int, rows: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Mark a task done, keeping the processed rows of a detail task"""
+        self.conn.execute(
+            "UPDATE tasks SET status = 'done', finished_at = ?, error = NULL, result = ? WHERE id = ?",
+            (time.time(), json.dumps(rows) if rows is not None else None, task_id)
+        )
+
+    def fail(self, task_id: int, error: str) -> None:
+        """Mark a task failed"""
+        self.conn.execute(
+            "UPDATE tasks SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+            (time.time(), error, task_id)
+        )
+
+    def is_drained(self) -> bool:
+        """Check if no task is pending or running"""
+        row = self.conn.execute("SELECT 1 FROM tasks WHERE status IN ('pending', 'running') LIMIT 1").fetchone()
+        return row is None
+
+    def get_rows(self, city: Optional[str] = None, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get the processed rows of finished detail tasks
+
+        Args:
+            city: Only rows of this city (None for all cities)
+            since: Only rows of tasks finished at or after this Unix time (None for all)
+
+        Returns:
+            Processed event rows, in task order
+        """
+        query = "SELECT result FROM tasks WHERE kind = 'detail' AND status = 'done' AND result IS NOT NULL"
+        params = []
+        if city is not None:
+            query += " AND city = ?"
+            params.append(city)
+        if since is not None:
+            query += " AND finished_at >= ?"
+            params.append(since)
+
+        rows = []
+        for (result,) in self.conn.execute(query + " ORDER BY id", params):
+            rows.extend(json.loads(result))
+        return rows
+
+    def get_counts(self) -> Dict[str, Dict[str, int]]:
+        """Get the number of detail tasks with each status per city"""
+        counts = {}
+        for city, status, count in self.conn.execute(
+            "SELECT city, status, COUNT(*) FROM tasks WHERE kind = 'detail' GROUP BY city, status"
+        ):
+            counts.setdefault(city, {})[status] = count
+        return counts
+
+
+async def _run_task(queue: WorkQueue, scraper: LumaAdvancedScraper, task: Dict[str, Any],
+                    page_urls: set) -> None:
+    """Run one claimed task and record its outcome in the queue"""
+    if task['kind'] == 'discover':
+        event_urls = [url for url in await scraper.get_event_urls(task['url']) if url not in page_urls]
+        if not event_urls:
+            queue.fail(task['id'], "No event URLs found")
+            return
+
+        # Skip events scraped or dead-lettered in earlier crawls
+        scraper.crawl_state.mark_discovered(event_urls)
+        new_urls = [url for url in event_urls
+                    if not scraper.crawl_state.is_scraped(url) and not scraper.scheduler.is_dead_lettered(url)]
+        added = queue.add_tasks('detail', task['city'], new_urls)
+        logger.info(f"Queued {added} new event URLs from {task['url']}")
+        queue.complete(task['id'])
+        return
+
+    event_data = await scraper.get_event_details(task['url'])
+    if event_data is None:
+        queue.fail(task['id'], "Event details could not be fetched or were invalid")
+        return
+    queue.complete(task['id'], scraper.process_event_data(event_data, task['url']))
+
+
+async def _worker_loop(worker: str, queue: WorkQueue, scraper: LumaAdvancedScraper, page_urls: set) -> int:
+    """Claim and run tasks with max_concurrency tasks in flight until the queue is drained"""
+    finished = 0
+
+    async def claim_and_run():
+        nonlocal finished
+        while True:
+            if scraper.scheduler.account_error:
+                # Every request would fail the same way; leave the remaining tasks queued
+                return
+            task = queue.claim(worker)
+            if task is None:
+                # Running discovery tasks may still add detail tasks
+                if queue.is_drained():
+                    return
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                continue
+            try:
+                await _run_task(queue, scraper, task, page_urls)
+            except Exception as e:
+                logger.error(f"Error running {task['kind']} task for {task['url']}: {e}")
+                queue.fail(task['id'], str(e))
+            finished += 1
+
+    await asyncio.gather(*(claim_and_run() for _ in range(scraper.max_concurrency)))
+    return finished
+
+
+def run_worker(worker: str, api_key: str, page_urls: List[str], queue_file: str, crawl_state_file: str,
+               archive_dir: str, max_concurrency: int, rate_limit: float) -> int:
+    """
+    Run one worker process until the queue is drained
+
+    Returns:
+        Number of tasks the worker ran
+    """
+    async def run():
+        with WorkQueue(queue_file) as queue:
+            async with LumaAdvancedScraper(api_key, max_concurrency=max_concurrency,
+                                           crawl_state_file=crawl_state_file, archive_dir=archive_dir,
+                                           rate_limit=rate_limit, shared_state=True) as scraper:
+                finished = await _worker_loop(worker, queue, scraper, set(page_urls))
+                logger.info(f"Worker {worker} ran {finished} tasks; Firecrawl request stats: {scraper.scheduler.stats}")
+                return finished
+
+    return asyncio.run(run())
+
+
+def write_shards(queue: WorkQueue, scraper: LumaAdvancedScraper, page_urls: List[str],
+                 shard_dir: str = SHARD_DIR) -> Dict[str, Any]:
+    """
+    Write one Parquet shard per city with all of its scraped events, and an index of the shards
+
+    Returns:
+        The shard index
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    counts = queue.get_counts()
+    index = {'generated_at': datetime.now().isoformat(timespec='seconds'), 'cities': {}}
+
+    for page_url in page_urls:
+        city = city_slug(page_url)
+        rows = queue.get_rows(city)
+        shard_file = os.path.join(shard_dir, f"luma_{city}_events.parquet")
+        scraper.save_events_to_parquet(rows, shard_file, overwrite=True)
+        index['cities'][city] = {
+            'page_url': page_url,
+            'shard': shard_file,
+            'rows': len(rows),
+            'tasks': counts.get(city, {})
+        }
+
+    with open(os.path.join(shard_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    return index
+
+
+async def crawl_cities(cities: List[str], workers: int = CRAWL_WORKERS,
+                       max_concurrency: int = FIRECRAWL_MAX_CONCURRENCY, queue_file: str = CRAWL_QUEUE_FILE,
+                       crawl_state_file: str = CRAWL_STATE_FILE, archive_dir: str = ARCHIVE_DIR,
+                       shard_dir: str = SHARD_DIR) -> Dict[str, Any]:
+    """
+    Crawl several Luma city pages with a pool of worker processes
+
+    The Firecrawl rate limit and concurrency are split between the workers, so the
+    whole crawl stays within the limits of a single scraper.
+
+    Args:
+        cities: City slugs like "sf" or full Luma events page URLs
+        workers: Number of worker processes
+        max_concurrency: Firecrawl requests in flight across all workers
+        queue_file: Work queue database
+        crawl_state_file: Crawl state database shared by the workers
+        archive_dir: Raw response archive shared by the workers
+        shard_dir: Directory for the per-city shards and their index
+
+    Returns:
+        The shard index
+    """
+    page_urls = list(dict.fromkeys(city_page_url(city) for city in cities))
+    workers = max(1, workers)
+    started_at = time.time()
+
+    with WorkQueue(queue_file) as queue:
+        queue.start_discovery(page_urls)
+
+    logger.info(f"Crawling {len(page_urls)} city pages with {workers} worker processes")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_worker, f"worker-{number}", FIRECRAWL_API_KEY, page_urls, queue_file,
+                            crawl_state_file, archive_dir, max(1, max_concurrency // workers),
+                            FIRECRAWL_RATE_LIMIT / workers)
+            for number in range(workers)
+        ]
+        finished = sum(future.result() for future in futures)
+    logger.info(f"Workers ran {finished} tasks in {time.time() - started_at:.1f}s")
+
+    with WorkQueue(queue_file) as queue:
+        async with LumaAdvancedScraper(FIRECRAWL_API_KEY, crawl_state_file=crawl_state_file,
+                                       archive_dir=archive_dir) as scraper:
+            index = write_shards(queue, scraper, page_urls, shard_dir)
+
+            # Merge the rows scraped in this run into the shared outputs
+            save_outputs(scraper, queue.get_rows(since=started_at))
+
+    return index
+
+
+def main():
+    """Main function to run the coordinator"""
+    parser = argparse.ArgumentParser(description='Crawl several Luma city pages with a pool of worker processes')
+    parser.add_argument('cities', nargs='+', help='City slugs (e.g. sf nyc la) or Luma events page URLs')
+    parser.add_argument('--workers', type=int, default=CRAWL_WORKERS, help='Worker processes (default: number of CPU cores)')
+    parser.add_argument('--concurrency', type=int, default=FIRECRAWL_MAX_CONCURRENCY,
+                        help='Firecrawl requests in flight across all workers')
+    parser.add_argument('--queue', type=str, default=CRAWL_QUEUE_FILE, help='Work queue database')
+    parser.add_argument('--archive', type=str, default=ARCHIVE_DIR, help='Raw response archive directory')
+    parser.add_argument('--shards', type=str, default=SHARD_DIR, help='Directory for the per-city shards')
+    args = parser.parse_args()
+
+    if not FIRECRAWL_API_KEY:
+        logger.error("Firecrawl API key not found. Please set FIRECRAWL_API_KEY in .env file")
+        return
+
+    index = asyncio.run(crawl_cities(args.cities, args.workers, args.concurrency, args.queue,
+                                     archive_dir=args.archive, shard_dir=args.shards))
+    for city, shard in index['cities'].items():
+        logger.info(f"{city}: {shard['rows']} rows in {shard['shard']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Luma Crawl State
+
+Per-URL crawl progress for the scraper, stored in a SQLite table instead of a
+pickled set that is rewritten after every batch. Each URL has a status:
+- discovered: found on an events page but not fetched yet
+- scraped: fetched and extracted successfully
+- failed: the fetch failed permanently
+- rejected: fetched, but the extracted data was not a usable event
+
+along with its last fetch time, the hash of its last fetched content, the
+number of fetch attempts, and the refresh history used to schedule recrawls
+(event start time, last check, number of checks and of content changes).
+Every update is a single-row write committed on its own (in WAL mode), so an
+interrupted crawl resumes from the last finished URL. Statuses are mirrored
+in memory for O(1) membership checks. The coordinator's worker processes
+share one database; a write that still finds it locked after the busy timeout
+is logged and skipped rather than failing the fetch it records.
+"""
+
+import os
+import io
+import pickle
+import sqlite3
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger('crawl_state')
+
+# Default location of the crawl state database
+CRAWL_STATE_FILE = "crawl_state.db"
+
+# Pickled set of scraped URLs written by earlier versions of the scraper
+LEGACY_SCRAPED_URLS_FILE = "scraped_urls.pkl"
+
+STATUSES = ('discovered', 'scraped', 'failed', 'rejected')
+
+# Columns added after the first release of the table, with their definitions
+MIGRATED_COLUMNS = {
+    'starts_at': 'TEXT',
+    'checked_at': 'TEXT',
+    'checks': 'INTEGER NOT NULL DEFAULT 0',
+    'change_count': 'INTEGER NOT NULL DEFAULT 0'
+}
+
+# Seconds to wait for a lock held by another process sharing the database
+BUSY_TIMEOUT_SECONDS = 30
+
+# Compact after this many writes, or when this fraction of the file is free pages
+COMPACT_EVERY_WRITES = 1000
+COMPACT_FREE_RATIO = 0.25
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_urls (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    discovered_at TEXT NOT NULL,
+    last_fetch_at TEXT,
+    content_hash TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    starts_at TEXT,
+    checked_at TEXT,
+    checks INTEGER NOT NULL DEFAULT 0,
+    change_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_crawl_urls_status ON crawl_urls(status);
+"""
+
+
+class _SetUnpickler(pickle.Unpickler):
+    """Unpickler that only accepts the builtins a pickled set of URL strings needs"""
+
+    def find_class(self, module, name):
+        if module == 'builtins' and name in ('set', 'frozenset'):
+            return getattr(__import__('builtins'), name)
+        raise pickle.UnpicklingError(f"Refusing to load {module}.{name} from {LEGACY_SCRAPED_URLS_FILE}")
+
+
+def load_legacy_scraped_urls(path: str) -> List[str]:
+    """
+    Read the URLs from a legacy scraped_urls.pkl file
+
+    Args:
+        path: Path to the pickle file
+
+    Returns:
+        List of URLs, or an empty list if the file is missing or not a pickled set of strings
+    """
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'rb') as f:
+            urls = _SetUnpickler(io.BytesIO(f.read())).load()
+    except Exception as e:
+        logger.warning(f"Error loading legacy scraped URLs from {path}: {e}")
+        return []
+    return [url for url in urls if isinstance(url, str)]
+
+
+class CrawlState:
+    """SQLite-backed registry of crawl status per URL"""
+
+    def __init__(self, db_path: str = CRAWL_STATE_FILE, legacy_pickle: Optional[str] = LEGACY_SCRAPED_URLS_FILE,
+                 shared: bool = False):
+        """
+        Open the crawl state, importing a legacy scraped_urls.pkl into a new database
+
+        Args:
+            db_path: Path to the SQLite database file
+            legacy_pickle: Pickled set of scraped URLs to import on first use (None to skip)
+            shared: Other processes write to the database at the same time, so it is never vacuumed
+        """
+        self.db_path = db_path
+        self.shared = shared
+        self.conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._writes = 0
+
+        self.statuses = dict(self.conn.execute("SELECT url, status FROM crawl_urls"))
+
+        if not self.statuses and legacy_pickle:
+            legacy_urls = load_legacy_scraped_urls(legacy_pickle)
+            if legacy_urls:
+                now = self._now()
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO crawl_urls (url, status, discovered_at) VALUES (?, 'scraped', ?)",
+                        [(url, now) for url in legacy_urls]
+                    )
+                self.statuses.update((url, 'scraped') for url in legacy_urls)
+                logger.info(f"Imported {len(legacy_urls)} scraped URLs from {legacy_pickle}")
+
+        logger.info(f"Loaded crawl state for {len(self.statuses)} URLs from {db_path}")
+
+    def _migrate(self) -> None:
+        """Add columns missing from databases created by older versions"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(crawl_urls)")}
+        with self.conn:
+            for name, definition in MIGRATED_COLUMNS.items():
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE crawl_urls ADD COLUMN {name} {definition}")
+
+    def close(self) -> None:
+        """Compact and close the database"""
+        self.compact()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.statuses
+
+    def get_status(self, url: str) -> Optional[str]:
+        """Get the status of a URL, or None if it has never been seen"""
+        return self.statuses.get(url)
+
+    def is_scraped(self, url: str) -> bool:
+        """Check if a URL has been scraped successfully"""
+        return self.statuses.get(url) == 'scraped'
+
+    def get_urls(self, status: str) -> List[str]:
+        """Get all URLs with a status"""
+        return [url for url, url_status in self.statuses.items() if url_status == status]
+
+    def get_record(self, url: str) -> Optional[Dict[str, str]]:
+        """Get the stored row for a URL"""
+        row = self.conn.execute(
+            "SELECT url, status, discovered_at, last_fetch_at, content_hash, attempts, error FROM crawl_urls WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('url', 'status', 'discovered_at', 'last_fetch_at', 'content_hash', 'attempts', 'error')
+        return dict(zip(keys, row))
+
+    def mark_discovered(self, urls: Iterable[str]) -> int:
+        """
+        Record URLs found on an events page; URLs already known keep their status
+
+        Args:
+            urls: Discovered URLs
+
+        Returns:
+            Number of URLs that were new
+        """
+        new_urls = [url for url in dict.fromkeys(urls) if url not in self.statuses]
+        if not new_urls:
+            return 0
+
+        now = self._now()
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO crawl_urls (url, status, discovered_at) VALUES (?, 'discovered', ?)",
+                    [(url, now) for url in new_urls]
+                )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Error recording {len(new_urls)} discovered URLs: {e}")
+        self.statuses.update((url, 'discovered') for url in new_urls)
+        self._count_writes(len(new_urls))
+        return len(new_urls)
+
+    def mark_scraped(self, url: str, content_hash: Optional[str] = None, starts_at: Optional[str] = None) -> bool:
+        """
+        Record a successful fetch and the hash of the fetched content
+
+        Args:
+            url: Event URL
+            content_hash: Hash of the fetched content
+            starts_at: ISO 8601 start time of the event, if known
+
+        Returns:
+            True if the content differs from a previously fetched version
+        """
+        record = self.get_record(url)
+        changed = bool(record and record['content_hash'] and content_hash and record['content_hash'] != content_hash)
+        self._record_fetch(url, 'scraped', content_hash=content_hash, starts_at=starts_at, changed=changed)
+        return changed
+
+    def mark_checked(self, url: str) -> None:
+        """Record a refresh check that found the content unchanged"""
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE crawl_urls SET checked_at = ?, checks = checks + 1 WHERE url = ?", (self._now(), url)
+                )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Error recording refresh check of {url}: {e}")
+        self._count_writes(1)
+
+    def get_refresh_records(self) -> List[Dict[str, Any]]:
+        """
+        Get the refresh history of every scraped URL
+
+        Returns:
+            List of dictionaries with url, starts_at, checked_at, checks and change_count
+        """
+        rows = self.conn.execute(
+            """
+            SELECT url, starts_at, COALESCE(checked_at, last_fetch_at, discovered_at), checks, change_count
+            FROM crawl_urls WHERE status = 'scraped'
+            """
+        ).fetchall()
+        keys = ('url', 'starts_at', 'checked_at', 'checks', 'change_count')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def mark_failed(self, url: str, error: str = '') -> None:
+        """Record a permanently failed fetch"""
+        self._record_fetch(url, 'failed', error=error)
+
+    def mark_rejected(self, url: str, reason: str = '', content_hash: Optional[str] = None) -> None:
+        """Record a fetch whose content was not a usable event"""
+        self._record_fetch(url, 'rejected', content_hash=content_hash, error=reason)
+
+    def get_counts(self) -> Dict[str, int]:
+        """Get the number of URLs with each status"""
+        counts = {status: 0 for status in STATUSES}
+        for status in self.statuses.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def compact(self, force: bool = False) -> None:
+        """
+        Fold the write-ahead log into the database and reclaim free pages
+
+        A shared database is only checkpointed, without waiting for the other
+        processes: vacuuming needs an exclusive lock, so it is left to a
+        process that has the database to itself, such as the coordinator.
+
+        Args:
+            force: Vacuum even if little of the file is free pages
+        """
+        try:
+            if self.shared:
+                self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                self._writes = 0
+                return
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if force or (page_count and free_pages / page_count > COMPACT_FREE_RATIO):
+                self.conn.execute("VACUUM")
+                logger.info(f"Compacted crawl state {self.db_path}")
+            self._writes = 0
+        except sqlite3.Error as e:
+            logger.warning(f"Error compacting crawl state: {e}")
+
+    def _record_fetch(self, url: str, status: str, content_hash: Optional[str] = None, error: str = '',
+                      starts_at: Optional[str] = None, changed: bool = False) -> None:
+        """Upsert the result of one fetch and commit it"""
+        now = self._now()
+        try:
+            with self.conn:
+                self.conn.execute(
+                    """
+                    INSERT INTO crawl_urls (url, status, discovered_at, last_fetch_at, content_hash, attempts, error,
+                                            starts_at, checked_at, checks, change_count)
+                    VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, 1, 0)
+                    ON CONFLICT(url) DO UPDATE SET
+                        status = excluded.status,
+                        last_fetch_at = excluded.last_fetch_at,
+                        content_hash = COALESCE(excluded.content_hash, crawl_urls.content_hash),
+                        attempts = crawl_urls.attempts + 1,
+                        error = excluded.error,
+                        starts_at = COALESCE(excluded.starts_at, crawl_urls.starts_at),
+                        checked_at = excluded.checked_at,
+                        checks = crawl_urls.checks + 1,
+                        change_count = crawl_urls.change_count + ?
+                    """,
+                    (url, status, now, now, content_hash, error or None, starts_at, now, int(changed))
+                )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Error recording {status} fetch of {url}: {e}")
+        self.statuses[url] = status
+        self._count_writes(1)
+
+    def _count_writes(self, count: int) -> None:
+        """Compact after every COMPACT_EVERY_WRITES writes"""
+        self._writes += count
+        if self._writes >= COMPACT_EVERY_WRITES:
+            self.compact()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Luma Event Catalog
+
+Normalized SQLite storage for scraped Luma events. The scraper's CSV output
+repeats the full event details for every speaker row; the catalog stores each
+event once, with its speakers and hosts in separate tables, and indexes the
+URL, date and location columns for filtered reads. Event dates are normalized
+at ingest into a timezone-aware ISO 8601 starts_at column, and locations are
+geocoded offline into latitude and longitude columns.
+
+Usage:
+    python event_catalog.py ingest luma_bay_area_events.csv luma_events.db
+"""
+
+import os
+import csv
+import re
+import sys
+import sqlite3
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable
+
+from event_dates import parse_event_start
+from event_geo import geocode_location
+
+logger = logging.getLogger('event_catalog')
+
+# Default location of the catalog database
+CATALOG_FILE = "luma_events.db"
+
+# File extensions that identify a catalog rather than a CSV file
+CATALOG_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    event_url TEXT NOT NULL,
+    event_name TEXT NOT NULL,
+    event_summary TEXT,
+    event_date TEXT,
+    event_time TEXT,
+    starts_at TEXT,
+    event_location TEXT,
+    latitude REAL,
+    longitude REAL,
+    host_name TEXT,
+    speaker_details TEXT,
+    event_detail TEXT,
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_url ON events(event_url);
+CREATE INDEX IF NOT EXISTS idx_events_date ON events(event_date);
+CREATE INDEX IF NOT EXISTS idx_events_starts_at ON events(starts_at);
+CREATE INDEX IF NOT EXISTS idx_events_location ON events(event_location COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS speakers (
+    event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    title TEXT,
+    company TEXT,
+    PRIMARY KEY (event_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS hosts (
+    event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (event_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_hosts_name ON hosts(name COLLATE NOCASE);
+"""
+
+# Possible CSV column names for each catalog field (both scraper output schemas are in use)
+ROW_FIELD_ALIASES = {
+    'event_name': ['event_name', 'event_title'],
+    'event_summary': ['event_summary'],
+    'event_date': ['event_date'],
+    'event_time': ['event_time'],
+    'event_location': ['event_location'],
+    'event_url': ['event_url'],
+    'host_name': ['host_name', 'host_company'],
+    'speaker_name': ['speaker_name'],
+    'speaker_title': ['speaker_title'],
+    'speaker_company': ['speaker_company'],
+    'speaker_details': ['speaker_details', 'speaker_detail'],
+    'event_detail': ['event_detail']
+}
+
+# Separators between host names in the scraped host_name field
+HOST_SEPARATOR_PATTERN = re.compile(r'\s*(?:,|&|\band\b)\s*', re.IGNORECASE)
+
+# Luma truncates long host lists with a trailing "N others"
+HOST_OVERFLOW_PATTERN = re.compile(r'^\d+\s+others?$', re.IGNORECASE)
+
+
+def is_catalog_path(path: str) -> bool:
+    """Check if a path refers to a catalog database rather than a CSV file"""
+    return bool(path) and path.lower().endswith(CATALOG_EXTENSIONS)
+
+
+def split_host_names(host_name: str) -> List[str]:
+    """Split a scraped host_name field like "A, B & C" into individual host names"""
+    if not host_name or host_name == 'Not specified':
+        return []
+    return [name for name in HOST_SEPARATOR_PATTERN.split(host_name)
+            if name and not HOST_OVERFLOW_PATTERN.match(name)]
+
+
+def row_value(row: Dict[str, Any], field: str) -> str:
+    """Get a field from a CSV row, accepting any of its known column names"""
+    for name in ROW_FIELD_ALIASES[field]:
+        value = row.get(name)
+        if value:
+            return value
+    return ''
+
+
+class EventCatalog:
+    """Normalized SQLite catalog of events, speakers and hosts"""
+
+    def __init__(self, db_path: str = CATALOG_FILE, readonly: bool = False):
+        """
+        Open the catalog, creating the schema if needed
+
+        Args:
+            db_path: Path to the SQLite database file
+            readonly: Open the database without write access
+        """
+        self.db_path = db_path
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._migrate()
+            self.conn.executescript(SCHEMA)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a catalog was created and backfill them"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(events)")}
+        if not columns:
+            return
+
+        if 'starts_at' not in columns:
+            logger.info(f"Adding starts_at column to {self.db_path}")
+            with self.conn:
+                self.conn.execute("ALTER TABLE events ADD COLUMN starts_at TEXT")
+                rows = self.conn.execute("SELECT id, event_date, event_time, updated_at FROM events").fetchall()
+                for event_id, event_date, event_time, updated_at in rows:
+                    reference = datetime.fromisoformat(updated_at) if updated_at else None
+                    starts_at = parse_event_start(event_date or '', event_time or '', reference)
+                    self.conn.execute("UPDATE events SET starts_at = ? WHERE id = ?",
+                                      (starts_at.isoformat() if starts_at else None, event_id))
+
+        if 'latitude' not in columns:
+            logger.info(f"Adding latitude and longitude columns to {self.db_path}")
+            with self.conn:
+                self.conn.execute("ALTER TABLE events ADD COLUMN latitude REAL")
+                self.conn.execute("ALTER TABLE events ADD COLUMN longitude REAL")
+                rows = self.conn.execute("SELECT id, event_location FROM events").fetchall()
+                for event_id, event_location in rows:
+                    coordinates = geocode_location(event_location or '') or (None, None)
+                    self.conn.execute("UPDATE events SET latitude = ?, longitude = ? WHERE id = ?",
+                                      (coordinates[0], coordinates[1], event_id))
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def upsert_event(self, event_data: Dict[str, Any], url: str) -> int:
+        """
+        Insert or replace one event with its speakers and hosts
+
+        Args:
+            event_data: Event data as extracted by the scraper (speakers as a list of dicts)
+            url: URL of the event
+
+        Returns:
+            The catalog id of the event
+        """
+        with self.conn:
+            return self._upsert_event(event_data, url)
+
+    def ingest_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ingest flat CSV-style rows (one row per speaker) into the catalog
+
+        Args:
+            rows: Rows in either of the scraper's CSV schemas
+
+        Returns:
+            Number of distinct events ingested
+        """
+        grouped = {}
+        for row in rows:
+            url = row_value(row, 'event_url')
+            name = row_value(row, 'event_name')
+            if not url or not name:
+                continue
+
+            if url not in grouped:
+                grouped[url] = {
+                    'event_name': name,
+                    'event_summary': row_value(row, 'event_summary'),
+                    'event_date': row_value(row, 'event_date'),
+                    'event_time': row_value(row, 'event_time'),
+                    'event_location': row_value(row, 'event_location'),
+                    'host_name': row_value(row, 'host_name'),
+                    'speaker_details': row_value(row, 'speaker_details'),
+                    'event_detail': row_value(row, 'event_detail'),
+                    'speakers': []
+                }
+
+            speaker_name = row_value(row, 'speaker_name')
+            if speaker_name:
+                grouped[url]['speakers'].append({
+                    'name': speaker_name,
+                    'title': row_value(row, 'speaker_title'),
+                    'company': row_value(row, 'speaker_company')
+                })
+
+        with self.conn:
+            for url, event_data in grouped.items():
+                self._upsert_event(event_data, url)
+
+        logger.info(f"Ingested {len(grouped)} events into {self.db_path}")
+        return len(grouped)
+
+    def ingest_csv(self, csv_file_path: str) -> int:
+        """
+        Ingest a scraper CSV file into the catalog
+
+        Args:
+            csv_file_path: Path to the CSV file
+
+        Returns:
+            Number of distinct events ingested
+        """
+        logger.info(f"Ingesting events from CSV file: {csv_file_path}")
+        with open(csv_file_path, 'r', newline='', encoding='utf-8') as csvfile:
+            return self.ingest_rows(csv.DictReader(csvfile))
+
+    def _upsert_event(self, event_data: Dict[str, Any], url: str) -> int:
+        """Write one event inside the caller's transaction"""
+        starts_at = parse_event_start(event_data.get('event_date', ''), event_data.get('event_time', ''))
+        coordinates = geocode_location(event_data.get('event_location', '')) or (None, None)
+        cursor = self.conn.execute(
+            """
+            INSERT INTO events (event_url, event_name, event_summary, event_date, event_time, starts_at,
+                                event_location, latitude, longitude, host_name, speaker_details, event_detail,
+                                updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(event_url) DO UPDATE SET
+                event_name = excluded.event_name,
+                event_summary = excluded.event_summary,
+                event_date = excluded.event_date,
+                event_time = excluded.event_time,
+                starts_at = excluded.starts_at,
+                event_location = excluded.event_location,
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                host_name = excluded.host_name,
+                speaker_details = excluded.speaker_details,
+                event_detail = excluded.event_detail,
+                updated_at = excluded.updated_at
+            RETURNING id
+            """,
+            (
+                url,
+                event_data.get('event_name', ''),
+                event_data.get('event_summary', ''),
+                event_data.get('event_date', ''),
+                event_data.get('event_time', ''),
+                starts_at.isoformat() if starts_at else None,
+                event_data.get('event_location', ''),
+                coordinates[0],
+                coordinates[1],
+                event_data.get('host_name', ''),
+                event_data.get('speaker_details', ''),
+                event_data.get('event_detail', ''),
+                datetime.now().isoformat(timespec='seconds')
+            )
+        )
+        event_id = cursor.fetchone()[0]
+
+        # Replace speakers and hosts, deduplicating by name
+        self.conn.execute("DELETE FROM speakers WHERE event_id = ?", (event_id,))
+        self.conn.execute("DELETE FROM hosts WHERE event_id = ?", (event_id,))
+
+        seen_speakers = set()
+        for speaker in event_data.get('speakers') or []:
+            name = (speaker.get('name') or '').strip()
+            if not name or name == 'Not specified' or name in seen_speakers:
+                continue
+            seen_speakers.add(name)
+            self.conn.execute(
+                "INSERT INTO speakers (event_id, position, name, title, company) VALUES (?, ?, ?, ?, ?)",
+                (event_id, len(seen_speakers), name, speaker.get('title', ''), speaker.get('company', ''))
+            )
+
+        seen_hosts = set()
+        for name in split_host_names(event_data.get('host_name', '')):
+            if name in seen_hosts:
+                continue
+            seen_hosts.add(name)
+            self.conn.execute(
+                "INSERT INTO hosts (event_id, position, name) VALUES (?, ?, ?)",
+                (event_id, len(seen_hosts), name)
+            )
+
+        return event_id
+
+    # ------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------
+
+    def get_events(self, location: Optional[str] = None, event_date: Optional[str] = None,
+                   host: Optional[str] = None, urls: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get events from the catalog, optionally filtered
+
+        Args:
+            location: Only events whose location contains this text (case-insensitive)
+            event_date: Only events with exactly this date string
+            host: Only events hosted by this host (case-insensitive)
+            urls: Only events with one of these URLs
+
+        Returns:
+            List of event dictionaries in the same shape as the CSV loader produces
+        """
+        conditions = []
+        params = []
+
+        if location:
+            conditions.append("e.event_location LIKE ? COLLATE NOCASE")
+            params.append(f"%{location}%")
+        if event_date:
+            conditions.append("e.event_date = ?")
+            params.append(event_date)
+        if host:
+            conditions.append("e.id IN (SELECT event_id FROM hosts WHERE name = ? COLLATE NOCASE)")
+            params.append(host)
+        if urls is not None:
+            if not urls:
+                return []
+            conditions.append(f"e.event_url IN ({', '.join('?' for _ in urls)})")
+            params.extend(urls)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        event_rows = self.conn.execute(f"SELECT e.* FROM events e {where} ORDER BY e.id", params).fetchall()
+
+        speakers_by_event = {}
+        speaker_rows = self.conn.execute(
+            f"""
+            SELECT s.event_id, s.name, s.title, s.company, e.speaker_details
+            FROM speakers s JOIN events e ON e.id = s.event_id
+            {where}
+            ORDER BY s.event_id, s.position
+            """,
+            params
+        )
+        for row in speaker_rows:
+            speakers_by_event.setdefault(row['event_id'], []).append({
+                'name': row['name'],
+                'title': row['title'] or '',
+                'company': row['company'] or '',
+                'details': row['speaker_details'] or ''
+            })
+
+        return [self._row_to_event(row, speakers_by_event.get(row['id'], [])) for row in event_rows]
+
+    def get_event(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a single event by URL
+
+        Args:
+            url: URL of the event
+
+        Returns:
+            Event dictionary, or None if the event is not in the catalog
+        """
+        events = self.get_events(urls=[url])
+        return events[0] if events else None
+
+    def delete_events(self, urls: List[str]) -> int:
+        """
+        Delete events (with their speakers and hosts) by URL
+
+        Args:
+            urls: URLs of the events to delete
+
+        Returns:
+            Number of events deleted
+        """
+        if not urls:
+            return 0
+        with self.conn:
+            cursor = self.conn.execute(
+                f"DELETE FROM events WHERE event_url IN ({', '.join('?' for _ in urls)})", urls
+            )
+        return cursor.rowcount
+
+    def count_events(self) -> int:
+        """Get the number of events in the catalog"""
+        return self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    @staticmethod
+    def _row_to_event(row: sqlite3.Row, speakers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert an events table row into an event dictionary"""
+        event_date = row['event_date'] or ''
+        event_time = row['event_time'] or ''
+
+        # Catalogs opened read-only may predate the starts_at, latitude and longitude columns
+        if 'starts_at' in row.keys():
+            starts_at = datetime.fromisoformat(row['starts_at']) if row['starts_at'] else None
+        else:
+            starts_at = parse_event_start(event_date, event_time)
+
+        if 'latitude' in row.keys():
+            coordinates = (row['latitude'], row['longitude'])
+        else:
+            coordinates = geocode_location(row['event_location'] or '') or (None, None)
+
+        return {
+            'event_name': row['event_name'],
+            'event_description': row['event_summary'] or '',
+            'event_url': row['event_url'],
+            'event_date_time': f"{event_date} {event_time}".strip(),
+            'event_date': event_date,
+            'event_time': event_time,
+            'starts_at': starts_at,
+            'event_location': row['event_location'] or '',
+            'latitude': coordinates[0],
+            'longitude': coordinates[1],
+            'host_name': row['host_name'] or '',
+            'speakers': speakers,
+            'event_detail': row['event_detail'] or ''
+        }
+
+
+def main():
+    """Command line entry point for building a catalog from a CSV file"""
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Luma Event Catalog')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    ingest_parser = subparsers.add_parser('ingest', help='Ingest a scraper CSV file into the catalog')
+    ingest_parser.add_argument('csv_file', type=str, help='Path to the CSV file')
+    ingest_parser.add_argument('db_file', type=str, nargs='?', default=CATALOG_FILE, help='Path to the catalog database')
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        if not os.path.exists(args.csv_file):
+            logger.error(f"CSV file not found: {args.csv_file}")
+            sys.exit(1)
+        with EventCatalog(args.db_file) as catalog:
+            catalog.ingest_csv(args.csv_file)
+            logger.info(f"Catalog now contains {catalog.count_events()} events")
+
+
+if __name__ == "__main__":
+    main()
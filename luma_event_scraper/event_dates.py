@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Luma Event Dates
+
+Normalizes the free-form date and time strings shown on Luma event pages
+("Monday, April 21" / "5:30 PM - 8:00 PM PDT") into timezone-aware start
+datetimes. Dates are parsed once when events are ingested, so searches can
+compare datetimes instead of re-parsing strings.
+"""
+
+import os
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+# Timezone names for the abbreviations Luma shows after event times
+TIMEZONE_NAMES = {
+    'pdt': 'America/Los_Angeles', 'pst': 'America/Los_Angeles', 'pt': 'America/Los_Angeles',
+    'mdt': 'America/Denver', 'mst': 'America/Denver', 'mt': 'America/Denver',
+    'cdt': 'America/Chicago', 'cst': 'America/Chicago', 'ct': 'America/Chicago',
+    'edt': 'America/New_York', 'est': 'America/New_York', 'et': 'America/New_York',
+    'bst': 'Europe/London', 'gmt': 'UTC', 'utc': 'UTC'
+}
+
+# Fixed UTC offsets (hours) used when the IANA timezone database is not available
+TIMEZONE_OFFSETS = {
+    'America/Los_Angeles': -8, 'America/Denver': -7, 'America/Chicago': -6,
+    'America/New_York': -5, 'Europe/London': 0, 'UTC': 0
+}
+
+# Timezone of events whose time does not name one (the scraper targets the Bay Area)
+DEFAULT_TIMEZONE_NAME = os.environ.get("EVENT_TIMEZONE", "America/Los_Angeles")
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'june': 6, 'july': 7,
+    'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+
+# Numeric formats, tried before the month-name patterns
+NUMERIC_DATE_PATTERNS = [
+    (re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})'), ('year', 'month', 'day')),
+    (re.compile(r'\b(\d{4})/(\d{1,2})/(\d{1,2})\b'), ('year', 'month', 'day')),
+    (re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b'), ('month', 'day', 'year'))
+]
+
+# "April 21", "Apr 21st, 2025", "April 18-20, 2025" (first day of a range)
+MONTH_DAY_PATTERN = re.compile(
+    r'\b([a-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?\b(?:\s*-\s*\d{1,2}(?:st|nd|rd|th)?)?(?:,?\s+(\d{4}))?',
+    re.IGNORECASE
+)
+
+# "21 April", "21st April 2025"
+DAY_MONTH_PATTERN = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]{3,9})\b(?:,?\s+(\d{4}))?', re.IGNORECASE)
+
+# Start time: "5:30 PM", "9 - 10 AM" (the meridiem may only follow the end time)
+TIME_PATTERN = re.compile(r'\b(\d{1,2})(?::(\d{2}))?\s*(?:([ap])\.?m\.?|-\s*\d{1,2}(?::\d{2})?\s*([ap])\.?m\.?)',
+                          re.IGNORECASE)
+
+TIMEZONE_PATTERN = re.compile(r'\b(' + '|'.join(TIMEZONE_NAMES) + r')\b', re.IGNORECASE)
+
+_timezones = {}
+
+
+def get_timezone(name: str) -> tzinfo:
+    """Get a timezone by IANA name, falling back to a fixed offset without tz data"""
+    if name not in _timezones:
+        tz = None
+        if ZoneInfo is not None:
+            try:
+                tz = ZoneInfo(name)
+            except Exception:
+                tz = None
+        if tz is None:
+            tz = timezone(timedelta(hours=TIMEZONE_OFFSETS.get(name, 0)), name)
+        _timezones[name] = tz
+    return _timezones[name]
+
+
+def default_timezone() -> tzinfo:
+    """Get the timezone assumed for events that do not name one"""
+    return get_timezone(DEFAULT_TIMEZONE_NAME)
+
+
+def _parse_date_parts(date_str: str):
+    """Extract (year or None, month, day) from a date string"""
+    for pattern, order in NUMERIC_DATE_PATTERNS:
+        match = pattern.search(date_str)
+        if match:
+            parts = dict(zip(order, (int(group) for group in match.groups())))
+            return parts['year'], parts['month'], parts['day']
+
+    for match in MONTH_DAY_PATTERN.finditer(date_str):
+        month = MONTHS.get(match.group(1).lower())
+        if month:
+            return (int(match.group(3)) if match.group(3) else None), month, int(match.group(2))
+
+    for match in DAY_MONTH_PATTERN.finditer(date_str):
+        month = MONTHS.get(match.group(2).lower())
+        if month:
+            return (int(match.group(3)) if match.group(3) else None), month, int(match.group(1))
+
+    return None
+
+
+def parse_event_start(date_str: str, time_str: str = "", reference: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Parse an event's date and time strings into a timezone-aware start datetime
+
+    Dates without a year are placed in the year that makes them fall on or after
+    the reference date, since Luma only lists upcoming events without a year.
+
+    Args:
+        date_str: Date string like "Monday, April 21" or "2025-04-21"
+        time_str: Time string like "5:30 PM - 8:00 PM PDT" (optional)
+        reference: When the event was ingested (defaults to now)
+
+    Returns:
+        Timezone-aware datetime, or None if the date could not be parsed
+    """
+    if not date_str or date_str == 'Not specified':
+        return None
+
+    parts = _parse_date_parts(date_str)
+    if parts is None:
+        return None
+    year, month, day = parts
+
+    time_str = time_str if time_str and time_str != 'Not specified' else ''
+    tz_match = TIMEZONE_PATTERN.search(time_str) or TIMEZONE_PATTERN.search(date_str)
+    tz = get_timezone(TIMEZONE_NAMES[tz_match.group(1).lower()]) if tz_match else default_timezone()
+
+    hour, minute = 0, 0
+    time_match = TIME_PATTERN.search(time_str)
+    if time_match:
+        hour = int(time_match.group(1)) % 12
+        minute = int(time_match.group(2) or 0)
+        if (time_match.group(3) or time_match.group(4)).lower() == 'p':
+            hour += 12
+
+    if year is None:
+        reference = reference.astimezone(tz) if reference and reference.tzinfo else (reference or datetime.now(tz))
+        year = reference.year
+        try:
+            if datetime(year, month, day).date() < reference.date():
+                year += 1
+        except ValueError:
+            return None
+
+    try:
+        return datetime(year, month, day, hour, minute, tzinfo=tz)
+    except ValueError:
+        return None  # Invalid date like February 30
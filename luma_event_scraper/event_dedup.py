@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Luma Event Deduplication
+
+Finds near-duplicate events: the same event listed under several URLs, or
+reposted with small edits. Each event's name and description are shingled into
+word 3-grams and summarized by a MinHash signature, whose agreement with another
+signature estimates the Jaccard similarity of the two shingle sets. Locality
+sensitive hashing splits the signatures into bands and only compares events
+that share a band bucket on the same date, so finding duplicates costs time
+roughly linear in the number of events instead of comparing every pair.
+
+Clustering is greedy in input order: the first event of a cluster is its
+canonical record, and each later event is matched against canonical records
+only, so adding events never merges two events that were kept apart before.
+A duplicate is collapsed into its canonical record, which gains the
+duplicate's URL (under 'aliases') and its speakers.
+"""
+
+import os
+import re
+import zlib
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+import numpy as np
+
+from event_dates import parse_event_start
+
+logger = logging.getLogger('event_dedup')
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# MinHash signature length, split into LSH_BANDS bands of equal width
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+# Estimated Jaccard similarity above which two events on the same date are duplicates
+DUPLICATE_THRESHOLD = float(os.getenv('LUMA_DUPLICATE_THRESHOLD', '0.7'))
+
+# Mersenne prime modulus of the MinHash permutations
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Distinct event texts whose signatures are memoized
+SIGNATURE_CACHE_SIZE = 65536
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Speaker names of rows that list no speaker
+NO_SPEAKER = {'', 'Not specified'}
+
+# Fixed seed, so signatures are the same in every process
+_random = np.random.RandomState(20250401)
+PERMUTATION_A = _random.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+PERMUTATION_B = _random.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+
+def event_shingles(name: str, description: str) -> np.ndarray:
+    """Get the hashed word shingles of an event's name and description"""
+    words = WORD_PATTERN.findall(f"{name} {description}".lower())
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {' '.join(words)}
+    else:
+        shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                       dtype=np.uint64, count=len(shingles))
+
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def minhash_signature(name: str, description: str) -> Tuple[int, ...]:
+    """
+    Get the MinHash signature of an event
+
+    Args:
+        name: Event name
+        description: Event description
+
+    Returns:
+        NUM_PERMUTATIONS minimum hash values
+    """
+    shingles = event_shingles(name, description)
+    # Shingle hashes are 32-bit and the coefficients 31-bit, so a * x + b fits in 64 bits
+    hashes = (PERMUTATION_A[:, None] * shingles[None, :] + PERMUTATION_B[:, None]) % MERSENNE_PRIME
+    return tuple(int(value) for value in hashes.min(axis=1))
+
+
+def signature_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimate the Jaccard similarity of two events from their signatures"""
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def event_date_key(event_date: str, starts_at: Optional[datetime] = None) -> str:
+    """
+    Get the day an event takes place on, for grouping events that can be duplicates
+
+    Args:
+        event_date: Event date as shown on Luma
+        starts_at: Start time normalized at ingest, if known
+
+    Returns:
+        ISO date, or the normalized date text if it cannot be parsed
+    """
+    if starts_at is None:
+        starts_at = parse_event_start(event_date or '')
+    if starts_at is not None:
+        return starts_at.date().isoformat()
+    return ' '.join((event_date or '').lower().split())
+
+
+T = TypeVar('T')
+
+
+class DuplicateIndex:
+    """
+    LSH index of canonical events' MinHash signatures
+
+    Bucket lists are replaced rather than appended to, so a copy shares them
+    and adding to either index leaves the other unchanged.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, bands: int = LSH_BANDS):
+        """
+        Initialize an empty index
+
+        Args:
+            threshold: Estimated Jaccard similarity above which events are duplicates
+            bands: Number of LSH bands the signature is split into
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self.buckets: Dict[Tuple[str, int, Tuple[int, ...]], Tuple[Hashable, ...]] = {}
+        self.signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self.positions: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def copy(self) -> 'DuplicateIndex':
+        """Get a copy of the index that can be added to without changing this one"""
+        index = DuplicateIndex(self.threshold, self.bands)
+        index.buckets = dict(self.buckets)
+        index.signatures = dict(self.signatures)
+        index.positions = dict(self.positions)
+        return index
+
+    def match(self, name: str, date_key: str, description: str) -> Optional[Hashable]:
+        """
+        Find the canonical event an event duplicates, without adding it
+
+        Args:
+            name: Event name
+            date_key: Day of the event, from event_date_key
+            description: Event description
+
+        Returns:
+            Key of the earliest canonical event it duplicates, or None
+        """
+        signature = minhash_signature(name or '', description or '')
+        return self._match(signature, self._band_keys(signature, date_key))
+
+    def add(self, key: Hashable, name: str, date_key: str, description: str) -> Optional[Hashable]:
+        """
+        Add an event, unless it duplicates an event already in the index
+
+        Args:
+            key: Identifier of the event
+            name: Event name
+            date_key: Day of the event, from event_date_key
+            description: Event description
+
+        Returns:
+            Key of the canonical event this one duplicates, or None if it was added as a new canonical event
+        """
+        signature = minhash_signature(name or '', description or '')
+        band_keys = self._band_keys(signature, date_key)
+        canonical = self._match(signature, band_keys)
+        if canonical is not None:
+            return canonical
+
+        self.positions[key] = len(self.positions)
+        self.signatures[key] = signature
+        for band_key in band_keys:
+            self.buckets[band_key] = self.buckets.get(band_key, ()) + (key,)
+        return None
+
+    def _band_keys(self, signature: Tuple[int, ...], date_key: str) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        """Get the LSH buckets of a signature"""
+        return [(date_key, band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _match(self, signature: Tuple[int, ...],
+               band_keys: List[Tuple[str, int, Tuple[int, ...]]]) -> Optional[Hashable]:
+        """Find the earliest canonical event similar to a signature among those sharing a bucket with it"""
+        candidates = {candidate for band_key in band_keys for candidate in self.buckets.get(band_key, ())}
+        matches = [candidate for candidate in candidates
+                   if signature_similarity(signature, self.signatures[candidate]) >= self.threshold]
+        return min(matches, key=self.positions.get) if matches else None
+
+
+def collapse_duplicates(events: Sequence[T], describe: Callable[[T], Tuple[str, str, str]],
+                        merge: Callable[[T, T], T], index: Optional[DuplicateIndex] = None,
+                        first_new_id: int = 0) -> Tuple[List[T], Set[int]]:
+    """
+    Collapse near-duplicate events into the first event of each cluster
+
+    Events before first_new_id were collapsed when they were loaded, so they
+    keep their positions and are only matched against.
+
+    Args:
+        events: Events in order of preference
+        describe: Function giving the (name, date key, description) of an event
+        merge: Function giving a canonical event with a duplicate merged into it, without changing either
+        index: Index of the events before first_new_id by position, which is not changed
+        first_new_id: Position of the first event not collapsed yet
+
+    Returns:
+        Tuple of (canonical events, positions of events before first_new_id that had duplicates merged in)
+    """
+    canonical_events = list(events[:first_new_id])
+    new_index = DuplicateIndex(index.threshold if index else DUPLICATE_THRESHOLD)
+    changed_ids = set()
+
+    for event in events[first_new_id:]:
+        name, date_key, description = describe(event)
+        canonical_id = index.match(name, date_key, description) if index is not None else None
+        if canonical_id is None:
+            canonical_id = new_index.add(len(canonical_events), name, date_key, description)
+        if canonical_id is None:
+            canonical_events.append(event)
+            continue
+
+        canonical_events[canonical_id] = merge(canonical_events[canonical_id], event)
+        if canonical_id < first_new_id:
+            changed_ids.add(canonical_id)
+
+    found = len(events) - len(canonical_events)
+    if found:
+        logger.info(f"Merged {found} near-duplicate events into their canonical events")
+    return canonical_events, changed_ids
+
+
+def merge_duplicate_event(canonical: Dict[str, Any], duplicate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a duplicate into a copy of its canonical event, for events with a list of speakers
+
+    Args:
+        canonical: Canonical event
+        duplicate: Duplicate of the canonical event
+
+    Returns:
+        Copy of the canonical event listing the duplicate's URL and aliases under 'aliases',
+        and the duplicate's speakers that it does not list yet
+    """
+    names = {speaker.get('name') for speaker in canonical.get('speakers') or []}
+    return {
+        **canonical,
+        'aliases': [*(canonical.get('aliases') or []), duplicate['event_url'], *(duplicate.get('aliases') or [])],
+        'speakers': [*(canonical.get('speakers') or []),
+                     *(speaker for speaker in duplicate.get('speakers') or [] if speaker.get('name') not in names)]
+    }
+
+
+def collapse_duplicate_rows(rows: Iterable[Dict[str, Any]], name_field: str, description_field: str,
+                            speaker_fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Collapse near-duplicate events in a table with one row per speaker
+
+    The rows of a duplicate are dropped; its URL is listed under 'aliases' of
+    every row of its canonical event, and each of its speakers that the
+    canonical event does not list yet gets a row with the canonical event's
+    fields.
+
+    Args:
+        rows: Rows in order of preference, grouped into events by 'event_url'
+        name_field: Field with the event name
+        description_field: Field with the event description
+        speaker_fields: Fields describing the speaker of a row, starting with the speaker's name
+
+    Returns:
+        Rows of the canonical events, each with an 'aliases' list
+    """
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.get('event_url', ''), []).append(row)
+
+    def describe(event_rows: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+        first = event_rows[0]
+        return first.get(name_field, ''), event_date_key(first.get('event_date', '')), first.get(description_field, '')
+
+    def merge(event_rows: List[Dict[str, Any]], duplicate_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        speaker_rows = [row for row in event_rows if row.get(speaker_fields[0], '') not in NO_SPEAKER]
+        names = {row[speaker_fields[0]] for row in speaker_rows}
+        aliases = [*(event_rows[0].get('aliases') or []), duplicate_rows[0].get('event_url', ''),
+                   *(duplicate_rows[0].get('aliases') or [])]
+        added = []
+        for row in duplicate_rows:
+            name = row.get(speaker_fields[0], '')
+            if name not in NO_SPEAKER and name not in names:
+                names.add(name)
+                added.append({**event_rows[0], **{field: row.get(field, '') for field in speaker_fields}})
+        # A row without a speaker is only kept while the event lists none
+        kept = (speaker_rows if added else event_rows) + added
+        return [{**row, 'aliases': aliases} for row in kept]
+
+    canonical_events, _ = collapse_duplicates(list(grouped.values()), describe, merge)
+    return [row if 'aliases' in row else {**row, 'aliases': []}
+            for event_rows in canonical_events for row in event_rows]
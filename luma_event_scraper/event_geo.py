@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Event Geocoding Module
+
+Offline geocoding of event locations and user ZIP codes to latitude and
+longitude, shared by the scraper's outputs and the event search loaders.
+Coordinates come from a bundled table of US ZIP code centroids
+(data/zip_centroids.csv.gz, see data/zip_centroids_LICENSE.txt), so no
+geocoding service is called:
+1. A location ending a part with a known ZIP code ("..., CA 94105") maps to
+   that ZIP's centroid; numbers in the middle of a street address do not count
+2. Otherwise a "City, ST" or "City, State" part of the location maps to the
+   centroid of the city's ZIP codes ("SF" and "NYC" are understood as well)
+
+Results are memoized per location string.
+"""
+
+import os
+import re
+import csv
+import gzip
+import math
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('event_geo')
+
+# Bundled table of ZIP code centroids
+ZIP_CENTROIDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'zip_centroids.csv.gz')
+
+EARTH_RADIUS_MILES = 3958.8
+
+# Five-digit ZIP codes, optionally followed by a ZIP+4 suffix
+ZIP_PATTERN = re.compile(r'(?<!\d)(\d{5})(?:-\d{4})?(?!\d)')
+
+# A ZIP code at the end of a part of an address
+TRAILING_ZIP_PATTERN = re.compile(r'(?<![\w-])(\d{5})(?:-\d{4})?\s*$')
+
+STATE_CODES = {
+    'alabama': 'AL', 'alaska': 'AK', 'arizona': 'AZ', 'arkansas': 'AR', 'california': 'CA',
+    'colorado': 'CO', 'connecticut': 'CT', 'delaware': 'DE', 'district of columbia': 'DC',
+    'florida': 'FL', 'georgia': 'GA', 'hawaii': 'HI', 'idaho': 'ID', 'illinois': 'IL',
+    'indiana': 'IN', 'iowa': 'IA', 'kansas': 'KS', 'kentucky': 'KY', 'louisiana': 'LA',
+    'maine': 'ME', 'maryland': 'MD', 'massachusetts': 'MA', 'michigan': 'MI', 'minnesota': 'MN',
+    'mississippi': 'MS', 'missouri': 'MO', 'montana': 'MT', 'nebraska': 'NE', 'nevada': 'NV',
+    'new hampshire': 'NH', 'new jersey': 'NJ', 'new mexico': 'NM', 'new york': 'NY',
+    'north carolina': 'NC', 'north dakota': 'ND', 'ohio': 'OH', 'oklahoma': 'OK', 'oregon': 'OR',
+    'pennsylvania': 'PA', 'rhode island': 'RI', 'south carolina': 'SC', 'south dakota': 'SD',
+    'tennessee': 'TN', 'texas': 'TX', 'utah': 'UT', 'vermont': 'VT', 'virginia': 'VA',
+    'washington': 'WA', 'west virginia': 'WV', 'wisconsin': 'WI', 'wyoming': 'WY',
+    'puerto rico': 'PR'
+}
+
+# City nicknames used in event locations
+CITY_ALIASES = {
+    'sf': ('san francisco', 'CA'),
+    'nyc': ('new york', 'NY'),
+    'la': ('los angeles', 'CA')
+}
+
+# Distinct location strings whose coordinates are memoized
+GEOCODE_CACHE_SIZE = 65536
+
+Coordinates = Tuple[float, float]
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Get the great-circle distance between two points in miles"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+class ZipCentroids:
+    """ZIP code and city centroids loaded from the bundled table"""
+
+    def __init__(self, path: str = ZIP_CENTROIDS_FILE):
+        """
+        Load the table
+
+        Args:
+            path: Gzipped CSV with zip_code, city, state, latitude, longitude and zip_code_type columns
+        """
+        self.zips: Dict[str, Coordinates] = {}
+        city_points: Dict[Tuple[str, str], List[Coordinates]] = {}
+
+        with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                point = (float(row['latitude']), float(row['longitude']))
+                self.zips[row['zip_code']] = point
+                # PO box and single-building ZIPs sit at a post office, not in the neighborhoods
+                if row['zip_code_type'] == 'STANDARD':
+                    city_points.setdefault((row['city'].lower(), row['state']), []).append(point)
+
+        # City centroids by name, then by state, with the number of ZIPs for ambiguous names
+        self.cities: Dict[str, Dict[str, Tuple[float, float, int]]] = {}
+        for (city, state), points in city_points.items():
+            latitude = sum(point[0] for point in points) / len(points)
+            longitude = sum(point[1] for point in points) / len(points)
+            self.cities.setdefault(city, {})[state] = (latitude, longitude, len(points))
+        self.states = {state for states in self.cities.values() for state in states}
+
+        logger.info(f"Loaded {len(self.zips)} ZIP centroids and {len(city_points)} cities from {path}")
+
+    def zip_centroid(self, zip_code: str) -> Optional[Coordinates]:
+        """Get the centroid of a ZIP code, or None if it is unknown"""
+        match = ZIP_PATTERN.search(zip_code or '')
+        return self.zips.get(match.group(1)) if match else None
+
+    def _state_code(self, text: str) -> Optional[str]:
+        """Get the state code of a state name or code, or None"""
+        text = text.strip()
+        if text.upper() in self.states:
+            return text.upper()
+        return STATE_CODES.get(text.lower())
+
+    def city_centroid(self, city: str, state: Optional[str] = None) -> Optional[Coordinates]:
+        """
+        Get the centroid of a city
+
+        Args:
+            city: City name (case-insensitive) or nickname like "SF"
+            state: Two-letter state code; without it the city with the most ZIP codes wins
+
+        Returns:
+            (latitude, longitude), or None if the city is unknown (in that state)
+        """
+        city = city.strip().lower()
+        if city in CITY_ALIASES:
+            city, state = CITY_ALIASES[city][0], state or CITY_ALIASES[city][1]
+
+        states = self.cities.get(city)
+        if not states or (state and state not in states):
+            return None
+        if state:
+            latitude, longitude, _ = states[state]
+        else:
+            latitude, longitude, _ = max(states.values(), key=lambda centroid: centroid[2])
+        return latitude, longitude
+
+    def geocode(self, location: str) -> Optional[Coordinates]:
+        """
+        Geocode a free-text event location
+
+        Args:
+            location: Location like "123 Main St, San Francisco, CA 94105" or "Berkeley, CA"
+
+        Returns:
+            (latitude, longitude), or None if no ZIP code, or known city next to a state or ZIP code, was found
+        """
+        if not location or location == 'Not specified':
+            return None
+
+        parts = [part.strip() for part in location.split(',')]
+        parts = [part for part in parts if part]
+
+        for part in reversed(parts):
+            match = TRAILING_ZIP_PATTERN.search(part)
+            if match and match.group(1) in self.zips:
+                return self.zips[match.group(1)]
+
+        # The city is usually one of the last parts, after venue and street. A city
+        # name only counts next to a state or ZIP code, as venue names ("Salesforce
+        # Tower", "Main Hall") are often also the names of small towns
+        has_zip = [bool(TRAILING_ZIP_PATTERN.search(part)) for part in parts]
+        parts = [TRAILING_ZIP_PATTERN.sub('', part).strip() for part in parts]
+        for index in range(len(parts) - 1, -1, -1):
+            if not parts[index]:
+                continue
+            state = self._state_code(parts[index + 1]) if index + 1 < len(parts) else None
+
+            part_state = self._state_code(parts[index])
+            if part_state:
+                # A state name only names a city when it comes first, as in "New York, NY"
+                if index == 0:
+                    centroid = self.cities.get(parts[index].lower(), {}).get(state or part_state)
+                    if centroid:
+                        return centroid[0], centroid[1]
+                continue
+
+            words = parts[index].split()
+            if not state and len(words) > 1 and words[-1].upper() in self.states:
+                state = words[-1].upper()
+                words = words[:-1]
+
+            city = ' '.join(words)
+            zip_nearby = has_zip[index] or (index + 1 < len(parts) and has_zip[index + 1])
+            if not (state or zip_nearby or city.lower() in CITY_ALIASES):
+                continue
+            centroid = self.city_centroid(city, state)
+            if centroid:
+                return centroid
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_zip_centroids() -> ZipCentroids:
+    """Get the shared ZIP centroid table, loading it on first use"""
+    return ZipCentroids()
+
+
+@lru_cache(maxsize=GEOCODE_CACHE_SIZE)
+def geocode_location(location: str) -> Optional[Coordinates]:
+    """Geocode a free-text event location with the bundled ZIP table"""
+    return get_zip_centroids().geocode(location)
+
+
+def zip_centroid(zip_code: str) -> Optional[Coordinates]:
+    """Get the centroid of a ZIP code, or None if it is unknown"""
+    return get_zip_centroids().zip_centroid(zip_code)
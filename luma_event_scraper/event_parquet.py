@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Luma Event Parquet Store
+
+Compressed columnar copy of the scraped events, written by the scraper and
+read by the event search loaders. Unlike the CSV files, which repeat every
+event's fields (including the multi-kilobyte event_detail markdown) once per
+speaker row, each event is one row here with its speakers in a nested list.
+Repeated strings (dates, times, locations, hosts, speaker companies) are
+dictionary-encoded and the file is zstd-compressed.
+
+All scraped events are kept in one file with a bay_area column, so the
+Bay Area subset is a filter on read instead of a second copy of the data.
+Near-duplicate events collapsed at ingest keep the URLs of their duplicates
+in an aliases column.
+"""
+
+import os
+import logging
+import tempfile
+from datetime import timezone
+from typing import Any, Callable, Dict, Iterable, List
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from event_catalog import row_value
+from event_dates import parse_event_start, default_timezone
+from event_geo import geocode_location
+
+logger = logging.getLogger('event_parquet')
+
+# Default location of the Parquet file
+PARQUET_FILE = "luma_events.parquet"
+
+# File extensions that identify a Parquet file
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+SPEAKER_TYPE = pa.struct([
+    ('name', pa.string()),
+    ('title', pa.string()),
+    ('company', pa.string())
+])
+
+EVENT_SCHEMA = pa.schema([
+    ('event_url', pa.string()),
+    ('event_name', pa.string()),
+    ('event_summary', pa.string()),
+    ('event_date', pa.string()),
+    ('event_time', pa.string()),
+    ('starts_at', pa.timestamp('s', tz='UTC')),
+    ('event_location', pa.string()),
+    ('latitude', pa.float64()),
+    ('longitude', pa.float64()),
+    ('host_name', pa.string()),
+    ('speakers', pa.list_(SPEAKER_TYPE)),
+    ('speaker_details', pa.string()),
+    ('event_detail', pa.string()),
+    ('aliases', pa.list_(pa.string())),
+    ('bay_area', pa.bool_())
+])
+
+# Columns with few distinct values, stored dictionary-encoded
+DICTIONARY_COLUMNS = [
+    'event_date', 'event_time', 'event_location', 'host_name', 'speaker_details',
+    'speakers.list.element.title', 'speakers.list.element.company'
+]
+
+COMPRESSION = 'zstd'
+
+
+def is_parquet_path(path: str) -> bool:
+    """Check if a path points to a Parquet file rather than a CSV file or catalog"""
+    return bool(path) and path.lower().endswith(PARQUET_EXTENSIONS)
+
+
+def group_rows(rows: Iterable[Dict[str, Any]], is_bay_area: Callable[[str], bool]) -> List[Dict[str, Any]]:
+    """
+    Group flat CSV-style rows (one row per speaker) into one record per event
+
+    Args:
+        rows: Rows in either of the scraper's CSV schemas
+        is_bay_area: Classifies an event location as in the SF Bay Area
+
+    Returns:
+        Event records matching EVENT_SCHEMA, in first-seen order
+    """
+    grouped = {}
+    speaker_names = {}
+
+    for row in rows:
+        url = row_value(row, 'event_url')
+        name = row_value(row, 'event_name')
+        if not url or not name:
+            continue
+
+        if url not in grouped:
+            event_date = row_value(row, 'event_date')
+            event_time = row_value(row, 'event_time')
+            event_location = row_value(row, 'event_location')
+            coordinates = geocode_location(event_location) or (None, None)
+            grouped[url] = {
+                'event_url': url,
+                'event_name': name,
+                'event_summary': row_value(row, 'event_summary'),
+                'event_date': event_date,
+                'event_time': event_time,
+                'starts_at': parse_event_start(event_date, event_time),
+                'event_location': event_location,
+                'latitude': coordinates[0],
+                'longitude': coordinates[1],
+                'host_name': row_value(row, 'host_name'),
+                'speakers': [],
+                'speaker_details': row_value(row, 'speaker_details'),
+                'event_detail': row_value(row, 'event_detail'),
+                'aliases': list(row.get('aliases') or []),
+                'bay_area': is_bay_area(event_location)
+            }
+            speaker_names[url] = set()
+
+        speaker_name = row_value(row, 'speaker_name')
+        if speaker_name and speaker_name != 'Not specified' and speaker_name not in speaker_names[url]:
+            speaker_names[url].add(speaker_name)
+            grouped[url]['speakers'].append({
+                'name': speaker_name,
+                'title': row_value(row, 'speaker_title'),
+                'company': row_value(row, 'speaker_company')
+            })
+
+    return list(grouped.values())
+
+
+def write_events(rows: Iterable[Dict[str, Any]], path: str, is_bay_area: Callable[[str], bool],
+                 overwrite: bool = False) -> int:
+    """
+    Write scraped events to a Parquet file
+
+    Events already in the file are replaced by new versions with the same URL,
+    and dropped if a new event lists their URL as an alias, unless overwrite is
+    set, in which case the file only holds the given events.
+
+    Args:
+        rows: Flat CSV-style rows (one row per speaker)
+        path: Path to the Parquet file
+        is_bay_area: Classifies an event location as in the SF Bay Area
+        overwrite: Replace the whole file instead of merging into it
+
+    Returns:
+        Number of events in the written file
+    """
+    table = pa.Table.from_pylist(group_rows(rows, is_bay_area), schema=EVENT_SCHEMA)
+
+    if not overwrite and os.path.exists(path):
+        existing = _conform(pq.read_table(path))
+        replaced_urls = pa.concat_arrays([table['event_url'].combine_chunks(),
+                                          pc.list_flatten(table['aliases']).combine_chunks()])
+        kept = pc.invert(pc.is_in(existing['event_url'], value_set=replaced_urls))
+        table = pa.concat_tables([existing.filter(kept), table])
+
+    # Write to a temporary file and rename, so readers never see a partial file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path, compression=COMPRESSION, use_dictionary=DICTIONARY_COLUMNS)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    logger.info(f"Wrote {table.num_rows} events to {path}")
+    return table.num_rows
+
+
+def _conform(table: pa.Table) -> pa.Table:
+    """Bring a table written by an older version to EVENT_SCHEMA, backfilling columns added since"""
+    if 'latitude' not in table.column_names:
+        coordinates = [geocode_location(location or '') or (None, None)
+                       for location in table['event_location'].to_pylist()]
+        table = table.append_column('latitude', pa.array([point[0] for point in coordinates], pa.float64()))
+        table = table.append_column('longitude', pa.array([point[1] for point in coordinates], pa.float64()))
+
+    for field in EVENT_SCHEMA:
+        if field.name not in table.column_names:
+            table = table.append_column(field, pa.nulls(table.num_rows, type=field.type))
+    return table.select(EVENT_SCHEMA.names).cast(EVENT_SCHEMA)
+
+
+def read_events(path: str, bay_area_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    Read events from a Parquet file
+
+    Args:
+        path: Path to the Parquet file
+        bay_area_only: Only read events in the SF Bay Area
+
+    Returns:
+        List of event dictionaries in the same shape as EventCatalog.get_events produces
+    """
+    filters = [('bay_area', '=', True)] if bay_area_only else None
+    table = pq.read_table(path, filters=filters)
+    tz = default_timezone()
+
+    events = []
+    for record in table.to_pylist():
+        event_date = record['event_date'] or ''
+        event_time = record['event_time'] or ''
+        starts_at = record['starts_at']
+        speaker_details = record['speaker_details'] or ''
+        if 'latitude' in record:
+            coordinates = (record['latitude'], record['longitude'])
+        else:
+            # Files written before the coordinate columns were added
+            coordinates = geocode_location(record['event_location'] or '') or (None, None)
+        events.append({
+            'event_name': record['event_name'],
+            'event_description': record['event_summary'] or '',
+            'event_url': record['event_url'],
+            'event_date_time': f"{event_date} {event_time}".strip(),
+            'event_date': event_date,
+            'event_time': event_time,
+            'starts_at': starts_at.replace(tzinfo=timezone.utc).astimezone(tz) if starts_at else None,
+            'event_location': record['event_location'] or '',
+            'latitude': coordinates[0],
+            'longitude': coordinates[1],
+            'host_name': record['host_name'] or '',
+            'speakers': [
+                {
+                    'name': speaker['name'],
+                    'title': speaker['title'] or '',
+                    'company': speaker['company'] or '',
+                    'details': speaker_details
+                }
+                for speaker in record['speakers'] or []
+            ],
+            'event_detail': record['event_detail'] or '',
+            'aliases': record.get('aliases') or []
+        })
+    return events
+
+
+def main():
+    """Command line entry point for converting a scraper CSV file to Parquet"""
+    import csv
+    import argparse
+    from luma_advanced_scraper import LumaAdvancedScraper
+
+    parser = argparse.ArgumentParser(description='Convert a scraper CSV file to the Parquet event store')
+    parser.add_argument('csv_file', type=str, help='Path to the CSV file')
+    parser.add_argument('parquet_file', type=str, nargs='?', default=PARQUET_FILE, help='Path to the Parquet file')
+    args = parser.parse_args()
+
+    with open(args.csv_file, 'r', newline='', encoding='utf-8') as csvfile:
+        count = write_events(csv.DictReader(csvfile), args.parquet_file,
+                             LumaAdvancedScraper.is_sf_bay_area_location)
+    print(f"{args.parquet_file} holds {count} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Firecrawl Replay Server
+
+Local stand-in for the Firecrawl API that replays recorded responses, so the
+scrapers can be run and benchmarked offline, without API keys or cost. It
+serves the endpoints the scrapers use:
+1. POST /v1/scrape returns the recorded page in the requested formats (html,
+   markdown, json)
+2. POST /v1/extract starts an extraction job whose recorded result is
+   returned by GET /v1/extract/<id>
+
+Faults are injected with a seeded random generator, so runs are repeatable:
+per-request latency, a rate of 5xx errors, a rate of 429 responses and an
+optional requests-per-second limit above which requests get 429 with a
+Retry-After header. GET /stats reports what the server saw.
+
+Fixtures are JSON lines (optionally gzipped), one recorded response per line:
+{"endpoint": "scrape" | "extract", "url": ..., "response": {...}}. They are
+recorded from the raw response archive or from a scraper CSV file:
+
+    python firecrawl_replay.py record --csv luma_all_events.csv
+    python firecrawl_replay.py serve --latency-ms 800 --error-rate 0.02 --rate-limit-rate 0.05
+    FIRECRAWL_API_URL=http://127.0.0.1:3002 python luma_advanced_scraper.py
+"""
+
+import os
+import re
+import csv
+import gzip
+import json
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from event_catalog import row_value
+from response_archive import ResponseArchive, ARCHIVE_DIR, load_response
+
+logger = logging.getLogger('firecrawl_replay')
+
+# Default fixture file, recorded from the bundled event data
+FIXTURES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'firecrawl_fixtures.jsonl.gz')
+
+# Listing pages recorded with the event pages
+DEFAULT_LISTING_URLS = ["https://lu.ma/sf"]
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 3002
+
+EXTRACT_JOB_PATTERN = re.compile(r'^/v1/extract/([\w-]+)$')
+
+
+@dataclass
+class FaultConfig:
+    """Latency and failures the replay server injects"""
+    latency_ms: float = 0.0  # Mean latency added to every answered request
+    jitter_ms: float = 0.0  # Latency varies uniformly by up to this much either way
+    error_rate: float = 0.0  # Fraction of requests answered with a 500 error
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with 429
+    max_rps: float = 0.0  # Requests per second above which requests get 429 (0 for no limit)
+    retry_after: int = 1  # Retry-After seconds sent with 429 responses
+    seed: int = 0  # Seed of the fault generator
+
+
+def load_fixtures(path: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Load recorded responses
+
+    Args:
+        path: JSON lines fixture file (gzipped if it ends in .gz)
+
+    Returns:
+        Recorded response of each (endpoint, url)
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    fixtures = {}
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                fixture = json.loads(line)
+                fixtures[(fixture['endpoint'], fixture['url'])] = fixture['response']
+    logger.info(f"Loaded {len(fixtures)} fixtures from {path}")
+    return fixtures
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """HTTP server that replays recorded Firecrawl responses with injected faults"""
+
+    daemon_threads = True
+
+    def __init__(self, fixtures: Dict[Tuple[str, str], Dict[str, Any]], faults: Optional[FaultConfig] = None,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Initialize the server (port 0 picks a free port)
+
+        Args:
+            fixtures: Recorded response of each (endpoint, url)
+            faults: Latency and failures to inject
+            host: Interface to listen on
+            port: Port to listen on
+        """
+        super().__init__((host, port), ReplayHandler)
+        self.fixtures = fixtures
+        self.faults = faults or FaultConfig()
+        self.random = random.Random(self.faults.seed)
+        self.lock = threading.Lock()
+        self.extract_jobs: Dict[str, Dict[str, Any]] = {}
+        self.window_start = time.monotonic()
+        self.window_requests = 0
+        self.in_flight = 0
+        self.stats = {
+            'requests': 0, 'responses': {}, 'rate_limited': 0, 'errors': 0, 'missing': 0,
+            'peak_in_flight': 0, 'urls': 0
+        }
+        self.seen_urls = set()
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """Root URL of the server, the value for FIRECRAWL_API_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'ReplayServer':
+        """Serve requests on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name='firecrawl-replay', daemon=True)
+        self.thread.start()
+        logger.info(f"Replaying {len(self.fixtures)} fixtures at {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        self.shutdown()
+        self.server_close()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get a copy of the request statistics"""
+        with self.lock:
+            return dict(self.stats, responses=dict(self.stats['responses']))
+
+    def reset_stats(self) -> None:
+        """Clear the request statistics"""
+        with self.lock:
+            self.stats.update(requests=0, responses={}, rate_limited=0, errors=0, missing=0, peak_in_flight=0, urls=0)
+            self.seen_urls.clear()
+
+    def begin_request(self, url: str) -> Tuple[Optional[int], float]:
+        """
+        Count a request and draw its fault
+
+        Args:
+            url: URL the request is for
+
+        Returns:
+            Tuple of (status code to fail with or None, seconds of latency to add)
+        """
+        faults = self.faults
+        with self.lock:
+            self.stats['requests'] += 1
+            self.in_flight += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+            if url and url not in self.seen_urls:
+                self.seen_urls.add(url)
+                self.stats['urls'] += 1
+
+            # Fixed one-second windows for the requests-per-second limit
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_requests = now, 0
+            self.window_requests += 1
+
+            if faults.max_rps and self.window_requests > faults.max_rps:
+                return 429, 0.0
+            if self.random.random() < faults.rate_limit_rate:
+                return 429, 0.0
+
+            latency = max(0.0, faults.latency_ms + self.random.uniform(-faults.jitter_ms, faults.jitter_ms)) / 1000
+            if self.random.random() < faults.error_rate:
+                return 500, latency
+            return None, latency
+
+    def end_request(self, status: int) -> None:
+        """Record the status a request was answered with"""
+        with self.lock:
+            self.in_flight -= 1
+            self.stats['responses'][str(status)] = self.stats['responses'].get(str(status), 0) + 1
+            if status == 429:
+                self.stats['rate_limited'] += 1
+            elif status >= 500:
+                self.stats['errors'] += 1
+            elif status == 404:
+                self.stats['missing'] += 1
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Request handler of the replay server"""
+
+    server: ReplayServer
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        """Handle /v1/scrape and /v1/extract"""
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send(400, {'success': False, 'error': 'Invalid JSON body'})
+            return
+
+        if self.path == '/v1/scrape':
+            self._replay(body.get('url', ''), lambda: self._scrape(body))
+        elif self.path == '/v1/extract':
+            urls = body.get('urls') or []
+            self._replay(urls[0] if urls else '', lambda: self._extract(urls))
+        else:
+            self._send(404, {'success': False, 'error': f'Unknown endpoint: {self.path}'})
+
+    def do_GET(self):
+        """Handle extract job status and /stats"""
+        if self.path == '/stats':
+            self._send(200, self.server.get_stats())
+            return
+
+        match = EXTRACT_JOB_PATTERN.match(self.path)
+        if not match:
+            self._send(404, {'success': False, 'error': f'Unknown endpoint: {self.path}'})
+            return
+
+        job = self.server.extract_jobs.get(match.group(1))
+        if job is None:
+            self._send(404, {'success': False, 'error': 'Extract job not found'})
+        else:
+            self._send(200, job)
+
+    def _replay(self, url: str, respond) -> None:
+        """Answer a request with its injected fault or its recorded response"""
+        status, latency = self.server.begin_request(url)
+        try:
+            if status == 429:
+                self._send(429, {'success': False, 'error': 'Rate limit exceeded'},
+                           {'Retry-After': str(self.server.faults.retry_after)})
+                return
+
+            time.sleep(latency)
+            if status is not None:
+                self._send(status, {'success': False, 'error': 'Injected server error'})
+                return
+
+            status, payload = respond()
+            self._send(status, payload)
+        finally:
+            self.server.end_request(status or 200)
+
+    def _scrape(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Get the recorded scrape of a URL, in the requested formats"""
+        url = body.get('url', '')
+        recorded = self.server.fixtures.get(('scrape', url))
+        if recorded is None:
+            return 404, {'success': False, 'error': f'No recorded scrape for {url}'}
+
+        formats = body.get('formats') or ['markdown']
+        data = {name: recorded[name] for name in formats if name in recorded}
+        data['metadata'] = dict(recorded.get('metadata') or {}, sourceURL=url, statusCode=200)
+        return 200, {'success': True, 'data': data}
+
+    def _extract(self, urls: List[str]) -> Tuple[int, Dict[str, Any]]:
+        """Start an extract job with the recorded extraction of the first URL"""
+        recorded = self.server.fixtures.get(('extract', urls[0] if urls else ''))
+        if recorded is None:
+            return 404, {'success': False, 'error': f'No recorded extraction for {urls}'}
+
+        job_id = str(uuid.uuid4())
+        self.server.extract_jobs[job_id] = {'success': True, 'status': 'completed', 'data': recorded}
+        return 200, {'success': True, 'id': job_id}
+
+    def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        """Send a JSON response"""
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Log requests at debug level instead of writing to stderr"""
+        logger.debug(format % args)
+
+
+def _listing_fixtures(listing_urls: List[str], events: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    """Build the listing page scrapes and extractions that link to the recorded events"""
+    links = ''.join(f'<a href="{event["event_url"]}">{event.get("event_name", "")}</a>\n' for event in events)
+    extracted = {'events': [
+        {
+            'event_name': event.get('event_name', ''),
+            'event_description': event.get('event_summary', ''),
+            'event_url': event['event_url'],
+            'event_date_time': f"{event.get('event_date', '')} {event.get('event_time', '')}".strip(),
+            'speakers': [{key: speaker.get(key, '') for key in ('name', 'title', 'company')}
+                         for speaker in event.get('speakers', [])],
+            'registration_link': event['event_url']
+        }
+        for event in events
+    ]}
+
+    for url in listing_urls:
+        yield {'endpoint': 'scrape', 'url': url, 'response': {'html': f"<html><body>\n{links}</body></html>"}}
+        yield {'endpoint': 'extract', 'url': url, 'response': extracted}
+
+
+def _event_fixture(url: str, extracted: Dict[str, Any], markdown: str) -> Dict[str, Any]:
+    """Build the recorded scrape of one event page"""
+    return {'endpoint': 'scrape', 'url': url, 'response': {'json': extracted, 'markdown': markdown}}
+
+
+def events_from_csv(csv_file: str) -> List[Tuple[str, Dict[str, Any], str]]:
+    """
+    Rebuild the Firecrawl extraction of each event in a scraper CSV file
+
+    Args:
+        csv_file: CSV file with one row per speaker
+
+    Returns:
+        List of (url, JSON extraction, markdown) in file order
+    """
+    events = {}
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            url = row_value(row, 'event_url')
+            if not url:
+                continue
+            if url not in events:
+                events[url] = ({
+                    'event_name': row_value(row, 'event_name'),
+                    'event_summary': row_value(row, 'event_summary'),
+                    'event_date': row_value(row, 'event_date'),
+                    'event_time': row_value(row, 'event_time'),
+                    'event_location': row_value(row, 'event_location'),
+                    'host_name': row_value(row, 'host_name'),
+                    'speakers': [],
+                    'speaker_details': row_value(row, 'speaker_details')
+                }, row_value(row, 'event_detail'))
+            name = row_value(row, 'speaker_name')
+            speakers = events[url][0]['speakers']
+            if name and name != 'Not specified' and all(speaker['name'] != name for speaker in speakers):
+                speakers.append({'name': name, 'title': row_value(row, 'speaker_title'),
+                                 'company': row_value(row, 'speaker_company')})
+    return [(url, extracted, markdown) for url, (extracted, markdown) in events.items()]
+
+
+def events_from_archive(archive_dir: str) -> List[Tuple[str, Dict[str, Any], str]]:
+    """
+    Read the latest archived Firecrawl response of each event
+
+    Args:
+        archive_dir: Raw response archive directory
+
+    Returns:
+        List of (url, JSON extraction, markdown) in URL order
+    """
+    with ResponseArchive(archive_dir) as archive:
+        entries = archive.latest_entries()
+
+    events = []
+    for url, content_hash in entries:
+        try:
+            response = load_response(archive_dir, content_hash)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable archived response for {url}: {e}")
+            continue
+        events.append((url, response.get('json') or {}, response.get('markdown', '')))
+    return events
+
+
+def record_fixtures(events: List[Tuple[str, Dict[str, Any], str]], path: str,
+                    listing_urls: List[str] = DEFAULT_LISTING_URLS, copies: int = 1) -> int:
+    """
+    Write a fixture file for a set of event pages and the listing pages that link to them
+
+    Args:
+        events: (url, JSON extraction, markdown) of each event page
+        path: Fixture file to write (gzipped if it ends in .gz)
+        listing_urls: Listing pages to record, each linking to every event
+        copies: Times to repeat every event under a new URL, for benchmarks larger than the recorded data
+
+    Returns:
+        Number of fixtures written
+    """
+    fixtures = []
+    listed = []
+    for copy in range(copies):
+        for url, extracted, markdown in events:
+            # Copies get an alphanumeric suffix, since event URLs are found with an alphanumeric pattern
+            copy_url = url if copy == 0 else f"{url}c{copy}"
+            fixtures.append(_event_fixture(copy_url, extracted, markdown))
+            listed.append(dict(extracted, event_url=copy_url))
+    fixtures.extend(_listing_fixtures(listing_urls, listed))
+
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for fixture in fixtures:
+            f.write(json.dumps(fixture) + '\n')
+
+    logger.info(f"Recorded {len(fixtures)} fixtures ({len(listed)} event pages) to {path}")
+    return len(fixtures)
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the fault injection options to a command line parser"""
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Mean latency per request in ms')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Latency varies by up to this much either way')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failed with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--max-rps', type=float, default=0.0, help='Requests per second above which requests get 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds of 429 responses')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the fault generator')
+
+
+def fault_config(args: argparse.Namespace) -> FaultConfig:
+    """Build the fault configuration from parsed command line options"""
+    return FaultConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                       rate_limit_rate=args.rate_limit_rate, max_rps=args.max_rps,
+                       retry_after=args.retry_after, seed=args.seed)
+
+
+def main():
+    """Command line entry point for recording fixtures and serving them"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Replay recorded Firecrawl responses locally')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help='Record fixtures from the response archive or a CSV file')
+    source = record.add_mutually_exclusive_group()
+    source.add_argument('--archive', type=str, help=f'Raw response archive directory (default: {ARCHIVE_DIR})')
+    source.add_argument('--csv', type=str, help='Scraper CSV file to rebuild the responses from')
+    record.add_argument('--output', type=str, default=FIXTURES_FILE, help='Fixture file to write')
+    record.add_argument('--listing-url', action='append', help='Listing page to record (default: https://lu.ma/sf)')
+    record.add_argument('--copies', type=int, default=1, help='Times to repeat every event under a new URL')
+
+    serve = subparsers.add_parser('serve', help='Serve recorded fixtures')
+    serve.add_argument('--fixtures', type=str, default=FIXTURES_FILE, help='Fixture file to replay')
+    serve.add_argument('--host', type=str, default=DEFAULT_HOST, help='Interface to listen on')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    add_fault_arguments(serve)
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        events = events_from_csv(args.csv) if args.csv else events_from_archive(args.archive or ARCHIVE_DIR)
+        record_fixtures(events, args.output, args.listing_url or DEFAULT_LISTING_URLS, args.copies)
+        return
+
+    server = ReplayServer(load_fixtures(args.fixtures), fault_config(args), args.host, args.port)
+    logger.info(f"Serving at {server.url} with faults {asdict(server.faults)}; "
+                f"set FIRECRAWL_API_URL={server.url} to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
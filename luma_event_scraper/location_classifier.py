@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Luma Location Classifier
+
+Classifies free-text event locations into regions (the SF Bay Area, online)
+with a compiled Aho-Corasick matcher over all region keywords, so a location
+is classified in one pass over its text however many keywords there are.
+Keywords only match whole words: "ca" matches "Berkeley, CA" but not
+"Chicago", and "sf" no longer matches inside other words.
+
+Results are memoized per location string, since the same location repeats on
+every speaker row of an event and across events at the same venue. The
+scraper's Bay Area filter and the search integration's location filter share
+the module-level classifier.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# SF Bay Area location keywords
+BAY_AREA_KEYWORDS = [
+    'san francisco', 'sf', 'bay area', 'oakland', 'berkeley', 'palo alto',
+    'san jose', 'mountain view', 'menlo park', 'redwood city', 'sunnyvale',
+    'santa clara', 'cupertino', 'san mateo', 'south san francisco', 'daly city',
+    'marin', 'sausalito', 'mill valley', 'tiburon', 'larkspur', 'corte madera',
+    'novato', 'san rafael', 'richmond', 'el cerrito', 'albany', 'emeryville',
+    'alameda', 'hayward', 'fremont', 'milpitas', 'east bay', 'south bay',
+    'peninsula', 'silicon valley', 'santa cruz', 'california', 'ca'
+]
+
+# Keywords of events that have no physical location
+ONLINE_KEYWORDS = ['online', 'virtual', 'zoom', 'remote']
+
+# Keywords of each region
+REGION_KEYWORDS = {
+    'sf_bay_area': BAY_AREA_KEYWORDS,
+    'online': ONLINE_KEYWORDS
+}
+
+# Names a location filter can use to select a whole region
+REGION_ALIASES = {
+    'sf_bay_area': ['sf bay area', 'sf_bay_area', 'bay area'],
+    'online': ['online', 'virtual']
+}
+
+# Distinct location strings whose regions are memoized
+LOCATION_CACHE_SIZE = 65536
+
+
+def _is_word_char(char: str) -> bool:
+    """Check if a character is part of a word"""
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds whole-word keyword matches in one pass"""
+
+    def __init__(self, keywords: Dict[str, str]):
+        """
+        Compile the automaton
+
+        Args:
+            keywords: Label of each keyword (keywords are matched case-insensitively)
+        """
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, str]]] = [[]]
+
+        for keyword, label in keywords.items():
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append((len(keyword), label))
+
+        # Breadth-first pass to link each state to its longest proper suffix in the trie
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find whole-word keyword matches
+
+        Args:
+            text: Text to search
+
+        Returns:
+            List of (start, end, label) tuples, in order of their end position
+        """
+        text = text.lower()
+        matches = []
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+
+            for length, label in self.output[state]:
+                start, end = position - length + 1, position + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and \
+                        (end == len(text) or not _is_word_char(text[end])):
+                    matches.append((start, end, label))
+        return matches
+
+    def labels(self, text: str) -> FrozenSet[str]:
+        """Get the labels of all keywords that occur in the text as whole words"""
+        return frozenset(label for _, _, label in self.find(text))
+
+
+class LocationClassifier:
+    """Memoized classifier of location strings into regions"""
+
+    def __init__(self, region_keywords: Dict[str, Iterable[str]] = REGION_KEYWORDS,
+                 cache_size: int = LOCATION_CACHE_SIZE):
+        """
+        Compile the region keywords
+
+        Args:
+            region_keywords: Keywords of each region
+            cache_size: Distinct locations whose regions are memoized
+        """
+        keywords = {}
+        for region, region_words in region_keywords.items():
+            for keyword in region_words:
+                keywords.setdefault(keyword.lower(), region)
+        self.matcher = KeywordMatcher(keywords)
+        self.regions = lru_cache(maxsize=cache_size)(self._regions)
+
+    def _regions(self, location: str) -> FrozenSet[str]:
+        """Get the regions a location belongs to"""
+        if not location or location == 'Not specified':
+            return frozenset()
+        return self.matcher.labels(location)
+
+    def is_sf_bay_area(self, location: str) -> bool:
+        """Check if a location is in the SF Bay Area (online events never are)"""
+        regions = self.regions(location)
+        return 'sf_bay_area' in regions and 'online' not in regions
+
+    def matches(self, location: str, location_filter: str) -> bool:
+        """
+        Check if a location matches a location filter
+
+        A filter naming a region ("bay area", "online") matches every location in
+        that region; any other filter must occur in the location as whole words.
+
+        Args:
+            location: Event location
+            location_filter: Location the user filtered by
+
+        Returns:
+            True if the location matches (or either side is empty)
+        """
+        if not location or not location_filter:
+            return True
+
+        region = _region_for_alias(location_filter.strip().lower())
+        if region == 'sf_bay_area':
+            return self.is_sf_bay_area(location)
+        if region:
+            return region in self.regions(location)
+        return bool(_phrase_matcher(location_filter.strip().lower()).find(location))
+
+
+def _region_for_alias(name: str) -> str:
+    """Get the region a filter name selects, or an empty string"""
+    for region, aliases in REGION_ALIASES.items():
+        if name in aliases:
+            return region
+    return ''
+
+
+@lru_cache(maxsize=1024)
+def _phrase_matcher(phrase: str) -> KeywordMatcher:
+    """Get a compiled matcher for a single filter phrase"""
+    return KeywordMatcher({phrase: phrase})
+
+
+# Shared classifier used by the scraper filters and the search integration
+location_classifier = LocationClassifier()
+
+
+def is_sf_bay_area(location: str) -> bool:
+    """Check if a location is in the SF Bay Area"""
+    return location_classifier.is_sf_bay_area(location)
+
+
+def location_matches(location: str, location_filter: str) -> bool:
+    """Check if a location matches a user's location filter"""
+    return location_classifier.matches(location, location_filter)
@@ -3,7 +3,21 @@
 Luma Event Advanced Scraper
 
 This script uses Firecrawl's V1 API to effectively scrape events from Luma,
-focusing on SF Bay Area events.
+focusing on SF Bay Area events. Event pages are fetched over a pooled async
+HTTP client with a sliding window of in-flight Firecrawl requests, paced and
+retried by a rate-limit-aware request scheduler. Near-duplicate events (the
+same event under several URLs, or reposted with small edits) are collapsed
+into one canonical event that lists the other URLs as aliases. Events are
+written to a compressed Parquet store (luma_events.parquet), the catalog and the
+CSV files the event search app reads; set LUMA_WRITE_CSV=0 to skip the CSV files
+once every consumer reads the Parquet store or catalog. Every event page response
+is kept in a compressed archive, and `reprocess` rebuilds the outputs from
+that archive without any network calls:
+
+    python luma_advanced_scraper.py               # scrape lu.ma/sf
+    python luma_advanced_scraper.py reprocess     # rebuild outputs from raw_responses/
+    python luma_advanced_scraper.py refresh       # re-check scraped events for changes
+    python luma_advanced_scraper.py clear-dead-letters  # retry URLs that failed before
 """
 
 import os
@@ -15,9 +29,19 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import re
 from dotenv import load_dotenv
-import requests
+import httpx
 import time
-import pickle
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from event_catalog import EventCatalog, CATALOG_FILE
+from event_parquet import write_events, PARQUET_FILE
+from location_classifier import is_sf_bay_area
+from crawl_state import CrawlState, CRAWL_STATE_FILE
+from request_scheduler import RequestScheduler, FirecrawlAccountError, FIRECRAWL_RATE_LIMIT
+from response_archive import ResponseArchive, ARCHIVE_DIR, load_response, response_content_hash
+from recrawl_scheduler import plan_refresh
+from event_dates import parse_event_start
+from event_dedup import collapse_duplicate_rows
 
 # Load environment variables
 load_dotenv()
@@ -35,57 +59,112 @@ logger = logging.getLogger('luma_advanced_scraper')
 
 # Constants
 FIRECRAWL_API_KEY = os.getenv('FIRECRAWL_API_KEY')
-FIRECRAWL_BASE_URL = "https://api.firecrawl.dev/v1"
+# Firecrawl API root (the same variable the Firecrawl SDK reads); point it at
+# firecrawl_replay.py to scrape recorded fixtures offline
+FIRECRAWL_API_URL = os.getenv('FIRECRAWL_API_URL', 'https://api.firecrawl.dev').rstrip('/')
+FIRECRAWL_BASE_URL = f"{FIRECRAWL_API_URL}/v1"
 OUTPUT_FILE = "luma_bay_area_events.csv"
+ALL_EVENTS_FILE = "luma_all_events.csv"
+# Also write the CSV files next to the Parquet event store (the event search app
+# reads luma_bay_area_events.csv by default)
+WRITE_CSV_OUTPUTS = os.getenv('LUMA_WRITE_CSV', '1').lower() in ('1', 'true', 'yes')
 CURRENT_DATE = datetime.now()
 MAX_PAGES = 500  # Maximum number of pages to scrape
-BATCH_SIZE = 5   # Number of URLs to process in a batch
-
-# SF Bay Area location keywords
-BAY_AREA_KEYWORDS = [
-    'san francisco', 'sf', 'bay area', 'oakland', 'berkeley', 'palo alto', 
-    'san jose', 'mountain view', 'menlo park', 'redwood city', 'sunnyvale',
-    'santa clara', 'cupertino', 'san mateo', 'south san francisco', 'daly city',
-    'marin', 'sausalito', 'mill valley', 'tiburon', 'larkspur', 'corte madera',
-    'novato', 'san rafael', 'richmond', 'el cerrito', 'albany', 'emeryville',
-    'alameda', 'hayward', 'fremont', 'milpitas', 'east bay', 'south bay',
-    'peninsula', 'silicon valley', 'santa cruz', 'california', 'ca'
-]
+FIRECRAWL_MAX_CONCURRENCY = int(os.getenv('FIRECRAWL_MAX_CONCURRENCY', '10'))  # Firecrawl requests in flight at once
+FIRECRAWL_TIMEOUT_SECONDS = float(os.getenv('FIRECRAWL_TIMEOUT_SECONDS', '120'))  # Timeout for one Firecrawl request
+PROGRESS_LOG_INTERVAL = 25  # Log progress after this many finished events
 
 class LumaAdvancedScraper:
     """Advanced scraper for Luma events using Firecrawl's full capabilities"""
     
-    def __init__(self, api_key: str):
-        """Initialize the scraper with the Firecrawl API key"""
+    def __init__(self, api_key: str, max_concurrency: int = FIRECRAWL_MAX_CONCURRENCY,
+                 crawl_state_file: str = CRAWL_STATE_FILE, archive_dir: str = ARCHIVE_DIR,
+                 rate_limit: float = FIRECRAWL_RATE_LIMIT, base_url: str = FIRECRAWL_BASE_URL,
+                 shared_state: bool = False):
+        """
+        Initialize the scraper with the Firecrawl API key
+        
+        Args:
+            api_key: Firecrawl API key
+            max_concurrency: Maximum number of Firecrawl requests in flight at once
+            crawl_state_file: SQLite file recording the crawl status of each URL
+            archive_dir: Directory of the raw response archive
+            rate_limit: Maximum Firecrawl requests per second
+            base_url: Firecrawl API base URL
+            shared_state: Other worker processes use the same crawl state file
+        """
         self.api_key = api_key
+        self.base_url = base_url
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}"
         }
+        self.max_concurrency = max(1, max_concurrency)
+        self.client = None  # Pooled HTTP client, created on first request
+        self.scheduler = RequestScheduler(rate=rate_limit, burst=self.max_concurrency)
         self.event_urls = set()  # Use a set to avoid duplicates
         self.events = []
-        # File to store scraped URLs
-        self.scraped_urls_file = 'scraped_urls.pkl'
-        self.scraped_urls = self._load_scraped_urls()
-    
-    def _load_scraped_urls(self) -> set:
-        """Load previously scraped URLs from file"""
-        if os.path.exists(self.scraped_urls_file):
-            try:
-                with open(self.scraped_urls_file, 'rb') as f:
-                    return pickle.load(f)
-            except Exception as e:
-                logger.warning(f"Error loading scraped URLs: {e}")
-                return set()
-        return set()
-    
-    def _save_scraped_urls(self):
-        """Save scraped URLs to file"""
-        try:
-            with open(self.scraped_urls_file, 'wb') as f:
-                pickle.dump(self.scraped_urls, f)
-        except Exception as e:
-            logger.warning(f"Error saving scraped URLs: {e}")
+        # Per-URL crawl progress (imports scraped_urls.pkl from older versions on first use)
+        self.crawl_state = CrawlState(crawl_state_file, shared=shared_state)
+        # Raw Firecrawl responses, kept for offline reprocessing
+        self.archive = ResponseArchive(archive_dir)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, sized for the concurrency limit"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=FIRECRAWL_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self.client
+    
+    async def close(self):
+        """Close the pooled HTTP client and the crawl state"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        if self.crawl_state is not None:
+            self.crawl_state.close()
+            self.crawl_state = None
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+    
+    async def _post_scrape(self, payload: Dict[str, Any], description: str) -> Optional[Dict[str, Any]]:
+        """
+        Call the Firecrawl scrape endpoint through the request scheduler
+        
+        Args:
+            payload: Scrape request body
+            description: What is being scraped, for error messages
+            
+        Returns:
+            The response data, or None if the request failed
+        """
+        response = await self.scheduler.post(self._get_client(), "/scrape", payload, key=payload['url'])
+        
+        if response is None:
+            logger.error(f"Failed to {description}")
+            return None
+            
+        response_data = response.json()
+        
+        if not response_data.get('success'):
+            logger.error(f"Failed to {description}: {response_data.get('error')}")
+            return None
+        
+        return response_data
     
     async def scrape_luma_events_page(self, url: str = "https://lu.ma/sf") -> List[Dict[str, Any]]:
         """
@@ -104,8 +183,13 @@ class LumaAdvancedScraper:
             event_urls = await self.get_event_urls(url)
             logger.info(f"Found {len(event_urls)} event URLs")
             
-            # Filter out already scraped URLs
-            new_urls = [url for url in event_urls if url not in self.scraped_urls]
+            # Filter out already scraped URLs, and URLs that failed permanently or are cooling down
+            self.crawl_state.mark_discovered(event_urls)
+            new_urls = [url for url in event_urls if not self.crawl_state.is_scraped(url)]
+            dead_lettered = [url for url in new_urls if self.scheduler.is_dead_lettered(url)]
+            if dead_lettered:
+                logger.info(f"Skipping {len(dead_lettered)} dead-lettered event URLs")
+                new_urls = [url for url in new_urls if not self.scheduler.is_dead_lettered(url)]
             logger.info(f"Found {len(new_urls)} new event URLs to scrape")
             
             # Limit to MAX_PAGES
@@ -113,32 +197,15 @@ class LumaAdvancedScraper:
                 logger.info(f"Limiting to {MAX_PAGES} events")
                 new_urls = new_urls[:MAX_PAGES]
             
-            # Process event URLs in batches
-            events = []
-            total_processed = 0
-            
-            for i in range(0, len(new_urls), BATCH_SIZE):
-                batch_urls = new_urls[i:i+BATCH_SIZE]
-                batch_tasks = [self.get_event_details(url) for url in batch_urls]
-                batch_results = await asyncio.gather(*batch_tasks)
-                
-                for j, result in enumerate(batch_results):
-                    if result:
-                        events.append(result)
-                        # Mark URL as scraped
-                        self.scraped_urls.add(batch_urls[j])
-                        total_processed += 1
-                
-                logger.info(f"Processed {total_processed}/{len(new_urls)} events")
-                
-                # Add a small delay between batches to avoid rate limits
-                await asyncio.sleep(2)
-                
-                # Save progress after each batch
-                self._save_scraped_urls()
+            # get_event_details records each URL's outcome in the crawl state as it finishes
+            results = await self._run_window(new_urls, self.get_event_details)
             
-            # Save the final set of scraped URLs
-            self._save_scraped_urls()
+            events = [result for result in results if result]
+            if self.scheduler.account_error:
+                logger.error(f"Crawl stopped early: {self.scheduler.account_error}")
+            logger.info(f"Scraped {len(events)}/{len(new_urls)} events")
+            logger.info(f"Firecrawl request stats: {self.scheduler.stats}")
+            logger.info(f"Crawl state: {self.crawl_state.get_counts()}")
             
             return events
             
@@ -146,6 +213,84 @@ class LumaAdvancedScraper:
             logger.error(f"Failed to scrape events page: {e}")
             return []
     
+    async def refresh_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Re-check scraped events that are due for a refresh and re-extract the ones that changed
+        
+        Each due page is first fetched as markdown only, which is cheaper than a JSON
+        extraction, and its content hash is compared with the last scraped version.
+        
+        Args:
+            limit: Maximum number of pages to check (None for all due pages)
+            
+        Returns:
+            Event data of the events whose content changed
+        """
+        plan = plan_refresh(self.crawl_state.get_refresh_records(), limit)
+        urls = [record['url'] for record in plan]
+        
+        async def refresh(url: str) -> Optional[Dict[str, Any]]:
+            changed = await self.check_for_change(url)
+            if changed:
+                return await self.get_event_details(url)
+            if changed is False:
+                self.crawl_state.mark_checked(url)
+            return None
+        
+        results = await self._run_window(urls, refresh)
+        changed_events = [result for result in results if result]
+        logger.info(f"{len(changed_events)} of {len(urls)} checked events changed")
+        return changed_events
+    
+    async def check_for_change(self, url: str) -> Optional[bool]:
+        """
+        Check if an event page changed since it was last scraped, by fetching only its markdown
+        
+        Args:
+            url: URL of the event page
+            
+        Returns:
+            True if the content changed, False if not, None if the page could not be fetched
+        """
+        record = self.crawl_state.get_record(url)
+        try:
+            response_data = await self._post_scrape({"url": url, "formats": ["markdown"]}, f"check {url} for changes")
+        except Exception as e:
+            logger.error(f"Error checking {url} for changes: {str(e)}")
+            return None
+        if response_data is None:
+            return None
+        
+        markdown = response_data.get('data', {}).get('markdown', '')
+        return not record or record['content_hash'] != response_content_hash({}, markdown)
+    
+    async def _run_window(self, items: List[Any], func) -> List[Any]:
+        """
+        Run an async function over items with a sliding window of at most max_concurrency
+        calls in flight: each worker starts its next item as soon as its previous call finishes.
+        Workers stop early once Firecrawl rejected the API key or the account ran out of credits.
+        
+        Returns:
+            Results in the same order as the items
+        """
+        results = [None] * len(items)
+        pending = iter(range(len(items)))
+        finished = 0
+        
+        async def worker():
+            nonlocal finished
+            for index in pending:
+                if self.scheduler.account_error:
+                    return
+                results[index] = await func(items[index])
+                finished += 1
+                
+                if finished % PROGRESS_LOG_INTERVAL == 0:
+                    logger.info(f"Processed {finished}/{len(items)} events")
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.max_concurrency, len(items)))))
+        return results
+    
     async def get_event_urls(self, url: str) -> List[str]:
         """
         Get event URLs from a Luma events page
@@ -175,20 +320,8 @@ class LumaAdvancedScraper:
             }
             
             logger.info("Starting scrape of Luma events page")
-            response = requests.post(
-                f"{FIRECRAWL_BASE_URL}/scrape",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Failed to scrape events page: {response.status_code} - {response.text}")
-                return []
-                
-            response_data = response.json()
-            
-            if not response_data.get('success'):
-                logger.error(f"Failed to scrape events page: {response_data.get('error')}")
+            response_data = await self._post_scrape(payload, "scrape events page")
+            if response_data is None:
                 return []
             
             # Get the HTML content
@@ -248,20 +381,9 @@ class LumaAdvancedScraper:
                 }
             }
             
-            response = requests.post(
-                f"{FIRECRAWL_BASE_URL}/scrape",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Failed to get event details: {response.status_code} - {response.text}")
-                return None
-                
-            response_data = response.json()
-            
-            if not response_data.get('success'):
-                logger.error(f"Failed to get event details: {response_data.get('error')}")
+            response_data = await self._post_scrape(payload, f"get event details for {url}")
+            if response_data is None:
+                self.crawl_state.mark_failed(url, "Firecrawl request failed")
                 return None
             
             # Get the extracted data
@@ -270,6 +392,9 @@ class LumaAdvancedScraper:
             # Get the full markdown content as event_detail
             event_detail = response_data.get('data', {}).get('markdown', '')
             
+            # Archive the raw response before anything is derived from it
+            content_hash = self.archive_response(url, event_data, event_detail)
+            
             # Add the URL and event_detail to the event data
             event_data['event_url'] = url
             event_data['event_detail'] = event_detail
@@ -277,18 +402,38 @@ class LumaAdvancedScraper:
             # Validate the extracted data
             if not self.validate_event_data(event_data):
                 logger.warning(f"Skipping event with invalid data: {url}")
+                self.crawl_state.mark_rejected(url, "Missing event name or location", content_hash)
                 return None
                 
-            # Mark URL as scraped
-            self.scraped_urls.add(url)
+            # Mark URL as scraped, with the start time used to schedule refreshes
+            starts_at = parse_event_start(event_data.get('event_date', ''), event_data.get('event_time', ''))
+            self.crawl_state.mark_scraped(url, content_hash, starts_at.isoformat() if starts_at else None)
             
             return event_data
             
+        except FirecrawlAccountError:
+            # Not the URL's fault, so it is left to be fetched by the next run
+            return None
         except Exception as e:
             logger.error(f"Error getting event details: {str(e)}")
+            self.crawl_state.mark_failed(url, str(e))
             return None
+    
+    def archive_response(self, url: str, extracted: Dict[str, Any], markdown: str) -> str:
+        """
+        Store a raw event page response in the archive
+        
+        Returns:
+            Content hash of the response (computed even if archiving fails)
+        """
+        try:
+            return self.archive.put(url, dict(extracted), markdown)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Error archiving response for {url}: {e}")
+            return response_content_hash(extracted, markdown)
             
-    def validate_event_data(self, event_data: Dict[str, Any]) -> bool:
+    @staticmethod
+    def validate_event_data(event_data: Dict[str, Any]) -> bool:
         """
         Validate event data to ensure we have minimum required fields
         """
@@ -302,23 +447,10 @@ class LumaAdvancedScraper:
             
         return True
     
-    def is_sf_bay_area_location(self, location: str) -> bool:
-        """Check if a location is in the SF Bay Area"""
-        if not location or location == 'Not specified':
-            return False
-            
-        location_lower = location.lower()
-        
-        # Check for online/virtual events
-        if any(keyword in location_lower for keyword in ['online', 'virtual', 'zoom', 'remote']):
-            return False
-            
-        # Check for Bay Area keywords
-        for keyword in BAY_AREA_KEYWORDS:
-            if keyword in location_lower:
-                return True
-                
-        return False
+    @staticmethod
+    def is_sf_bay_area_location(location: str) -> bool:
+        """Check if a location is in the SF Bay Area (whole-word keyword match, memoized per location)"""
+        return is_sf_bay_area(location)
     
     def is_future_event(self, date_str: str) -> bool:
         """Check if an event is in the future based on extracted date string"""
@@ -387,7 +519,8 @@ class LumaAdvancedScraper:
             logger.warning(f"Error processing date '{date_str}': {str(e)}. Including it.")
             return True
     
-    def process_event_data(self, event_data: Dict[str, Any], url: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def process_event_data(event_data: Dict[str, Any], url: str) -> List[Dict[str, Any]]:
         """Process event data into a format suitable for CSV output"""
         processed_events = []
         
@@ -440,6 +573,21 @@ class LumaAdvancedScraper:
             
         return processed_events
     
+    @staticmethod
+    def deduplicate_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapse near-duplicate events into the first event of each cluster
+
+        Args:
+            events: Processed event rows (one row per speaker)
+
+        Returns:
+            Rows of the canonical events, with their duplicates' speakers; each row lists the URLs
+            of its event's duplicates under 'aliases'
+        """
+        return collapse_duplicate_rows(events, 'event_name', 'event_summary',
+                                       ('speaker_name', 'speaker_company', 'speaker_title'))
+    
     def filter_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Filter events to only include future SF Bay Area events"""
         filtered_events = []
@@ -466,14 +614,14 @@ class LumaAdvancedScraper:
         
         return filtered_events
     
-    def save_events_to_csv(self, events: List[Dict[str, Any]], filename: str) -> None:
-        """Save events to a CSV file"""
+    def save_events_to_csv(self, events: List[Dict[str, Any]], filename: str, overwrite: bool = False) -> None:
+        """Save events to a CSV file, appending unless overwrite is set"""
         if not events:
             logger.warning("No events to save")
             return
             
         # Check if file exists to determine if we need to write headers
-        file_exists = os.path.isfile(filename)
+        file_exists = os.path.isfile(filename) and not overwrite
         
         # Define fieldnames
         fieldnames = [
@@ -487,7 +635,8 @@ class LumaAdvancedScraper:
         
         try:
             with open(filename, mode, newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                # Fields the CSV schema has no column for (like aliases) only go to the Parquet store
+                writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
                 
                 # Only write header if file doesn't exist
                 if not file_exists:
@@ -499,9 +648,182 @@ class LumaAdvancedScraper:
             logger.info(f"Successfully saved events to {filename}")
         except Exception as e:
             logger.error(f"Error saving events to CSV: {e}")
+    
+    def replace_events_in_csv(self, events: List[Dict[str, Any]], urls: List[str], filename: str) -> None:
+        """Replace the rows of the given event URLs in a CSV file with new rows"""
+        if not os.path.isfile(filename):
+            self.save_events_to_csv(events, filename)
+            return
+        
+        url_set = set(urls)
+        tmp_filename = f"{filename}.tmp"
+        try:
+            with open(filename, 'r', newline='', encoding='utf-8') as src, \
+                    open(tmp_filename, 'w', newline='', encoding='utf-8') as dst:
+                reader = csv.DictReader(src)
+                writer = csv.DictWriter(dst, fieldnames=reader.fieldnames, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(row for row in reader if row.get('event_url') not in url_set)
+                writer.writerows(events)
+            os.replace(tmp_filename, filename)
+            logger.info(f"Replaced {len(url_set)} events in {filename}")
+        except Exception as e:
+            logger.error(f"Error updating events in CSV: {e}")
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+    
+    def update_changed_events(self, changed_events: List[Dict[str, Any]]) -> None:
+        """Rewrite only the changed events in the Parquet store, the CSV files and the catalog"""
+        if not changed_events:
+            return
+        
+        urls = [event['event_url'] for event in changed_events]
+        processed_events = []
+        for event in changed_events:
+            processed_events.extend(self.process_event_data(event, event['event_url']))
+        filtered_events = self.filter_events(processed_events)
+        
+        # The Parquet store replaces events by URL
+        self.save_events_to_parquet(processed_events, PARQUET_FILE)
+        if WRITE_CSV_OUTPUTS:
+            self.replace_events_in_csv(filtered_events, urls, OUTPUT_FILE)
+            self.replace_events_in_csv(processed_events, urls, ALL_EVENTS_FILE)
+        
+        # Upsert the events that still pass the filters and drop the ones that no longer do
+        try:
+            with EventCatalog(CATALOG_FILE) as catalog:
+                catalog.ingest_rows(filtered_events)
+                kept_urls = {row['event_url'] for row in filtered_events}
+                catalog.delete_events([url for url in urls if url not in kept_urls])
+        except Exception as e:
+            logger.error(f"Error updating events in catalog: {e}")
+    
+    def save_events_to_parquet(self, events: List[Dict[str, Any]], filename: str, overwrite: bool = False) -> None:
+        """Save processed event rows to the Parquet event store, flagging Bay Area events"""
+        if not events:
+            logger.warning("No events to save")
+            return
+        
+        try:
+            write_events(events, filename, self.is_sf_bay_area_location, overwrite=overwrite)
+            logger.info(f"Successfully saved events to {filename}")
+        except Exception as e:
+            logger.error(f"Error saving events to Parquet: {e}")
+    
+    def save_events_to_catalog(self, events: List[Dict[str, Any]], db_path: str) -> None:
+        """Save processed event rows to the normalized SQLite catalog"""
+        if not events:
+            logger.warning("No events to save")
+            return
+        
+        try:
+            with EventCatalog(db_path) as catalog:
+                catalog.ingest_rows(events)
+                # Duplicates stored by earlier runs are now aliases of a canonical event
+                catalog.delete_events(sorted({url for row in events for url in row.get('aliases', [])}))
+            logger.info(f"Successfully saved events to {db_path}")
+        except Exception as e:
+            logger.error(f"Error saving events to catalog: {e}")
+
+def _reprocess_response(archive_dir: str, url: str, content_hash: str) -> List[Dict[str, Any]]:
+    """Rebuild the CSV rows of one archived response (runs in a worker process)"""
+    try:
+        response = load_response(archive_dir, content_hash)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading archived response for {url}: {e}")
+        return []
+    
+    event_data = dict(response.get('json') or {})
+    event_data['event_url'] = url
+    event_data['event_detail'] = response.get('markdown', '')
+    
+    if not LumaAdvancedScraper.validate_event_data(event_data):
+        return []
+    return LumaAdvancedScraper.process_event_data(event_data, url)
+
+def reprocess_archive(archive_dir: str = ARCHIVE_DIR, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Rebuild processed event rows from the latest archived response of every URL
+    
+    Args:
+        archive_dir: Directory of the raw response archive
+        workers: Number of worker processes (defaults to the number of CPU cores)
+        
+    Returns:
+        Processed event rows, in URL order
+    """
+    with ResponseArchive(archive_dir) as archive:
+        entries = archive.latest_entries()
+    logger.info(f"Reprocessing {len(entries)} archived responses from {archive_dir}")
+    
+    if not entries:
+        return []
+    
+    workers = workers or os.cpu_count() or 1
+    processed_events = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(entries) // (workers * 4))
+        results = executor.map(
+            _reprocess_response,
+            [archive_dir] * len(entries),
+            [url for url, _ in entries],
+            [content_hash for _, content_hash in entries],
+            chunksize=chunksize
+        )
+        for rows in results:
+            processed_events.extend(rows)
+    
+    logger.info(f"Rebuilt {len(processed_events)} rows with {workers} worker processes")
+    return processed_events
+
+def save_outputs(scraper: LumaAdvancedScraper, processed_events: List[Dict[str, Any]], overwrite: bool = False) -> None:
+    """Deduplicate and filter processed events and write the Parquet store, the catalog and (optionally) the CSV files"""
+    processed_events = scraper.deduplicate_events(processed_events)
+    
+    # Filter events
+    filtered_events = scraper.filter_events(processed_events)
+    
+    # Save all events once; the Bay Area subset is a filter on read
+    scraper.save_events_to_parquet(processed_events, PARQUET_FILE, overwrite=overwrite)
+    
+    if WRITE_CSV_OUTPUTS:
+        scraper.save_events_to_csv(filtered_events, OUTPUT_FILE, overwrite=overwrite)
+        scraper.save_events_to_csv(processed_events, ALL_EVENTS_FILE, overwrite=overwrite)
+    
+    # Ingest the filtered events into the normalized catalog
+    scraper.save_events_to_catalog(filtered_events, CATALOG_FILE)
 
 async def main():
     """Main function to run the scraper"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Luma Advanced Event Scraper')
+    parser.add_argument('command', nargs='?', choices=['scrape', 'reprocess', 'refresh', 'clear-dead-letters'],
+                        default='scrape',
+                        help='scrape Luma, rebuild the outputs from the raw response archive, '
+                             're-check scraped events for changes, or forget URLs that failed '
+                             'before so the next scrape fetches them again (default: scrape)')
+    parser.add_argument('--archive', type=str, default=ARCHIVE_DIR, help='Raw response archive directory')
+    parser.add_argument('--workers', type=int, help='Worker processes for reprocess (default: number of CPU cores)')
+    parser.add_argument('--limit', type=int, help='Maximum number of events to check in refresh (default: all due events)')
+    parser.add_argument('--url', action='append', help='URL to clear with clear-dead-letters (default: all)')
+    args = parser.parse_args()
+    
+    if args.command == 'clear-dead-letters':
+        RequestScheduler().clear_dead_letters(args.url)
+        return
+    
+    if args.command == 'reprocess':
+        logger.info("Reprocessing archived Luma events")
+        processed_events = reprocess_archive(args.archive, args.workers)
+        
+        # Rebuild the outputs from scratch, without touching the network
+        async with LumaAdvancedScraper(FIRECRAWL_API_KEY or '', archive_dir=args.archive) as scraper:
+            save_outputs(scraper, processed_events, overwrite=True)
+        
+        logger.info("Reprocessing completed")
+        return
+    
     logger.info("Starting Luma Advanced Event Scraper")
     
     # Check if Firecrawl API key is available
@@ -509,25 +831,23 @@ async def main():
         logger.error("Firecrawl API key not found. Please set FIRECRAWL_API_KEY in .env file")
         return
     
-    # Initialize scraper
-    scraper = LumaAdvancedScraper(FIRECRAWL_API_KEY)
-    
-    # Scrape events
-    events = await scraper.scrape_luma_events_page("https://lu.ma/sf")
-    
-    # Process event data
-    processed_events = []
-    for event in events:
-        processed_events.extend(scraper.process_event_data(event, event['event_url']))
-    
-    # Filter events
-    filtered_events = scraper.filter_events(processed_events)
+    if args.command == 'refresh':
+        async with LumaAdvancedScraper(FIRECRAWL_API_KEY, archive_dir=args.archive) as scraper:
+            changed_events = await scraper.refresh_events(args.limit)
+            scraper.update_changed_events(changed_events)
+        logger.info("Refresh completed")
+        return
     
-    # Save events to CSV
-    scraper.save_events_to_csv(filtered_events, OUTPUT_FILE)
+    # Initialize scraper and scrape events
+    async with LumaAdvancedScraper(FIRECRAWL_API_KEY, archive_dir=args.archive) as scraper:
+        events = await scraper.scrape_luma_events_page("https://lu.ma/sf")
     
-    # Also save all events to a separate file for reference
-    scraper.save_events_to_csv(processed_events, "luma_all_events.csv")
+        # Process event data
+        processed_events = []
+        for event in events:
+            processed_events.extend(scraper.process_event_data(event, event['event_url']))
+        
+        save_outputs(scraper, processed_events)
     
     logger.info("Luma Advanced Event Scraper completed")
 
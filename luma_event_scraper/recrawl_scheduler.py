@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Luma Recrawl Scheduler
+
+Decides which already-scraped event pages to check for changes (new time,
+venue or speakers). Each event gets a refresh interval that shrinks as the
+event gets closer and as its page is seen changing more often; events whose
+interval has elapsed since their last check are due, and due events are
+checked most urgent first:
+
+    interval = clamp(days_until_event * HOURS_PER_DAY_UNTIL_EVENT, MIN, MAX) / (1 + change_rate)
+    priority = (1 + change_rate) / (1 + days_until_event)
+
+where change_rate is the fraction of past checks that found changed content.
+Events that have already started are not refreshed.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from event_dates import default_timezone
+
+logger = logging.getLogger('recrawl_scheduler')
+
+# Refresh interval: this many hours per day until the event, within the bounds below
+HOURS_PER_DAY_UNTIL_EVENT = 4.0
+MIN_REFRESH_INTERVAL = timedelta(hours=6)
+MAX_REFRESH_INTERVAL = timedelta(days=7)
+
+# Days until the event assumed for events whose start time is unknown
+UNKNOWN_START_DAYS = 30.0
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp, treating naive values as local time"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+
+def refresh_interval(days_until_event: float, change_rate: float) -> timedelta:
+    """
+    Get how long to wait between checks of an event page
+
+    Args:
+        days_until_event: Days until the event starts
+        change_rate: Fraction of past checks that found changed content (0.0 to 1.0)
+
+    Returns:
+        Time between checks
+    """
+    interval = timedelta(hours=days_until_event * HOURS_PER_DAY_UNTIL_EVENT)
+    interval = max(MIN_REFRESH_INTERVAL, min(MAX_REFRESH_INTERVAL, interval))
+    return interval / (1 + change_rate)
+
+
+def plan_refresh(records: List[Dict[str, Any]], limit: Optional[int] = None,
+                 now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Pick the event pages due for a change check, most urgent first
+
+    Args:
+        records: Refresh records from CrawlState.get_refresh_records
+        limit: Maximum number of pages to check (None for all due pages)
+        now: Current time (defaults to now)
+
+    Returns:
+        Due records, each with added days_until_event and priority fields
+    """
+    now = now or datetime.now(default_timezone())
+    due = []
+
+    for record in records:
+        starts_at = _parse_time(record.get('starts_at'))
+        if starts_at is not None and starts_at <= now:
+            continue  # Started or over; nothing useful can change
+
+        days_until_event = (starts_at - now).total_seconds() / 86400 if starts_at else UNKNOWN_START_DAYS
+        checks = record.get('checks') or 0
+        change_rate = min(1.0, (record.get('change_count') or 0) / checks) if checks else 0.0
+
+        checked_at = _parse_time(record.get('checked_at'))
+        if checked_at is not None and now - checked_at < refresh_interval(days_until_event, change_rate):
+            continue
+
+        due.append(dict(record, days_until_event=round(days_until_event, 2),
+                        priority=(1 + change_rate) / (1 + days_until_event)))
+
+    due.sort(key=lambda record: record['priority'], reverse=True)
+    if limit is not None:
+        due = due[:limit]
+
+    logger.info(f"{len(due)} of {len(records)} scraped events are due for a refresh check")
+    return due
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Firecrawl Request Scheduler
+
+Paces and retries Firecrawl requests so the scraper runs at the highest rate
+the API sustains without losing events:
+1. A token bucket limits the request rate; the rate is halved when Firecrawl
+   answers 429 and creeps back up after successful requests
+2. 429, 5xx and network errors are retried with exponential backoff and full
+   jitter, honoring Retry-After (which also pauses every other request)
+3. Each URL has a retry budget; URLs that exhaust it, or fail with an error
+   about the URL itself, are recorded in a dead-letter file. URLs that were
+   malformed or gone are skipped until the list is cleared; other failures (a
+   Firecrawl outage, say) are tried again after a cooldown, and a URL that
+   succeeds again leaves the list
+4. A rejected API key or exhausted credits fail the whole run, not the URL:
+   the scheduler raises FirecrawlAccountError for that and every later request
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger('request_scheduler')
+
+# Requests per second to start at, and the range the adaptive rate stays in
+FIRECRAWL_RATE_LIMIT = float(os.getenv('FIRECRAWL_RATE_LIMIT', '5'))
+MIN_RATE_LIMIT = 0.1
+
+# Attempts per URL before it is dead-lettered
+FIRECRAWL_MAX_ATTEMPTS = int(os.getenv('FIRECRAWL_MAX_ATTEMPTS', '5'))
+
+# Exponential backoff base and cap, in seconds
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Responses worth retrying; other non-200 responses fail the URL
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Responses saying the URL itself is malformed or gone, so it is never tried again
+PERMANENT_STATUS_CODES = {400, 404, 410}
+
+# Responses about the API key or account (bad key, no credits), which fail every request of the run
+ACCOUNT_STATUS_CODES = {401, 402, 403}
+
+# File listing URLs that failed permanently or exhausted their retries, one JSON object per line
+DEAD_LETTER_FILE = "firecrawl_dead_letter.jsonl"
+
+# Hours before a URL that exhausted its retries on transient errors is tried again
+DEAD_LETTER_COOLDOWN_HOURS = float(os.getenv('FIRECRAWL_DEAD_LETTER_COOLDOWN_HOURS', '6'))
+
+
+class FirecrawlAccountError(Exception):
+    """Firecrawl rejected the API key or the account ran out of credits"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds to wait
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Async token bucket with an adjustable rate and a pause for Retry-After"""
+
+    def __init__(self, rate: float, capacity: float, max_rate: Optional[float] = None):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+            max_rate: Highest rate the bucket recovers to after being slowed down (defaults to rate)
+        """
+        self.rate = rate
+        self.max_rate = max_rate or rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    def slow_down(self) -> None:
+        """Halve the rate after the server pushed back"""
+        self.rate = max(MIN_RATE_LIMIT, self.rate / 2)
+        logger.warning(f"Rate limited; slowing down to {self.rate:.2f} requests/s")
+
+    def speed_up(self) -> None:
+        """Recover the rate a little after a successful request"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + 0.05 * self.max_rate)
+
+
+class RequestScheduler:
+    """Rate-limited, retrying sender of Firecrawl requests"""
+
+    def __init__(self, rate: float = FIRECRAWL_RATE_LIMIT, burst: float = 1.0,
+                 max_attempts: int = FIRECRAWL_MAX_ATTEMPTS, dead_letter_file: Optional[str] = DEAD_LETTER_FILE,
+                 cooldown_hours: float = DEAD_LETTER_COOLDOWN_HOURS):
+        """
+        Initialize the scheduler
+
+        Args:
+            rate: Maximum requests per second
+            burst: Requests that may be sent back to back before the rate applies
+            max_attempts: Attempts per URL before it is dead-lettered
+            dead_letter_file: JSON lines file recording failed URLs (None keeps them in memory only)
+            cooldown_hours: Hours before a URL that exhausted its retries is tried again
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_file = dead_letter_file
+        self.cooldown = timedelta(hours=cooldown_hours)
+        self.dead_letters = self._load_dead_letters()
+        self.account_error = None
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'dead_lettered': 0}
+
+    async def post(self, client: httpx.AsyncClient, path: str, payload: Dict[str, Any],
+                   key: str) -> Optional[httpx.Response]:
+        """
+        Send a POST request, retrying transient failures within the URL's retry budget
+
+        Args:
+            client: HTTP client to send the request with
+            path: Request path
+            payload: JSON body
+            key: URL being scraped, used for the retry budget and the dead-letter list
+
+        Returns:
+            The successful response, or None if the request failed
+
+        Raises:
+            FirecrawlAccountError: If Firecrawl rejected the API key or the account is out of
+                credits, in this or an earlier request
+        """
+        last_error = ''
+        permanent = False
+        for attempt in range(1, self.max_attempts + 1):
+            if self.account_error:
+                raise FirecrawlAccountError(self.account_error)
+            await self.bucket.acquire()
+            self.stats['requests'] += 1
+            retry_after = None
+
+            try:
+                response = await client.post(path, json=payload)
+            except httpx.TransportError as e:
+                last_error = f"{type(e).__name__}: {str(e)}"
+            else:
+                if response.status_code == 200:
+                    self.bucket.speed_up()
+                    if key in self.dead_letters:
+                        self._remove_dead_letters([key])
+                    return response
+
+                last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code in ACCOUNT_STATUS_CODES:
+                    # Not the URL's fault, so it is not dead-lettered; the run cannot go on
+                    self.account_error = f"Firecrawl rejected the request for {key} ({last_error})"
+                    logger.error(self.account_error)
+                    raise FirecrawlAccountError(self.account_error)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    permanent = response.status_code in PERMANENT_STATUS_CODES
+                    break
+
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if response.status_code == 429:
+                    self.stats['rate_limited'] += 1
+                    self.bucket.slow_down()
+                    if retry_after is not None:
+                        self.bucket.pause(retry_after)
+
+            if attempt == self.max_attempts:
+                break
+
+            # Full jitter backoff, but never sooner than the server asked for
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            self.stats['retries'] += 1
+            logger.warning(f"Attempt {attempt}/{self.max_attempts} for {key} failed ({last_error}); "
+                           f"retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        self._dead_letter(key, last_error, attempt, permanent)
+        return None
+
+    def is_dead_lettered(self, key: str) -> bool:
+        """
+        Check if a URL should be skipped because it failed in this or an earlier run
+
+        Args:
+            key: URL to check
+
+        Returns:
+            True if the URL was malformed or gone, or failed otherwise less than the cooldown ago
+        """
+        entry = self.dead_letters.get(key)
+        if entry is None:
+            return False
+        if _is_permanent(entry):
+            return True
+        try:
+            failed_at = datetime.fromisoformat(entry['failed_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now() - failed_at < self.cooldown
+
+    def clear_dead_letters(self, keys: Optional[List[str]] = None) -> int:
+        """
+        Remove URLs from the dead-letter list, so the next crawl fetches them again
+
+        Args:
+            keys: URLs to remove (None removes every URL)
+
+        Returns:
+            Number of URLs removed
+        """
+        cleared = [key for key in (self.dead_letters if keys is None else keys) if key in self.dead_letters]
+        self._remove_dead_letters(cleared)
+        logger.info(f"Cleared {len(cleared)} dead-lettered URLs")
+        return len(cleared)
+
+    def _remove_dead_letters(self, keys: List[str]) -> None:
+        """Remove URLs from the dead-letter list and rewrite the dead-letter file without them"""
+        for key in keys:
+            self.dead_letters.pop(key, None)
+        if not self.dead_letter_file or not os.path.exists(self.dead_letter_file):
+            return
+
+        # Re-read the file, which other worker processes may have appended to since it was loaded
+        removed = set(keys)
+        remaining = {url: entry for url, entry in self._load_dead_letters().items() if url not in removed}
+        try:
+            if remaining:
+                tmp_path = f"{self.dead_letter_file}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for entry in remaining.values():
+                        f.write(json.dumps(entry) + '\n')
+                os.replace(tmp_path, self.dead_letter_file)
+            else:
+                os.remove(self.dead_letter_file)
+        except OSError as e:
+            logger.warning(f"Error rewriting dead-letter file: {e}")
+
+    def get_dead_letters(self) -> List[Dict[str, Any]]:
+        """Get the dead-lettered URLs with their last error and whether the failure was permanent"""
+        return list(self.dead_letters.values())
+
+    def _dead_letter(self, key: str, error: str, attempts: int, permanent: bool) -> None:
+        """Record a URL that failed permanently or exhausted its retries"""
+        entry = {'url': key, 'error': error, 'attempts': attempts, 'permanent': permanent,
+                 'failed_at': datetime.now().isoformat(timespec='seconds')}
+        self.dead_letters[key] = entry
+        self.stats['dead_lettered'] += 1
+        if permanent:
+            logger.error(f"Giving up on {key} after {attempts} attempt(s): {error}")
+        else:
+            logger.error(f"Giving up on {key} for {self.cooldown} after {attempts} attempt(s): {error}")
+
+        if self.dead_letter_file:
+            try:
+                with open(self.dead_letter_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+            except OSError as e:
+                logger.warning(f"Error writing dead-letter file: {e}")
+
+    def _load_dead_letters(self) -> Dict[str, Dict[str, Any]]:
+        """Load URLs dead-lettered by earlier runs"""
+        dead_letters = {}
+        if not self.dead_letter_file or not os.path.exists(self.dead_letter_file):
+            return dead_letters
+
+        try:
+            with open(self.dead_letter_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written last line
+                    if _error_status(entry) in ACCOUNT_STATUS_CODES:
+                        continue  # Written before account errors stopped the run instead
+                    dead_letters[entry['url']] = entry
+        except OSError as e:
+            logger.warning(f"Error loading dead-letter file: {e}")
+        return dead_letters
+
+
+def _error_status(entry: Dict[str, Any]) -> Optional[int]:
+    """Get the HTTP status recorded in a dead-letter entry's error, if it has one"""
+    match = re.match(r'HTTP (\d{3})', entry.get('error') or '')
+    return int(match.group(1)) if match else None
+
+
+def _is_permanent(entry: Dict[str, Any]) -> bool:
+    """Check if a dead-letter entry records a malformed or gone URL rather than a failure worth retrying"""
+    status = _error_status(entry)
+    if status is not None:
+        return status in PERMANENT_STATUS_CODES
+    return bool(entry.get('permanent'))
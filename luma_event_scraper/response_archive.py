@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Luma Raw Response Archive
+
+Keeps the raw Firecrawl output for every scraped event page (the JSON
+extraction plus the full markdown), so changes to the flattening logic, the
+filters or the output schema can be applied by reprocessing the archive
+instead of scraping everything again.
+
+Responses are stored content-addressed: each one is a gzip-compressed JSON
+blob named after the SHA-256 hash of the page markdown, under
+objects/<first two hex digits>/<hash>.json.gz. A SQLite index maps each URL
+to the content hashes fetched for it, so unchanged pages are stored once and
+the latest response of every URL can be listed without opening any blobs.
+"""
+
+import os
+import gzip
+import json
+import sqlite3
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('response_archive')
+
+# Default location of the archive directory
+ARCHIVE_DIR = "raw_responses"
+
+# Seconds to wait for a lock on the index held by another worker process
+BUSY_TIMEOUT_SECONDS = 30
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (url, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_responses_url_fetched ON responses(url, fetched_at);
+"""
+
+
+def response_content_hash(extracted: Dict[str, Any], markdown: str) -> str:
+    """
+    Hash the content of a scraped event page
+
+    The page markdown identifies the content; the LLM extraction is only used when
+    there is no markdown, since it can vary between fetches of an unchanged page.
+
+    Args:
+        extracted: JSON extraction returned by Firecrawl
+        markdown: Markdown of the page
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    content = markdown if markdown else json.dumps(extracted, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ResponseArchive:
+    """Compressed, content-addressed store of raw Firecrawl event page responses"""
+
+    def __init__(self, archive_dir: str = ARCHIVE_DIR):
+        """
+        Open the archive, creating the directory and index if needed
+
+        Args:
+            archive_dir: Directory holding the blobs and the index database
+        """
+        self.archive_dir = archive_dir
+        os.makedirs(os.path.join(archive_dir, 'objects'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(archive_dir, 'index.db'), timeout=BUSY_TIMEOUT_SECONDS,
+                                    check_same_thread=False)
+        self.conn.executescript(INDEX_SCHEMA)
+
+    def close(self) -> None:
+        """Close the index database"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def blob_path(self, content_hash: str) -> str:
+        """Get the path of the blob for a content hash"""
+        return os.path.join(self.archive_dir, 'objects', content_hash[:2], f"{content_hash}.json.gz")
+
+    def put(self, url: str, extracted: Dict[str, Any], markdown: str) -> str:
+        """
+        Archive one event page response
+
+        Args:
+            url: URL of the event page
+            extracted: JSON extraction returned by Firecrawl
+            markdown: Markdown of the page
+
+        Returns:
+            Content hash of the response
+        """
+        content_hash = response_content_hash(extracted, markdown)
+        path = self.blob_path(content_hash)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            blob = json.dumps({'url': url, 'json': extracted, 'markdown': markdown}, default=str).encode('utf-8')
+
+            # Write to a temporary file and rename, so a crash never leaves a truncated blob
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(gzip.compress(blob, compresslevel=6))
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO responses (url, content_hash, fetched_at) VALUES (?, ?, ?)
+                ON CONFLICT(url, content_hash) DO UPDATE SET fetched_at = excluded.fetched_at
+                """,
+                (url, content_hash, datetime.now().isoformat(timespec='seconds'))
+            )
+        return content_hash
+
+    def get_latest_hash(self, url: str) -> Optional[str]:
+        """Get the content hash of the most recent response for a URL"""
+        row = self.conn.execute(
+            "SELECT content_hash FROM responses WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def latest_entries(self) -> List[Tuple[str, str]]:
+        """
+        List the most recent response of every archived URL
+
+        Returns:
+            List of (url, content hash) pairs
+        """
+        rows = self.conn.execute(
+            """
+            SELECT url, content_hash FROM (
+                SELECT url, content_hash,
+                       ROW_NUMBER() OVER (PARTITION BY url ORDER BY fetched_at DESC) AS position
+                FROM responses
+            ) WHERE position = 1 ORDER BY url
+            """
+        ).fetchall()
+        return [(url, content_hash) for url, content_hash in rows]
+
+
+def load_response(archive_dir: str, content_hash: str) -> Dict[str, Any]:
+    """
+    Read one archived response
+
+    A module-level function that only needs the archive path, so it can run in worker processes.
+
+    Args:
+        archive_dir: Archive directory
+        content_hash: Content hash of the response
+
+    Returns:
+        Dictionary with the url, json extraction and markdown of the page
+    """
+    path = os.path.join(archive_dir, 'objects', content_hash[:2], f"{content_hash}.json.gz")
+    with open(path, 'rb') as f:
+        return json.loads(gzip.decompress(f.read()))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Scraper Benchmark
+
+Measures LumaAdvancedScraper offline against the Firecrawl replay server at
+several concurrency settings. Each setting gets a fresh replay server process
+(with the same fault seed) and a fresh crawl state and archive, and reports:
+1. Throughput: events scraped per second over the whole crawl, listing page included
+2. Peak memory: peak Python heap of the scraper during the crawl (tracemalloc)
+3. Retry behaviour: requests sent, retries, 429 responses and dead-lettered
+   URLs, from the scraper's request scheduler and from the server
+
+    python scraper_benchmark.py --concurrency 1 5 10 20 --latency-ms 800 --jitter-ms 400 \\
+        --error-rate 0.02 --rate-limit-rate 0.05 --copies 5
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+import httpx
+
+from firecrawl_replay import (
+    ReplayServer, FaultConfig, FIXTURES_FILE, DEFAULT_LISTING_URLS, load_fixtures, record_fixtures,
+    events_from_csv, add_fault_arguments, fault_config
+)
+from crawl_state import CrawlState
+from luma_advanced_scraper import LumaAdvancedScraper
+from request_scheduler import RequestScheduler
+
+logger = logging.getLogger('scraper_benchmark')
+
+# Concurrency settings to compare when none are given
+DEFAULT_CONCURRENCY = [1, 5, 10, 20]
+
+# Request rate the scraper may use; high enough that concurrency and injected faults set the pace
+BENCHMARK_RATE_LIMIT = 1000.0
+
+
+def _serve(fixtures_path: str, faults: FaultConfig, ready) -> None:
+    """Run a replay server in a child process and report its URL"""
+    logging.basicConfig(level=logging.WARNING)
+    server = ReplayServer(load_fixtures(fixtures_path), faults, port=0)
+    ready.put(server.url)
+    server.serve_forever()
+
+
+def _start_server(fixtures_path: str, faults: FaultConfig):
+    """Start a replay server process and get its URL"""
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(fixtures_path, faults, ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=30)
+
+
+async def run_crawl(base_url: str, concurrency: int, rate_limit: float, listing_url: str,
+                    work_dir: str) -> Dict[str, Any]:
+    """
+    Crawl a listing page and its events through the replay server
+
+    Args:
+        base_url: Replay server root URL
+        concurrency: Firecrawl requests in flight at once
+        rate_limit: Maximum requests per second
+        listing_url: Listing page to crawl
+        work_dir: Directory for the crawl state and the response archive
+
+    Returns:
+        Scraped event count, elapsed seconds, peak memory and the scheduler's request stats
+    """
+    crawl_state_file = os.path.join(work_dir, 'crawl_state.db')
+    scraper = LumaAdvancedScraper(
+        'replay', max_concurrency=concurrency, rate_limit=rate_limit, base_url=f"{base_url}/v1",
+        crawl_state_file=crawl_state_file, archive_dir=os.path.join(work_dir, 'raw_responses')
+    )
+    # Keep the scraped URLs and dead letters of earlier real crawls out of the benchmark
+    scraper.crawl_state.close()
+    os.remove(crawl_state_file)
+    scraper.crawl_state = CrawlState(crawl_state_file, legacy_pickle=None)
+    scraper.scheduler = RequestScheduler(rate=rate_limit, burst=scraper.max_concurrency, dead_letter_file=None)
+    # Build the pooled client (and its SSL context) before measuring, as it costs the same at any concurrency
+    scraper._get_client()
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    async with scraper:
+        events = await scraper.scrape_luma_events_page(listing_url)
+    elapsed = time.perf_counter() - start_time
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'events': len(events),
+        'seconds': elapsed,
+        'peak_memory_mb': peak_bytes / (1024 * 1024),
+        'scheduler': dict(scraper.scheduler.stats)
+    }
+
+
+def benchmark(fixtures_path: str, concurrency_levels: List[int], faults: FaultConfig,
+              rate_limit: float = BENCHMARK_RATE_LIMIT, listing_url: str = DEFAULT_LISTING_URLS[0]) -> List[Dict[str, Any]]:
+    """
+    Run the crawl once per concurrency setting
+
+    Args:
+        fixtures_path: Fixture file to replay
+        concurrency_levels: Concurrency settings to compare
+        faults: Latency and failures the server injects
+        rate_limit: Maximum requests per second the scraper may send
+        listing_url: Listing page to crawl
+
+    Returns:
+        One result per concurrency setting
+    """
+    results = []
+    for concurrency in concurrency_levels:
+        process, base_url = _start_server(fixtures_path, faults)
+        try:
+            with tempfile.TemporaryDirectory(prefix='scraper_benchmark_') as work_dir:
+                result = asyncio.run(run_crawl(base_url, concurrency, rate_limit, listing_url, work_dir))
+            result['server'] = httpx.get(f"{base_url}/stats").json()
+        finally:
+            process.terminate()
+            process.join()
+
+        result['concurrency'] = concurrency
+        result['events_per_second'] = result['events'] / result['seconds'] if result['seconds'] else 0.0
+        results.append(result)
+        logger.info(f"Concurrency {concurrency}: {result['events']} events in {result['seconds']:.2f}s")
+    return results
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Format benchmark results as a table"""
+    header = (f"{'concurrency':>11} {'events':>6} {'seconds':>8} {'events/s':>8} {'peak MB':>8} "
+              f"{'requests':>8} {'retries':>7} {'429s':>5} {'5xx':>5} {'dead':>5} {'peak in flight':>14}")
+    lines = [header, '-' * len(header)]
+    for result in results:
+        scheduler, server = result['scheduler'], result['server']
+        lines.append(
+            f"{result['concurrency']:>11} {result['events']:>6} {result['seconds']:>8.2f} "
+            f"{result['events_per_second']:>8.2f} {result['peak_memory_mb']:>8.1f} "
+            f"{scheduler['requests']:>8} {scheduler['retries']:>7} {server['rate_limited']:>5} "
+            f"{server['errors']:>5} {scheduler['dead_lettered']:>5} {server['peak_in_flight']:>14}"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    """Command line entry point for the scraper benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark the Luma scraper against recorded Firecrawl responses')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=DEFAULT_CONCURRENCY,
+                        help='Concurrency settings to compare (default: 1 5 10 20)')
+    parser.add_argument('--fixtures', type=str, default=FIXTURES_FILE, help='Fixture file to replay')
+    parser.add_argument('--csv', type=str, help='Record fixtures from this scraper CSV file instead')
+    parser.add_argument('--copies', type=int, default=1, help='With --csv, times to repeat every event')
+    parser.add_argument('--rate-limit', type=float, default=BENCHMARK_RATE_LIMIT,
+                        help='Maximum requests per second the scraper may send')
+    parser.add_argument('--output', type=str, help='Write the results to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show the scraper log')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    faults = fault_config(args)
+    with tempfile.TemporaryDirectory(prefix='scraper_fixtures_') as fixtures_dir:
+        fixtures_path = args.fixtures
+        if args.csv:
+            fixtures_path = os.path.join(fixtures_dir, 'fixtures.jsonl.gz')
+            record_fixtures(events_from_csv(args.csv), fixtures_path, copies=args.copies)
+        results = benchmark(fixtures_path, args.concurrency, faults, args.rate_limit)
+
+    print(f"Faults: {asdict(faults)}")
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'faults': asdict(faults), 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the location classifier: the Aho-Corasick matcher finds the same
+whole-word matches as one regex per keyword, Bay Area classification no longer
+matches keywords inside other words, and online events are excluded
+"""
+
+import re
+import random
+import unittest
+
+from location_classifier import (KeywordMatcher, LocationClassifier, REGION_KEYWORDS, is_sf_bay_area,
+                                 location_matches)
+
+
+def regex_matches(keywords, text):
+    """Whole-word matches of each keyword, found with one regex per keyword"""
+    matches = set()
+    for keyword, label in keywords.items():
+        pattern = re.compile(r'(?<!\w)(?=(' + re.escape(keyword) + r')(?!\w))')
+        for match in pattern.finditer(text.lower()):
+            matches.add((match.start(1), match.end(1), label))
+    return matches
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    def test_matches_regex_scan(self):
+        keywords = {keyword: region for region, words in REGION_KEYWORDS.items() for keyword in words}
+        matcher = KeywordMatcher(keywords)
+        rng = random.Random(4)
+        pieces = ['San Francisco', 'South San Francisco', 'SF', 'SFO', 'Chicago', 'CA', 'Cal', 'California',
+                  'Bay Area', 'bay', 'Oakland', 'Zoom', 'zoomer', 'Online', 'remote_work', ',', '-', '(', ')',
+                  '94103', 'Santa Clara', 'Santa Cruz', 'Albany, NY', 'Peninsula', 'east', 'Bay', 'Palo Alto']
+        for _ in range(300):
+            text = ''.join(rng.choice([' ', '', ', ']) + rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+            with self.subTest(text=text):
+                self.assertEqual(set(matcher.find(text)), regex_matches(keywords, text))
+
+    def test_overlapping_keywords(self):
+        matcher = KeywordMatcher({'san francisco': 'city', 'south san francisco': 'ssf', 'francisco': 'name'})
+        self.assertEqual(matcher.find('South San Francisco'),
+                         [(0, 19, 'ssf'), (6, 19, 'city'), (10, 19, 'name')])
+        self.assertEqual(matcher.labels('San Franciscos'), frozenset())
+
+
+class LocationClassifierTest(unittest.TestCase):
+    def test_bay_area_needs_whole_words(self):
+        for location in ['Berkeley, CA', 'San Francisco', 'sf', 'SOMA, SF', 'Palo Alto, California', 'CA 94103',
+                         'South Bay', 'Oakland (Lake Merritt)']:
+            with self.subTest(location=location):
+                self.assertTrue(is_sf_bay_area(location))
+
+        for location in ['Chicago', 'Chicago, IL', 'Cairo', 'SFO Terminal 2', 'Oaklandish Pop-up', 'New York',
+                         'Scaling Hall', '', 'Not specified']:
+            with self.subTest(location=location):
+                self.assertFalse(is_sf_bay_area(location))
+
+    def test_online_events_are_not_in_the_bay_area(self):
+        for location in ['Online', 'Zoom', 'Virtual (SF time)', 'Remote - San Francisco', 'Online, CA']:
+            with self.subTest(location=location):
+                self.assertFalse(is_sf_bay_area(location))
+
+    def test_location_filters(self):
+        self.assertTrue(location_matches('Palo Alto', 'bay area'))
+        self.assertTrue(location_matches('Berkeley, CA', 'SF Bay Area'))
+        self.assertFalse(location_matches('Zoom (San Francisco)', 'bay area'))
+        self.assertTrue(location_matches('Zoom', 'online'))
+        self.assertFalse(location_matches('Oakland', 'virtual'))
+
+        self.assertTrue(location_matches('New York, NY', 'new york'))
+        self.assertTrue(location_matches('Berkeley, CA', 'ca'))
+        self.assertFalse(location_matches('Chicago', 'ca'))
+        self.assertFalse(location_matches('Santa Clara', 'san'))
+
+        self.assertTrue(location_matches('', 'ca'))
+        self.assertTrue(location_matches('Chicago', ''))
+
+    def test_regions_are_memoized(self):
+        classifier = LocationClassifier(cache_size=2)
+        for location in ['Oakland', 'Oakland', 'Online', 'Oakland']:
+            classifier.is_sf_bay_area(location)
+        info = classifier.regions.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Tests for the Firecrawl request scheduler: Retry-After parsing, the token
+bucket, retries with backoff, account errors, and the dead-letter file with its
+cooldown, against a mock transport and the Firecrawl replay server
+"""
+
+import os
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+import httpx
+
+import request_scheduler
+from request_scheduler import RequestScheduler, TokenBucket, FirecrawlAccountError, parse_retry_after, MIN_RATE_LIMIT
+from firecrawl_replay import ReplayServer, FaultConfig
+
+
+def mock_client(statuses, headers=None):
+    """Client answering each request with the next status of its URL, repeating the last one"""
+    requests = []
+
+    def handler(request):
+        url = json.loads(request.content)['url']
+        requests.append(url)
+        queue = statuses[url]
+        status = queue.pop(0) if len(queue) > 1 else queue[0]
+        return httpx.Response(status, json={'success': status == 200}, headers=(headers or {}).get(status))
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url='http://firecrawl.test'), requests
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_delay_seconds(self):
+        self.assertEqual(parse_retry_after('7'), 7.0)
+        self.assertEqual(parse_retry_after(' 0 '), 0.0)
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        self.assertAlmostEqual(parse_retry_after(format_datetime(retry_at, usegmt=True)), 30, delta=2)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_missing_or_malformed(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(''))
+        self.assertIsNone(parse_retry_after('soon'))
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_rate(self):
+        async def run():
+            bucket = TokenBucket(rate=50, capacity=3)
+            start = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            burst = time.monotonic() - start
+            for _ in range(5):
+                await bucket.acquire()
+            return burst, time.monotonic() - start
+
+        burst, total = asyncio.run(run())
+        self.assertLess(burst, 0.02)
+        # Five more tokens at 50 per second take about 0.1 s
+        self.assertGreater(total, 0.08)
+
+    def test_pause_holds_every_token(self):
+        async def run():
+            bucket = TokenBucket(rate=1000, capacity=10)
+            bucket.pause(0.1)
+            start = time.monotonic()
+            await bucket.acquire()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.09)
+
+    def test_slow_down_and_recover(self):
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        for _ in range(10):
+            bucket.slow_down()
+        self.assertEqual(bucket.rate, MIN_RATE_LIMIT)
+        for _ in range(100):
+            bucket.speed_up()
+        self.assertEqual(bucket.rate, 1.0)
+
+
+class RequestSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dead_letter_file = os.path.join(self.tmp_dir, 'dead_letter.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def scheduler(self, **kwargs) -> RequestScheduler:
+        kwargs.setdefault('max_attempts', 3)
+        return RequestScheduler(rate=1000, burst=100, dead_letter_file=self.dead_letter_file, **kwargs)
+
+    def post(self, scheduler, client, url):
+        return asyncio.run(scheduler.post(client, '/scrape', {'url': url}, key=url))
+
+    def read_dead_letter_file(self):
+        if not os.path.exists(self.dead_letter_file):
+            return []
+        with open(self.dead_letter_file, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_backoff_doubles_and_honors_retry_after(self):
+        client, requests = mock_client({'u': [500, 503, 429, 200]}, headers={429: {'Retry-After': '9'}})
+        clock = [0.0]
+        delays = []
+
+        async def record_sleep(seconds):
+            delays.append(seconds)
+            clock[0] += seconds
+
+        # Full jitter draws the largest delay, so the backoff schedule is visible; sleeps advance a fake clock
+        with mock.patch('request_scheduler.random.uniform', lambda low, high: high), \
+                mock.patch('request_scheduler.asyncio.sleep', record_sleep), \
+                mock.patch('request_scheduler.time', mock.Mock(monotonic=lambda: clock[0])):
+            scheduler = self.scheduler(max_attempts=5)
+            response = self.post(scheduler, client, 'u')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(requests), 4)
+        self.assertEqual(delays, [1.0, 2.0, 9.0])
+        self.assertEqual(scheduler.stats['retries'], 3)
+        self.assertEqual(scheduler.stats['rate_limited'], 1)
+        self.assertLess(scheduler.bucket.rate, 1000)
+
+    def test_backoff_is_capped(self):
+        client, _ = mock_client({'u': [500]})
+        scheduler = self.scheduler(max_attempts=10)
+        delays = []
+
+        async def record_sleep(seconds):
+            delays.append(seconds)
+
+        with mock.patch('request_scheduler.random.uniform', lambda low, high: high), \
+                mock.patch('request_scheduler.asyncio.sleep', record_sleep):
+            self.post(scheduler, client, 'u')
+        self.assertEqual(max(delays), request_scheduler.BACKOFF_MAX_SECONDS)
+
+    def test_missing_url_is_dead_lettered_for_good(self):
+        client, requests = mock_client({'gone': [404]})
+        scheduler = self.scheduler(cooldown_hours=0)
+        self.assertIsNone(self.post(scheduler, client, 'gone'))
+        self.assertEqual(requests, ['gone'])
+        self.assertTrue(scheduler.is_dead_lettered('gone'))
+        self.assertTrue(self.read_dead_letter_file()[0]['permanent'])
+
+        # Still skipped by later runs, past any cooldown
+        self.assertTrue(self.scheduler(cooldown_hours=0).is_dead_lettered('gone'))
+
+    def test_exhausted_retries_cool_down(self):
+        client, requests = mock_client({'flaky': [502]})
+        with mock.patch.object(request_scheduler, 'BACKOFF_BASE_SECONDS', 0.001):
+            self.assertIsNone(self.post(self.scheduler(), client, 'flaky'))
+        self.assertEqual(len(requests), 3)
+
+        self.assertTrue(self.scheduler(cooldown_hours=1).is_dead_lettered('flaky'))
+        self.assertFalse(self.scheduler(cooldown_hours=0).is_dead_lettered('flaky'))
+
+    def test_other_client_errors_cool_down(self):
+        client, requests = mock_client({'odd': [422]})
+        scheduler = self.scheduler(cooldown_hours=0)
+        self.assertIsNone(self.post(scheduler, client, 'odd'))
+        self.assertEqual(len(requests), 1)
+        self.assertFalse(scheduler.is_dead_lettered('odd'))
+
+    def test_account_errors_stop_the_run_without_dead_lettering(self):
+        for status in (401, 402, 403):
+            with self.subTest(status=status):
+                client, requests = mock_client({'a': [status], 'b': [200]})
+                scheduler = self.scheduler()
+                with self.assertRaises(FirecrawlAccountError):
+                    self.post(scheduler, client, 'a')
+                # Later requests fail without being sent
+                with self.assertRaises(FirecrawlAccountError):
+                    self.post(scheduler, client, 'b')
+                self.assertEqual(requests, ['a'])
+                self.assertFalse(scheduler.is_dead_lettered('a'))
+                self.assertEqual(self.read_dead_letter_file(), [])
+
+    def test_recovered_url_leaves_the_dead_letter_file(self):
+        client, _ = mock_client({'flaky': [500, 500, 500, 200], 'gone': [410]})
+        with mock.patch.object(request_scheduler, 'BACKOFF_BASE_SECONDS', 0.001):
+            first_run = self.scheduler()
+            self.post(first_run, client, 'flaky')
+            self.post(first_run, client, 'gone')
+
+            second_run = self.scheduler(cooldown_hours=0)
+            self.assertEqual(self.post(second_run, client, 'flaky').status_code, 200)
+
+        self.assertEqual([entry['url'] for entry in self.read_dead_letter_file()], ['gone'])
+        self.assertFalse(self.scheduler().is_dead_lettered('flaky'))
+
+    def test_clear_dead_letters(self):
+        client, _ = mock_client({'a': [404], 'b': [404]})
+        scheduler = self.scheduler()
+        self.post(scheduler, client, 'a')
+        self.post(scheduler, client, 'b')
+
+        self.assertEqual(scheduler.clear_dead_letters(['a', 'missing']), 1)
+        self.assertEqual([entry['url'] for entry in self.read_dead_letter_file()], ['b'])
+        self.assertEqual(scheduler.clear_dead_letters(), 1)
+        self.assertFalse(os.path.exists(self.dead_letter_file))
+
+    def test_loads_entries_written_by_earlier_versions(self):
+        failed_at = datetime.now().isoformat(timespec='seconds')
+        with open(self.dead_letter_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'url': 'gone', 'error': 'HTTP 404: ', 'failed_at': failed_at}) + '\n')
+            f.write(json.dumps({'url': 'odd', 'error': 'HTTP 422: ', 'permanent': True, 'failed_at': failed_at}) + '\n')
+            f.write(json.dumps({'url': 'unpaid', 'error': 'HTTP 402: ', 'permanent': True, 'failed_at': failed_at}) + '\n')
+            f.write('{"url": "partial", "err')
+
+        scheduler = self.scheduler(cooldown_hours=0)
+        self.assertTrue(scheduler.is_dead_lettered('gone'))
+        self.assertFalse(scheduler.is_dead_lettered('odd'))
+        self.assertFalse(scheduler.is_dead_lettered('unpaid'))
+        self.assertEqual(sorted(entry['url'] for entry in scheduler.get_dead_letters()), ['gone', 'odd'])
+
+
+class ReplayServerTest(unittest.TestCase):
+    def test_retries_injected_rate_limits_and_errors(self):
+        urls = [f"https://lu.ma/event{number}" for number in range(12)]
+        fixtures = {('scrape', url): {'markdown': f"# Event {url}"} for url in urls}
+        faults = FaultConfig(error_rate=0.2, rate_limit_rate=0.2, retry_after=0, seed=3)
+        server = ReplayServer(fixtures, faults, port=0).start()
+        scheduler = RequestScheduler(rate=1000, burst=4, max_attempts=10, dead_letter_file=None)
+
+        async def crawl():
+            async with httpx.AsyncClient(base_url=f"{server.url}/v1") as client:
+                return await asyncio.gather(*(
+                    scheduler.post(client, '/scrape', {'url': url, 'formats': ['markdown']}, key=url) for url in urls
+                ))
+
+        try:
+            with mock.patch.object(request_scheduler, 'BACKOFF_BASE_SECONDS', 0.001):
+                responses = asyncio.run(crawl())
+            stats = server.get_stats()
+        finally:
+            server.stop()
+
+        self.assertTrue(all(response is not None and response.status_code == 200 for response in responses))
+        self.assertEqual([response.json()['data']['markdown'] for response in responses],
+                         [f"# Event {url}" for url in urls])
+        self.assertGreater(stats['rate_limited'] + stats['errors'], 0)
+        self.assertEqual(scheduler.stats['requests'], stats['requests'])
+        self.assertEqual(scheduler.stats['retries'], stats['rate_limited'] + stats['errors'])
+        self.assertEqual(scheduler.stats['rate_limited'], stats['rate_limited'])
+        self.assertEqual(scheduler.stats['dead_lettered'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
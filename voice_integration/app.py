@@ -5,6 +5,7 @@ from voice_integration.flow_controller import FlowController
 from voice_integration.voice_processor import VoiceProcessor
 from voice_integration.question_engine import QuestionEngine
 from voice_integration.company_recommender import CompanyRecommender
+from voice_integration.gemini_client import GeminiClient
 import asyncio
 
 
@@ -25,6 +26,15 @@ voice_processor = VoiceProcessor(flow_controller)
 question_engine = QuestionEngine()
 company_recommender = CompanyRecommender(flow_controller)
 
+@app.before_serving
+async def start_gemini_client():
+    # Open the shared Gemini connection pool once, instead of per LLM call
+    await GeminiClient.get_instance().start()
+
+@app.after_serving
+async def close_gemini_client():
+    await GeminiClient.get_instance().close()
+
 @app.route("/")
 async def index():
     # Simply use await directly
@@ -7,8 +7,8 @@ import json
 import re
 from datetime import datetime, timedelta
 import os
-import google.generativeai as genai
 from firecrawl import FirecrawlApp
+from voice_integration.gemini_client import GeminiClient
 from dotenv import load_dotenv
 from typing import List, Dict, Any
 import math
@@ -20,14 +20,13 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Initialize Firecrawl
+# Initialize Firecrawl (FIRECRAWL_API_URL can point at the local replay server in luma_event_scraper/)
 FIRECRAWL_API_KEY = os.environ.get("FIRECRAWL_API_KEY")
-firecrawl_app = FirecrawlApp(api_key=FIRECRAWL_API_KEY)
+FIRECRAWL_API_URL = os.environ.get("FIRECRAWL_API_URL", "https://api.firecrawl.dev")
+firecrawl_app = FirecrawlApp(api_key=FIRECRAWL_API_KEY, api_url=FIRECRAWL_API_URL)
 
-# Initialize Gemini
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
-gemini = genai.GenerativeModel('gemini-2.0-flash')
+# Shared pooled Gemini client
+gemini_client = GeminiClient.get_instance()
 
 # Current date for validation
 CURRENT_DATE = datetime.now()
@@ -38,6 +37,15 @@ DEBUG_MODE = os.environ.get("DEBUG", "True").lower() == "true"
 # Recency weight for sorting (how much to prioritize recent events)
 RECENCY_WEIGHT = float(os.environ.get("RECENCY_WEIGHT", "0.2"))
 
+# Maximum number of concurrent Gemini relevance calls, and attempts per call when rate limited
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "5"))
+GEMINI_MAX_ATTEMPTS = int(os.environ.get("GEMINI_MAX_ATTEMPTS", "3"))
+
+# Events packed into one Gemini relevance prompt (1 disables batching), and the
+# estimated prompt size, in tokens, that a batch may not exceed
+RELEVANCE_BATCH_SIZE = int(os.environ.get("RELEVANCE_BATCH_SIZE", "1"))
+RELEVANCE_BATCH_TOKEN_BUDGET = int(os.environ.get("RELEVANCE_BATCH_TOKEN_BUDGET", "24000"))
+
 class EventScraper:
     """
     Scraper for Luma Events based on keywords and location.
@@ -139,19 +147,8 @@ class EventScraper:
             logger.warning("No events found to analyze")
             return []
         
-        # Step 2: Analyze relevance of each event
-        analyzed_events = []
-        for event in events:
-            logger.info(f"Processing event: {event.get('event_name')}")
-            
-            # Analyze relevance
-            relevance_result = await self._analyze_event_relevance(event, all_keywords)
-            
-            # Add relevance data to event
-            event['relevance_score'] = relevance_result.get('relevance_score', 0.0)
-            event['relevance_highlight'] = relevance_result.get('highlight', 'No highlight available')
-            
-            analyzed_events.append(event)
+        # Step 2: Analyze relevance of all events concurrently, up to GEMINI_MAX_CONCURRENCY at a time
+        analyzed_events = await self._analyze_events_concurrently(events, all_keywords)
         
         # Step 3: Calculate combined scores (relevance + recency)
         for event in analyzed_events:
@@ -177,6 +174,171 @@ class EventScraper:
         logger.info(f"Returning top {len(formatted_events)} events")
         return formatted_events
     
+    async def _analyze_events_concurrently(self, events: List[Dict[str, Any]], keywords: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze the relevance of events with concurrent Gemini calls
+        
+        When RELEVANCE_BATCH_SIZE is above 1, several events share each call.
+        Results are applied to each event as its call finishes.
+        """
+        semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+        
+        async def analyze(batch):
+            if len(batch) == 1:
+                logger.info(f"Processing event: {batch[0].get('event_name')}")
+            return batch, await self._analyze_event_batch(batch, keywords, semaphore)
+        
+        analyzed_events = []
+        for next_result in asyncio.as_completed([analyze(batch) for batch in self._plan_batches(events, keywords)]):
+            batch, relevance_results = await next_result
+            
+            for event, relevance_result in zip(batch, relevance_results):
+                # Add relevance data to event
+                event['relevance_score'] = relevance_result.get('relevance_score', 0.0)
+                event['relevance_highlight'] = relevance_result.get('highlight', 'No highlight available')
+                
+                analyzed_events.append(event)
+        
+        return analyzed_events
+    
+    def _plan_batches(self, events: List[Dict[str, Any]], keywords: List[str]) -> List[List[Dict[str, Any]]]:
+        """Split events into batches of at most RELEVANCE_BATCH_SIZE events that fit the token budget"""
+        if RELEVANCE_BATCH_SIZE <= 1:
+            return [[event] for event in events]
+        
+        # Roughly 4 characters per token
+        overhead = len(self._build_batch_prompt([], keywords)) // 4
+        
+        batches = []
+        current = []
+        current_tokens = overhead
+        for event in events:
+            event_tokens = len(self._format_event_data(event)) // 4 + 20
+            if current and (len(current) >= RELEVANCE_BATCH_SIZE or current_tokens + event_tokens > RELEVANCE_BATCH_TOKEN_BUDGET):
+                batches.append(current)
+                current = []
+                current_tokens = overhead
+            current.append(event)
+            current_tokens += event_tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _build_batch_prompt(self, events: List[Dict[str, Any]], keywords: List[str]) -> str:
+        """Build one Gemini prompt that scores several events, with the keywords and rubric stated once"""
+        events_data = "\n".join(
+            f"""
+        --- Event {position} ---
+        Event URL: {event.get('event_url', '')}
+        {self._format_event_data(event).strip()}
+        """
+            for position, event in enumerate(events, start=1)
+        )
+        
+        return f"""
+        Analyze the relevance of each of the following {len(events)} events to these keywords: {', '.join(keywords)}
+        
+        {events_data}
+        
+        The relevance score should be:
+        - 0.0: Not relevant at all
+        - 0.3: Slightly relevant (mentions keywords but not a focus)
+        - 0.5: Moderately relevant (related to keywords)
+        - 0.7: Very relevant (directly addresses keywords)
+        - 1.0: Extremely relevant (perfectly matches keywords)
+        
+        Return a JSON array with one object per event, each with:
+        1. "event_url": The Event URL exactly as given above
+        2. "relevance_score": A float between 0.0 and 1.0
+        3. "highlight": A brief explanation of why this event is relevant or not relevant
+        
+        Format your response as a valid JSON array only, with no additional text.
+        """
+    
+    async def _analyze_event_batch(self, events: List[Dict[str, Any]], keywords: List[str],
+                                   semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """
+        Analyze the relevance of several events with one Gemini call
+        
+        Every Gemini call, including the retries below, waits for a slot of the semaphore.
+        If the response cannot be parsed, the batch is split in half and retried;
+        events missing from the response fall back to single-event analysis. A call
+        that failed (rate limited through all its attempts, or no API key) is not
+        retried in smaller batches, which would only send more requests.
+        """
+        if len(events) == 1:
+            return [await self._analyze_event_relevance_limited(events[0], keywords, semaphore)]
+        
+        logger.info(f"Analyzing relevance of {len(events)} events in one batch to keywords: {keywords}")
+        
+        async with semaphore:
+            result_text = await gemini_client.generate(self._build_batch_prompt(events, keywords),
+                                                       max_attempts=GEMINI_MAX_ATTEMPTS)
+        if result_text is None:
+            logger.error("No batched relevance response from Gemini")
+            return [{
+                'relevance_score': 0.0,
+                'highlight': "Could not determine relevance (API error)"
+            } for _ in events]
+        
+        parsed = None
+        try:
+            try:
+                items = json.loads(result_text)
+            except json.JSONDecodeError:
+                # Try to extract JSON if it's wrapped in markdown code blocks or has extra text
+                json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
+                if json_match:
+                    items = json.loads(json_match.group(1))
+                else:
+                    json_match = re.search(r'\[.*\]', result_text, re.DOTALL)
+                    if json_match:
+                        items = json.loads(json_match.group(0))
+                    else:
+                        raise ValueError("Could not extract JSON array from response")
+            
+            if not isinstance(items, list):
+                raise ValueError("Batched relevance response is not a JSON array")
+            
+            parsed = {}
+            for item in items:
+                try:
+                    parsed[item['event_url']] = {
+                        'relevance_score': max(0.0, min(1.0, float(item['relevance_score']))),
+                        'highlight': item['highlight']
+                    }
+                except (KeyError, TypeError, ValueError):
+                    logger.warning(f"Skipping malformed item in batched relevance response: {item}")
+                    
+        except ValueError as e:
+            logger.error(f"Error parsing batched relevance response: {str(e)}")
+        
+        if parsed is None:
+            # Smaller batches are less likely to be truncated or malformed
+            middle = len(events) // 2
+            first_half, second_half = await asyncio.gather(
+                self._analyze_event_batch(events[:middle], keywords, semaphore),
+                self._analyze_event_batch(events[middle:], keywords, semaphore)
+            )
+            return first_half + second_half
+        
+        missing = [event for event in events if event.get('event_url', '') not in parsed]
+        for event in missing:
+            logger.warning(f"No batched result for event: {event.get('event_name')}; analyzing it individually")
+        fallback_results = await asyncio.gather(
+            *(self._analyze_event_relevance_limited(event, keywords, semaphore) for event in missing)
+        )
+        fallback = {id(event): result for event, result in zip(missing, fallback_results)}
+        
+        return [parsed.get(event.get('event_url', '')) or fallback[id(event)] for event in events]
+    
+    async def _analyze_event_relevance_limited(self, event, keywords: List[str],
+                                               semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Analyze the relevance of one event once a slot of the semaphore is free"""
+        async with semaphore:
+            return await self._analyze_event_relevance(event, keywords)
+    
     async def _scrape_events(self, location: str = "sf") -> List[Dict[str, Any]]:
         """
         Scrape events from Luma based on location
@@ -195,8 +357,10 @@ class EventScraper:
                 url = "https://lu.ma/sf"
             
             # Use Firecrawl to scrape and extract events
+            # The Firecrawl SDK is synchronous, so run it off the event loop
             logger.info(f"Sending request to Firecrawl API for {url}")
-            result = firecrawl_app.extract(
+            result = await asyncio.to_thread(
+                firecrawl_app.extract,
                 [url],
                 {
                     'prompt': f"""
@@ -312,11 +476,8 @@ class EventScraper:
             logger.error(f"Error scraping events: {str(e)}")
             return []
     
-    async def _analyze_event_relevance(self, event, keywords: List[str]) -> Dict[str, Any]:
-        """
-        Analyze the relevance of an event to the provided keywords
-        Returns a relevance score and highlight
-        """
+    def _format_event_data(self, event) -> str:
+        """Format the details of an event for a relevance prompt"""
         event_name = event.get('event_name', '')
         event_description = event.get('event_description', '')
         
@@ -341,6 +502,15 @@ class EventScraper:
         Description: {event_description}
         Speakers: {speakers_info}
         """
+        return event_data
+    
+    async def _analyze_event_relevance(self, event, keywords: List[str]) -> Dict[str, Any]:
+        """
+        Analyze the relevance of an event to the provided keywords
+        Returns a relevance score and highlight
+        """
+        event_name = event.get('event_name', '')
+        event_data = self._format_event_data(event)
         
         # Prepare prompt for Gemini
         prompt = f"""
@@ -366,17 +536,18 @@ class EventScraper:
         
         try:
             logger.info("Sending request to Gemini for relevance analysis")
-            response = gemini.generate_content(prompt)
-            
-            # Extract JSON from response
-            result_text = response.text
+            result_text = await gemini_client.generate(prompt, max_attempts=GEMINI_MAX_ATTEMPTS)
+            if result_text is None:
+                return {
+                    'relevance_score': 0.0,
+                    'highlight': "Could not determine relevance (API error)"
+                }
             
             # Handle potential formatting issues in the response
             try:
                 result = json.loads(result_text)
             except json.JSONDecodeError:
                 # Try to extract JSON if it's wrapped in markdown code blocks or has extra text
-                import re
                 json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
                 if json_match:
                     result = json.loads(json_match.group(1))
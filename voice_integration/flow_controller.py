@@ -3,10 +3,10 @@ import logging
 import os
 import random
 import json
-import httpx
 from pathlib import Path
 from dotenv import load_dotenv
 from voice_integration.question_engine import QuestionEngine
+from voice_integration.gemini_client import GeminiClient, strip_code_fence
 import traceback
 
 # Configure logging
@@ -33,6 +33,7 @@ class FlowController:
         # Load API keys
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
         logger.info(f"Loaded Gemini API key: {self.gemini_api_key[:10] if self.gemini_api_key else 'Not found'}")
+        self.gemini = GeminiClient.get_instance()
         
         # User data
         self.current_product_line = ""
@@ -325,46 +326,18 @@ class FlowController:
                 # Return a simple JSON-formatted array of default keywords
                 return '["B2B", "Sales", "Marketing", "Lead Generation"]'
                 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.gemini_api_key}",
-                    json={
-                        "contents": [
-                            {
-                                "role": "user",
-                                "parts": [{"text": prompt}]
-                            }
-                        ],
-                        "generationConfig": {
-                            "temperature": 0.2,
-                            "topP": 0.8,
-                            "topK": 40,
-                            "maxOutputTokens": 1024
-                        }
-                    },
-                    timeout=10.0  # Increased timeout for more reliable API calls
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if "candidates" in data and len(data["candidates"]) > 0:
-                        candidate = data["candidates"][0]
-                        if "content" in candidate and "parts" in candidate["content"]:
-                            parts = candidate["content"]["parts"]
-                            if parts and "text" in parts[0]:
-                                text = parts[0]["text"].strip()
-                                # Remove markdown code blocks if present
-                                if text.startswith("```") and text.endswith("```"):
-                                    # Extract content between code blocks
-                                    lines = text.split("\n")
-                                    if len(lines) > 2:  # At least 3 lines (opening, content, closing)
-                                        # Remove first and last lines (```json and ```)
-                                        text = "\n".join(lines[1:-1]).strip()
-                                return text
-                
-                logger.error(f"Gemini API error: {response.status_code} {response.text}")
-                # Return a fallback value in case of API error
-                return '["B2B", "Sales", "Marketing", "Lead Generation"]'
+            text = await self.gemini.generate(prompt, generation_config={
+                "temperature": 0.2,
+                "topP": 0.8,
+                "topK": 40,
+                "maxOutputTokens": 1024
+            })
+            if text is not None:
+                # Remove markdown code blocks if present
+                return strip_code_fence(text)
+            
+            # Return a fallback value in case of API error
+            return '["B2B", "Sales", "Marketing", "Lead Generation"]'
         except Exception as e:
             logger.error(f"Error calling Gemini API: {str(e)}")
             logger.error(traceback.format_exc())
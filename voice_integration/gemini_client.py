@@ -0,0 +1,169 @@
+"""
+Gemini Client
+
+One pooled async client for the Gemini generateContent API, shared by the flow
+controller, question engine and event scraper. The HTTP/2 connection is opened
+once and kept alive between onboarding steps, so each LLM call skips the TCP
+and TLS handshake. The app opens the client when it starts serving and closes
+it on shutdown; scripts that never call start() get a client on first use.
+"""
+
+import os
+import asyncio
+import random
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Gemini API endpoint and model
+GEMINI_API_URL = os.getenv('GEMINI_API_URL', 'https://generativelanguage.googleapis.com/v1beta').rstrip('/')
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
+
+# Timeout for each Gemini call, and for opening a connection
+GEMINI_TIMEOUT_SECONDS = float(os.getenv('GEMINI_TIMEOUT_SECONDS', '20'))
+GEMINI_CONNECT_TIMEOUT_SECONDS = float(os.getenv('GEMINI_CONNECT_TIMEOUT_SECONDS', '5'))
+
+# Connections in the pool, and how long an idle one stays open (long enough to
+# span the pause while the user answers the next onboarding question)
+GEMINI_MAX_CONNECTIONS = int(os.getenv('GEMINI_MAX_CONNECTIONS', '10'))
+GEMINI_KEEPALIVE_SECONDS = float(os.getenv('GEMINI_KEEPALIVE_SECONDS', '120'))
+
+# Responses that are worth retrying, and the base delay of the exponential backoff
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRY_BASE_DELAY_SECONDS = 2.0
+
+
+def extract_text(data: Dict[str, Any]) -> Optional[str]:
+    """Get the text of the first candidate of a generateContent response"""
+    candidates = data.get('candidates') or []
+    if not candidates:
+        return None
+    parts = (candidates[0].get('content') or {}).get('parts') or []
+    text = ''.join(part.get('text', '') for part in parts)
+    return text or None
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a markdown code block (```json ... ```) wrapped around a response"""
+    text = text.strip()
+    if text.startswith("```") and text.endswith("```"):
+        lines = text.split("\n")
+        if len(lines) > 2:
+            text = "\n".join(lines[1:-1]).strip()
+    return text
+
+
+class GeminiClient:
+    """Pooled async client for Gemini text generation"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Get the shared client"""
+        if cls._instance is None:
+            cls._instance = GeminiClient()
+        return cls._instance
+
+    def __init__(self, api_key: Optional[str] = None, model: str = GEMINI_MODEL, base_url: str = GEMINI_API_URL):
+        """
+        Initialize the client without opening any connections
+
+        Args:
+            api_key: Gemini API key (defaults to GEMINI_API_KEY)
+            model: Model to generate with
+            base_url: API root, ending in the API version
+        """
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.model = model
+        self.base_url = base_url
+        self.client = None
+        self.loop = None
+
+    async def start(self):
+        """Open the connection pool"""
+        self._get_client()
+        logger.info(f"Gemini client ready for {self.model}")
+
+    async def close(self):
+        """Close the connection pool"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self.loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        if self.client is not None and self.loop is not loop:
+            # Connections belong to the event loop that opened them, and scripts
+            # can run several loops one after another
+            self.client = None
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=True,
+                headers={'x-goog-api-key': self.api_key or ''},
+                timeout=httpx.Timeout(GEMINI_TIMEOUT_SECONDS, connect=GEMINI_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_CONNECTIONS,
+                    keepalive_expiry=GEMINI_KEEPALIVE_SECONDS
+                )
+            )
+            self.loop = loop
+        return self.client
+
+    async def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                       max_attempts: int = 1) -> Optional[str]:
+        """
+        Generate text for a prompt
+
+        Args:
+            prompt: Prompt text
+            generation_config: Gemini generationConfig (temperature, maxOutputTokens, ...)
+            max_attempts: Attempts for rate-limited or failed calls, with exponential backoff between them
+
+        Returns:
+            The generated text, or None if there is no API key or the call failed
+        """
+        if not self.api_key:
+            logger.warning("No Gemini API key found")
+            return None
+
+        payload = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if generation_config:
+            payload["generationConfig"] = generation_config
+
+        for attempt in range(max_attempts):
+            try:
+                response = await self._get_client().post(f"/models/{self.model}:generateContent", json=payload)
+            except httpx.TimeoutException:
+                logger.error(f"Gemini call timed out after {GEMINI_TIMEOUT_SECONDS:.1f}s")
+                return None
+            except httpx.HTTPError as e:
+                logger.error(f"Error calling Gemini API: {str(e)}")
+                return None
+
+            if response.status_code == 200:
+                text = extract_text(response.json())
+                if text is None:
+                    logger.error(f"Unexpected response format from Gemini API: {response.text[:500]}")
+                return text
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_attempts - 1:
+                delay = RETRY_BASE_DELAY_SECONDS * (2 ** attempt) + random.uniform(0, 1)
+                logger.info(f"Gemini API returned {response.status_code}. Retrying in {delay:.2f} seconds...")
+                await asyncio.sleep(delay)
+                continue
+
+            logger.error(f"Gemini API error: {response.status_code} {response.text[:500]}")
+            return None
+        return None
@@ -5,7 +5,7 @@ import os
 import requests
 import json
 from dotenv import load_dotenv
-import httpx
+from voice_integration.gemini_client import GeminiClient
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
@@ -23,6 +23,7 @@ class QuestionEngine:
 
         # Check if Gemini API key is available
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
+        self.gemini = GeminiClient.get_instance()
         if self.gemini_api_key:
             self.logger.info("Gemini API key found. Using dynamic LLM-based questions.")
         else:
@@ -195,40 +196,16 @@ class QuestionEngine:
             prompt = self._construct_prompt(step, context, previous_message)
 
             # Call the Gemini API
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.gemini_api_key}"
-
-            data = {
-                "contents": [{
-                    "parts": [{"text": prompt}]
-                }]
-            }
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    json=data,
-                    timeout=5.0
-                )
-
-            if response.status_code == 200:
-                result = response.json()
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    content = result["candidates"][0]["content"]
-                    if "parts" in content and len(content["parts"]) > 0:
-                        question = content["parts"][0]["text"]
-
-                        # Clean up the response to ensure it's a single question
-                        question = self._clean_llm_response(question)
-
-                        logger.info(f"Generated question with Gemini API: {question}")
-                        return question
-
-                logger.error(f"Unexpected response format from Gemini API: {result}")
-                return self._generate_basic_question(step, context)
-            else:
-                logger.error(f"Error calling Gemini API: {response.status_code} - {response.text}")
-                # Fall back to basic question generation
-                return self._generate_basic_question(step, context)
+            question = await self.gemini.generate(prompt)
+            if question:
+                # Clean up the response to ensure it's a single question
+                question = self._clean_llm_response(question)
+
+                logger.info(f"Generated question with Gemini API: {question}")
+                return question
+
+            # Fall back to basic question generation
+            return self._generate_basic_question(step, context)
 
         except Exception as e:
             logger.error(f"Error generating question with LLM: {str(e)}")
@@ -491,35 +468,14 @@ class QuestionEngine:
             prompt = self.prompt_templates['summary'].format(context=context)
 
             # Call the Gemini API
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.gemini_api_key}"
-
-            data = {
-                "contents": [{
-                    "parts": [{"text": prompt}]
-                }]
-            }
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    json=data,
-                    timeout=5.0
-                )
-
-            if response.status_code == 200:
-                result = response.json()
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    content = result["candidates"][0]["content"]
-                    if "parts" in content and len(content["parts"]) > 0:
-                        summary = content["parts"][0]["text"].strip()
-
-                        # Clean up the summary
-                        summary = summary.replace('"', '').strip()
-
-                        logger.info(f"Generated summary with LLM: {summary}")
-                        return summary
-
-            logger.error(f"Error or unexpected response from Gemini API")
+            summary = await self.gemini.generate(prompt)
+            if summary:
+                # Clean up the summary
+                summary = summary.replace('"', '').strip()
+
+                logger.info(f"Generated summary with LLM: {summary}")
+                return summary
+
             return None
 
         except Exception as e:
@@ -545,38 +501,17 @@ class QuestionEngine:
             prompt = self.prompt_templates['keywords'].format(context=context)
 
             # Call the Gemini API
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.gemini_api_key}"
-
-            data = {
-                "contents": [{
-                    "parts": [{"text": prompt}]
-                }]
-            }
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    json=data,
-                    timeout=5.0
-                )
-
-            if response.status_code == 200:
-                result = response.json()
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    content = result["candidates"][0]["content"]
-                    if "parts" in content and len(content["parts"]) > 0:
-                        keywords_text = content["parts"][0]["text"]
-
-                        # Parse the keywords from the response
-                        keywords_list = [kw.strip() for kw in keywords_text.split(',') if kw.strip()]
-
-                        # Limit to 15 keywords
-                        keywords_list = keywords_list[:15]
-
-                        logger.info(f"Generated keywords with LLM: {keywords_list}")
-                        return keywords_list
-
-            logger.error(f"Error or unexpected response from Gemini API")
+            keywords_text = await self.gemini.generate(prompt)
+            if keywords_text:
+                # Parse the keywords from the response
+                keywords_list = [kw.strip() for kw in keywords_text.split(',') if kw.strip()]
+
+                # Limit to 15 keywords
+                keywords_list = keywords_list[:15]
+
+                logger.info(f"Generated keywords with LLM: {keywords_list}")
+                return keywords_list
+
             return None
 
         except Exception as e:
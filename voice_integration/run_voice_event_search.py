@@ -34,7 +34,7 @@ def check_environment():
     # Check for Python dependencies
     try:
         import quart
-        import google.generativeai
+        import h2
         import firecrawl
         import speech_recognition
     except ImportError as e: